@@ -1,64 +1,115 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Request, status
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from app.db.database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import AsyncSessionLocal
+from app.db.escritor_diferido import escritor_evaluaciones
+from app.db.resumen_diario import insertar_evaluaciones
+from app.db.version_datos import version_evaluaciones
+from app.core.db_settings import WRITE_BEHIND_ENABLED
 from app.db.models import Evaluacion
-from app.schemas.input_data import InputArray
+from app.schemas.input_data import EntradaPrediccion, InputBatch
 from app.model.data_preprocessor import DataPreprocessor
-from app.utils.email_sender import enviar_pdf_por_correo
+from app.utils.email_sender import ColaLlena, cola_correo
+from app.core.email_settings import CORREO_MAX_BYTES, CORREO_SPOOL_MEMORIA
 from app.utils.conversion import sanitize_numpy_types
-from app.model.predictor import predecir
+from app.model.predictor import evaluar_registros, predecir
+from app.model.registry import obtener_modelos
+from app.model.executor import en_ejecutor_modelo
+from app.utils.metricas import etapa, registrar_entrada
 from pydantic import EmailStr
-from app.utils.email_config import conf  # configuración separada
 from datetime import datetime
 from zoneinfo import ZoneInfo
 import tempfile
-import shutil
 import math
 import os
 
 router = APIRouter()
 
-# Dependencia para obtener una sesión de base de datos
-def get_db():
-    db = SessionLocal()
-    try:
+# Dependencia para obtener una sesión (async) de base de datos
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-@router.post("/predict")
-def predict(data: InputArray, db: Session = Depends(get_db)):
-    if len(data.values) != 25:
-        return {"error": f"Se esperaban 25 valores y se recibieron {len(data.values)}"}
+LIMA = ZoneInfo("America/Lima")
 
-    # Procesamiento y predicción
-    processor = DataPreprocessor(data.values)
-    feature_vector = processor.get_feature_vector()
-    resultado = predecir(feature_vector)
+# Máximo de registros aceptados por /predict/batch
+MAX_REGISTROS_LOTE = int(os.getenv("PREDICT_BATCH_MAX", "500"))
 
-    # Preparar y sanear datos
-    data_dict = processor.preparar_data_para_guardar(resultado)
-    data_dict = sanitize_numpy_types(data_dict)
 
-    evaluacion = Evaluacion(**data_dict)
+def _completar_evaluacion(data_dict, hora_actual) -> dict:
+    # Sanear tipos numpy
+    with etapa("sanitizar"):
+        data_dict = sanitize_numpy_types(data_dict)
 
-    # Obtener hora actual en Lima y asignarla como hora_fin
-    lima = ZoneInfo("America/Lima")
-    hora_actual = datetime.now(lima).replace(microsecond=0)
-    evaluacion.hora_fin = hora_actual
+    # La hora actual en Lima se asigna como hora_fin
+    data_dict["hora_fin"] = hora_actual
 
     #Calcular duración en minutos
-    if evaluacion.hora_inicio:
-        diferencia = hora_actual - evaluacion.hora_inicio
+    hora_inicio = data_dict.get("hora_inicio")
+    if hora_inicio:
+        # Las horas que llegan sin zona horaria son hora local de Lima
+        if hora_inicio.tzinfo is None:
+            hora_inicio = hora_inicio.replace(tzinfo=LIMA)
+            data_dict["hora_inicio"] = hora_inicio
+        diferencia = hora_actual - hora_inicio
         minutos = diferencia.total_seconds() / 60
-        evaluacion.duracion_minutos = math.ceil(minutos)
+        data_dict["duracion_minutos"] = math.ceil(minutos)
+
+    return data_dict
+
+
+def _evaluar(values):
+    # Trabajo de CPU (preprocesamiento + predicción); corre en el ejecutor del modelo
+    with etapa("modelos"):
+        modelos = obtener_modelos()  # misma versión de modelos durante todo el request
+    with etapa("preprocesamiento"):
+        processor = DataPreprocessor(values, modelos=modelos)
+    with etapa("pca"):
+        # PCA_1 (producto punto) y armado de la matriz de características
+        feature_vector = processor.get_feature_matrix()
+    with etapa("prediccion"):
+        resultado = predecir(feature_vector, modelos=modelos)
+    with etapa("columnas"):
+        # Columnas de 'evaluaciones' (incluye interpretar las horas de inicio y fin)
+        fila = processor.preparar_data_para_guardar(resultado)
+    return resultado, fila
+
 
-    # Guardar en BD
-    db.add(evaluacion)
-    db.commit()
-    db.refresh(evaluacion)
+def _evaluar_lote(registros):
+    # Validación por registro: un registro inválido no descarta el lote
+    return evaluar_registros([registro.values for registro in registros])
+
+
+def _escritura_diferida() -> bool:
+    # Si el escritor no está corriendo (p. ej. falló al arrancar) se guarda de forma directa
+    return WRITE_BEHIND_ENABLED and escritor_evaluaciones.activo
+
+
+@router.post("/predict")
+async def predict(request: Request, data: EntradaPrediccion, db: AsyncSession = Depends(get_db)):
+    # Lectura del body, JSON y validación (25 valores tipados, rangos y horas ya interpretadas);
+    # un registro inválido no llega aquí: FastAPI responde 422 con el campo que falló
+    registrar_entrada(request)
+
+    # Procesamiento y predicción fuera del event loop (incluye la espera por un hilo libre)
+    with etapa("ejecutor"):
+        resultado, data_dict = await en_ejecutor_modelo(_evaluar, data.valores())
+
+    # Obtener hora actual en Lima
+    hora_actual = datetime.now(LIMA).replace(microsecond=0)
+    data_dict = _completar_evaluacion(data_dict, hora_actual)
+
+    if _escritura_diferida():
+        # Spool local + cola: el INSERT multi-fila lo hace el escritor en segundo plano
+        with etapa("encolar"):
+            await escritor_evaluaciones.encolar([data_dict])
+    else:
+        # Guardar en BD junto con el resumen diario (la respuesta no usa el id, así que no hace falta refresh)
+        with etapa("db_commit"):
+            await insertar_evaluaciones(db, [data_dict])
+            await db.commit()
+        version_evaluaciones.incrementar()
 
     return {
         "clase_predicha": resultado["clase_predicha"],
@@ -66,20 +117,77 @@ def predict(data: InputArray, db: Session = Depends(get_db)):
     }
 
 
-@router.post("/enviar-pdf")
-async def enviar_pdf(
-    file: UploadFile = File(...),
-    destinatario: EmailStr = Form(...)
-):
-    # Crear ruta con nombre original del archivo
-    temp_dir = tempfile.gettempdir()
-    final_path = os.path.join(temp_dir, file.filename)
+@router.post("/predict/batch")
+async def predict_batch(data: InputBatch, db: AsyncSession = Depends(get_db)):
+    if len(data.registros) > MAX_REGISTROS_LOTE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Se aceptan como máximo {MAX_REGISTROS_LOTE} registros por lote",
+        )
+
+    resultados, errores, filas = await en_ejecutor_modelo(_evaluar_lote, data.registros)
+
+    if filas:
+        hora_actual = datetime.now(LIMA).replace(microsecond=0)
+        filas = [_completar_evaluacion(fila, hora_actual) for fila in filas]
+
+        if _escritura_diferida():
+            await escritor_evaluaciones.encolar(filas)
+        else:
+            # Un solo INSERT multi-fila para todo el lote (más el upsert del resumen diario)
+            await insertar_evaluaciones(db, filas)
+            await db.commit()
+            version_evaluaciones.incrementar()
 
-    with open(final_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    return {"resultados": resultados, "errores": errores}
 
-    await enviar_pdf_por_correo(final_path, destinatario, conf)
 
-    os.remove(final_path)
+BLOQUE_SUBIDA = 64 * 1024
 
-    return JSONResponse(content={"mensaje": f"Informe de evaluación enviado correctamente a {destinatario}"})
+
+@router.post("/enviar-pdf", status_code=status.HTTP_202_ACCEPTED)
+async def enviar_pdf(
+    file: UploadFile = File(...),
+    destinatario: EmailStr = Form(...)
+):
+    # Buffer propio por request (memoria y luego temporal anónimo): dos subidas con el mismo nombre no chocan
+    archivo = tempfile.SpooledTemporaryFile(max_size=CORREO_SPOOL_MEMORIA)
+    tamano = 0
+    while bloque := await file.read(BLOQUE_SUBIDA):
+        tamano += len(bloque)
+        if tamano > CORREO_MAX_BYTES:
+            archivo.close()
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"El PDF supera el máximo de {CORREO_MAX_BYTES} bytes",
+            )
+        archivo.write(bloque)
+
+    # El envío lo hace la cola en segundo plano, con una conexión SMTP reutilizada
+    try:
+        trabajo = await cola_correo.encolar(destinatario, file.filename, archivo)
+    except ColaLlena as e:
+        archivo.close()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Hay demasiados correos en cola, intenta nuevamente",
+            headers={"Retry-After": "5"},
+        ) from e
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "mensaje": f"Informe de evaluación en cola para {destinatario}",
+            "trabajo_id": trabajo.id,
+            "estado": trabajo.estado,
+        },
+    )
+
+
+@router.get("/enviar-pdf/{trabajo_id}")
+async def estado_envio_pdf(trabajo_id: str):
+    # Estado del envío: en_cola, enviando, reintentando, enviado o fallido
+    estado = cola_correo.estado(trabajo_id)
+    if estado is None:
+        raise HTTPException(status_code=404, detail="Envío no encontrado")
+    return estado
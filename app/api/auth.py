@@ -1,30 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from app.core.auth_settings import COOKIE_NAME, COOKIE_MAX_AGE, SAMESITE, SECURE_COOKIE
-from sqlalchemy.orm import Session
-from app.db.database import SessionLocal
+from app.core.auth_settings import (
+    COOKIE_NAME, COOKIE_MAX_AGE, SAMESITE, SECURE_COOKIE,
+    AUTH_HASH_WORKERS, AUTH_HASH_MAX_PENDIENTES, AUTH_HASH_MAX_ESPERA, AUTH_HASH_NICE,
+    AUTH_MAX_FALLOS_USUARIO, AUTH_MAX_FALLOS_IP, AUTH_VENTANA_FALLOS,
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import AsyncSessionLocal
 from app.db.models import Usuario
+from app.utils.contrasenas import LimitadorIntentos, PoolContrasenas, PoolSaturado
 from app.utils.security import create_access_token
+import ipaddress
+import math
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-def get_db():
-    db = SessionLocal()
+# bcrypt en procesos propios; los intentos fallidos se limitan por username y por IP
+pool_contrasenas = PoolContrasenas(
+    AUTH_HASH_WORKERS, AUTH_HASH_MAX_PENDIENTES, AUTH_HASH_MAX_ESPERA, AUTH_HASH_NICE,
+)
+fallos_usuario = LimitadorIntentos(AUTH_MAX_FALLOS_USUARIO, AUTH_VENTANA_FALLOS)
+fallos_ip = LimitadorIntentos(AUTH_MAX_FALLOS_IP, AUTH_VENTANA_FALLOS)
+
+def _ip_cliente(request: Request):
+    """
+    IP pública del cliente, o None. Detrás del proxy de Railway la IP real llega por
+    X-Forwarded-For (uvicorn --proxy-headers, ver Procfile); si se ve una IP privada es la
+    del proxy y limitar por ella bloquearía a todos los usuarios a la vez.
+    """
+    host = request.client.host if request.client else None
     try:
+        return host if ipaddress.ip_address(host).is_global else None
+    except (TypeError, ValueError):
+        return None
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 @router.post("/login")
-def login(response: Response, form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(Usuario).filter(Usuario.username == form.username).first()
-    if not user or not user.verify_password(form.password):
+async def login(
+    request: Request,
+    response: Response,
+    form: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    # Demasiados fallos recientes para este usuario o esta IP: se corta antes de bcrypt
+    ip = _ip_cliente(request)
+    espera = max(fallos_usuario.espera(form.username), fallos_ip.espera(ip) if ip else 0)
+    if espera > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiados intentos fallidos, intenta más tarde",
+            headers={"Retry-After": str(math.ceil(espera))},
+        )
+
+    user = (await db.execute(select(Usuario).where(Usuario.username == form.username))).scalars().first()
+    try:
+        valido = user is not None and await pool_contrasenas.verificar(form.password, user.password_hash)
+    except PoolSaturado as e:
+        # Sin capacidad para verificar: se rechaza rápido en vez de encolar sin límite
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servicio ocupado, intenta nuevamente",
+            headers={"Retry-After": "1"},
+        ) from e
+
+    if not valido:
+        fallos_usuario.registrar_fallo(form.username)
+        if ip:
+            fallos_ip.registrar_fallo(ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales inválidas",
             headers={"WWW-Authenticate": "Bearer"},
         )
-
+    fallos_usuario.reiniciar(form.username)
 
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Usuario inactivo")
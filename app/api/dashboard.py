@@ -1,52 +1,119 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from app.db.database import SessionLocal
-from app.db.models import Evaluacion
-from sqlalchemy import func
-from app.schemas.input_data import EvaluacionResponse, DatosDashboardResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import AsyncSessionLocal
+from app.db.models import Evaluacion, ResumenDiario
+from sqlalchemy import String, and_, case, cast, func, literal, or_, select, tuple_, union_all
+from app.schemas.input_data import EvaluacionResponse, DatosDashboardResponse, TendenciaResponse
+from app.core.dashboard_settings import (
+    DASHBOARD_QCHAT_SCORES_LEGACY, DASHBOARD_USAR_RESUMEN, DASHBOARD_TOTALES_TTL, DASHBOARD_TOTALES_CACHE_SIZE,
+    DASHBOARD_CACHE_TTL, DASHBOARD_CACHE_SIZE,
+)
+from app.utils.cache import CacheLRU
+from app.db.resumen_diario import LIMA, a_hora_lima, desde_clave, inicio_dia
+from app.db.version_datos import version_evaluaciones
 from app.db.models import Usuario
 from app.api.deps_auth import get_current_user
-from datetime import datetime
+from app.utils.metricas import etapa
+from datetime import datetime, time, timedelta
 from typing import Optional  # Importar Optional desde typing
+import asyncio
+import base64
+import hashlib
+import json
+from time import monotonic
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
-# Dependencia para obtener la sesión de base de datos
-def get_db():
-    db = SessionLocal()
-    try:
+# Dependencia para obtener la sesión (async) de base de datos
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
-
-@router.get("/evaluaciones", response_model=dict)
-def list_evaluaciones(
-    start_date: datetime = Query(None),  # Filtro de fecha de inicio
-    end_date: datetime = Query(None),    # Filtro de fecha de fin
-    tiene_tea: Optional[bool] = Query(None),  # Filtro de TEA (True/False)
-    skip: int = Query(0),                # Paginación: Saltar los primeros N elementos
-    limit: int = Query(5),              # Paginación: Limitar a 10 elementos por página
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)  # Validación del usuario autenticado
-):
-    query = db.query(Evaluacion)
 
-    # Filtro por fecha
+def _filtros(start_date, end_date, tiene_tea):
+    condiciones = []
+    # Filtro por fecha (sin zona horaria = hora de Lima)
     if start_date:
-        query = query.filter(Evaluacion.hora_inicio >= start_date)
+        condiciones.append(Evaluacion.hora_inicio >= a_hora_lima(start_date))
     # Filtro por fecha de fin
     if end_date:
         # Asegurarse de que la fecha de fin incluya hasta el final del día (23:59:59)
         end_date = end_date.replace(hour=23, minute=59, second=59)
-        query = query.filter(Evaluacion.hora_fin <= end_date)
-
+        condiciones.append(Evaluacion.hora_fin <= a_hora_lima(end_date))
     # Filtro por TEA
     if tiene_tea is not None:
         tea_value = 'Si' if tiene_tea else 'No'
-        query = query.filter(Evaluacion.rasgos_tea == tea_value)
+        condiciones.append(Evaluacion.rasgos_tea == tea_value)
+    return condiciones
+
+
+def _clave_filtros(start_date, end_date, tiene_tea):
+    # Misma clave para filtros equivalentes (sin zona = hora de Lima; la fecha de fin se lleva a las 23:59:59)
+    if end_date:
+        end_date = end_date.replace(hour=23, minute=59, second=59)
+    return (
+        a_hora_lima(start_date).isoformat() if start_date else None,
+        a_hora_lima(end_date).isoformat() if end_date else None,
+        tiene_tea,
+    )
+
+
+# Respuestas del dashboard por (endpoint, versión de datos, filtros normalizados, ...)
+cache_respuestas = CacheLRU(DASHBOARD_CACHE_SIZE, DASHBOARD_CACHE_TTL)
+
+
+def _serializar(contenido) -> bytes:
+    # Igual que JSONResponse: el ETag se calcula sobre los bytes que se envían
+    with etapa("dashboard_serializar"):
+        return json.dumps(
+            jsonable_encoder(contenido), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+def _etag(cuerpo: bytes) -> str:
+    return '"' + hashlib.sha256(cuerpo).hexdigest()[:32] + '"'
+
+
+def _etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    # Comparación débil (RFC 9110): W/"x" y "x" son el mismo ETag
+    if not if_none_match:
+        return False
+    candidatos = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+    return "*" in candidatos or etag in candidatos
+
+
+def _respuesta_json(request: Request, cuerpo: bytes, etag: str) -> Response:
+    # El cliente revalida siempre; si su copia sigue vigente recibe 304 sin cuerpo
+    cabeceras = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cabeceras)
+    return Response(content=cuerpo, media_type="application/json", headers=cabeceras)
+
+# Orden estable del listado: más recientes primero, id como desempate
+ORDEN_LISTADO = (Evaluacion.hora_fin.desc(), Evaluacion.id.desc())
+
+
+def _codificar_cursor(hora_fin, evaluacion_id, direccion):
+    datos = {"f": hora_fin.isoformat(), "i": evaluacion_id, "d": direccion}
+    return base64.urlsafe_b64encode(json.dumps(datos, separators=(",", ":")).encode()).rstrip(b"=").decode()
+
 
-    # Seleccionar solo las columnas necesarias
-    query = query.with_entities(
+def _decodificar_cursor(cursor: str):
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        direccion = datos["d"]
+        if direccion not in ("sig", "ant"):
+            raise ValueError(direccion)
+        return datetime.fromisoformat(datos["f"]), int(datos["i"]), direccion
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Cursor inválido") from e
+
+
+async def _pagina_listado(db: AsyncSession, start_date, end_date, tiene_tea, skip, limit, cursor) -> dict:
+    """Filas de una página del listado y los cursores hacia las páginas vecinas."""
+    # Seleccionar solo las columnas necesarias, con los filtros de fecha y TEA
+    query = select(
         Evaluacion.id,
         Evaluacion.hora_fin,
         Evaluacion.edad,
@@ -57,85 +124,404 @@ def list_evaluaciones(
         Evaluacion.perfil_clinico,
         Evaluacion.rasgos_tea,
         Evaluacion.nivel_confianza
-    )
+    ).where(*_filtros(start_date, end_date, tiene_tea))
 
-    # Paginación
-    evaluaciones = query.offset(skip).limit(limit).all()
+    # Paginación: por cursor (keyset sobre (hora_fin, id)) o con skip/limit
+    clave = tuple_(Evaluacion.hora_fin, Evaluacion.id)
+    if cursor:
+        hora_fin, evaluacion_id, direccion = _decodificar_cursor(cursor)
+        if direccion == "sig":
+            query = query.where(clave < tuple_(hora_fin, evaluacion_id)).order_by(*ORDEN_LISTADO)
+        else:
+            # Página anterior: se recorre en orden inverso y luego se voltea
+            query = query.where(clave > tuple_(hora_fin, evaluacion_id)).order_by(
+                Evaluacion.hora_fin.asc(), Evaluacion.id.asc()
+            )
+    else:
+        query = query.order_by(*ORDEN_LISTADO).offset(skip)
+
+    # Una fila extra indica si hay más en esa dirección
+    with etapa("dashboard_listado"):
+        evaluaciones = (await db.execute(query.limit(limit + 1))).all()
+    hay_mas = len(evaluaciones) > limit
+    evaluaciones = evaluaciones[:limit]
+    if cursor and direccion == "ant":
+        evaluaciones.reverse()
+
+    if cursor:
+        hay_siguiente = hay_mas if direccion == "sig" else True
+        hay_anterior = hay_mas if direccion == "ant" else True
+    else:
+        hay_siguiente, hay_anterior = hay_mas, skip > 0
+
+    siguiente_cursor = anterior_cursor = None
+    if evaluaciones:
+        if hay_siguiente:
+            siguiente_cursor = _codificar_cursor(evaluaciones[-1].hora_fin, evaluaciones[-1].id, "sig")
+        if hay_anterior:
+            anterior_cursor = _codificar_cursor(evaluaciones[0].hora_fin, evaluaciones[0].id, "ant")
 
     # Convertir las filas de SQLAlchemy a un formato que FastAPI pueda manejar
     evaluaciones_dict = [EvaluacionResponse.from_orm(evaluacion).dict() for evaluacion in evaluaciones]
 
-    # Contar el total de evaluaciones sin los filtros de paginación
-    total_evaluaciones = query.count()
+    return {
+        "evaluaciones": evaluaciones_dict,
+        "siguiente_cursor": siguiente_cursor,
+        "anterior_cursor": anterior_cursor,
+    }
+
+
+@router.get("/evaluaciones", response_model=dict)
+async def list_evaluaciones(
+    request: Request,
+    start_date: datetime = Query(None),  # Filtro de fecha de inicio
+    end_date: datetime = Query(None),    # Filtro de fecha de fin
+    tiene_tea: Optional[bool] = Query(None),  # Filtro de TEA (True/False)
+    skip: int = Query(0),                # Paginación: Saltar los primeros N elementos
+    limit: int = Query(5),              # Paginación: Limitar a 10 elementos por página
+    cursor: Optional[str] = Query(None),  # Paginación por cursor (siguiente_cursor / anterior_cursor); ignora skip
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)  # Validación del usuario autenticado
+):
+    if limit < 1:
+        raise HTTPException(status_code=422, detail="limit debe ser mayor que 0")
+
+    # La página se cachea hasta la próxima inserción (o el TTL); con cursor, skip no cuenta
+    clave = (
+        "listado", version_evaluaciones.actual, _clave_filtros(start_date, end_date, tiene_tea),
+        cursor, 0 if cursor else skip, limit,
+    )
+    pagina = cache_respuestas.get(clave)
+    if pagina is None:
+        pagina = await _pagina_listado(db, start_date, end_date, tiene_tea, skip, limit, cursor)
+        cache_respuestas.set(clave, pagina)
+
+    # Total de evaluaciones filtradas: cacheado y refrescado en segundo plano, no un COUNT por página
+    total_evaluaciones = await _total_evaluaciones(db, start_date, end_date, tiene_tea)
 
     # Calcular el total de páginas
     total_paginas = (total_evaluaciones // limit) + (1 if total_evaluaciones % limit > 0 else 0)
 
-    return {
-        "evaluaciones": evaluaciones_dict,
+    cuerpo = _serializar({
+        "evaluaciones": pagina["evaluaciones"],
         "total": total_evaluaciones,
-        "total_paginas": total_paginas
-    }
+        "total_paginas": total_paginas,
+        "siguiente_cursor": pagina["siguiente_cursor"],
+        "anterior_cursor": pagina["anterior_cursor"],
+    })
+    return _respuesta_json(request, cuerpo, _etag(cuerpo))
 
 @router.get("/evaluacion/{evaluacion_id}")
-def get_evaluacion_detallada(
+async def get_evaluacion_detallada(
     evaluacion_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)  # Validación del usuario autenticado
 ):
-    evaluacion = db.query(Evaluacion).filter(Evaluacion.id == evaluacion_id).first()
+    evaluacion = await db.get(Evaluacion, evaluacion_id)
 
     if not evaluacion:
         raise HTTPException(status_code=404, detail="Evaluación no encontrada")
 
     return {"evaluacion": evaluacion}
 
-@router.get("/dashboard/datos", response_model=DatosDashboardResponse)
-def obtener_datos_dashboard(
+# Dimensiones agregadas por el dashboard: nombre -> columna
+DIMENSIONES = {
+    "perfil": Evaluacion.perfil_clinico,
+    "tea": Evaluacion.rasgos_tea,
+    "sexo": Evaluacion.sexo,
+    "qchat": Evaluacion.qchat_resultado,
+}
+
+# Puntajes posibles de Q-CHAT-10
+QCHAT_MAX = 10
+
+
+def _consulta_agregados(filtros, dialecto: str):
+    """
+    Una sola sentencia con los conteos de todas las dimensiones, como filas
+    (dimension, valor, cantidad). En PostgreSQL es un GROUPING SETS (una pasada
+    sobre la tabla); en otros motores, un UNION ALL de GROUP BY.
+    """
+    # pylint: disable=E1102
+    if dialecto == "postgresql":
+        columnas = list(DIMENSIONES.values())
+        dimension = case(
+            *[(func.grouping(col) == 0, literal(nombre)) for nombre, col in DIMENSIONES.items()]
+        )
+        valor = case(
+            *[(func.grouping(col) == 0, cast(col, String)) for col in columnas]
+        )
+        return (
+            select(dimension.label("dimension"), valor.label("valor"), func.count().label("cantidad"))
+            .where(*filtros)
+            .group_by(func.grouping_sets(*columnas))
+        )
+
+    return union_all(*[
+        select(literal(nombre).label("dimension"), cast(col, String).label("valor"), func.count().label("cantidad"))
+        .where(*filtros)
+        .group_by(col)
+        for nombre, col in DIMENSIONES.items()
+    ])
+
+
+async def _agregados(db: AsyncSession, filtros) -> dict:
+    """Conteos por dimensión: {"perfil": {valor: cantidad}, ...}, en un solo viaje a la BD."""
+    agregados = {nombre: {} for nombre in DIMENSIONES}
+    with etapa("dashboard_agregados"):
+        filas = (await db.execute(_consulta_agregados(filtros, db.bind.dialect.name))).all()
+    for dimension, valor, cantidad in filas:
+        agregados[dimension][valor] = agregados[dimension].get(valor, 0) + cantidad
+    return agregados
+
+
+def _limite_local(valor: datetime, dialecto: str) -> datetime:
+    # Hora de Lima del límite; SQLite compara la hora de pared tal como se guardó
+    valor = a_hora_lima(valor)
+    if dialecto == "sqlite":
+        return valor.replace(tzinfo=None)
+    return valor.astimezone(LIMA)
+
+
+def _particion_rango(start_date, end_date, dialecto: str):
+    """
+    Parte el rango en días completos (se leen del resumen diario) y bordes
+    (horas sueltas del primer o último día, que se leen de evaluaciones).
+    Devuelve (condiciones sobre el resumen, condiciones alternativas de los bordes).
+    Las tres partes son disjuntas: el resumen cubre hora_inicio >= primer día completo
+    y hora_fin < día siguiente al último día completo.
+    """
+    condiciones_resumen, bordes = [], []
+
+    inicio_completo = None
+    if start_date:
+        inicio = _limite_local(start_date, dialecto)
+        primer_dia = inicio.date() if inicio.time() == time() else inicio.date() + timedelta(days=1)
+        inicio_completo = inicio_dia(primer_dia, dialecto)
+        condiciones_resumen.append(ResumenDiario.dia >= primer_dia)
+        if inicio < inicio_completo:
+            bordes.append(Evaluacion.hora_inicio < inicio_completo)
+
+    if end_date:
+        fin = _limite_local(end_date.replace(hour=23, minute=59, second=59), dialecto)
+        ultimo_dia = fin.date() if fin.time() >= time(23, 59, 59) else fin.date() - timedelta(days=1)
+        fin_completo = inicio_dia(ultimo_dia + timedelta(days=1), dialecto)
+        condiciones_resumen.append(ResumenDiario.dia_fin <= ultimo_dia)
+        if fin >= fin_completo:
+            # El límite no cae al final de un día de Lima (p. ej. end_date con otra zona horaria)
+            borde = [Evaluacion.hora_fin >= fin_completo]
+            if inicio_completo is not None:
+                borde.append(Evaluacion.hora_inicio >= inicio_completo)
+            bordes.append(and_(*borde))
+
+    return condiciones_resumen, bordes
+
+
+async def _agregados_resumen(db: AsyncSession, start_date, end_date, tiene_tea) -> dict:
+    """Mismos conteos que _agregados(), leyendo los días completos del resumen diario."""
+    # pylint: disable=E1102
+    condiciones, bordes = _particion_rango(start_date, end_date, db.bind.dialect.name)
+    if tiene_tea is not None:
+        condiciones.append(ResumenDiario.rasgos_tea == ('Si' if tiene_tea else 'No'))
+
+    claves = [ResumenDiario.perfil_clinico, ResumenDiario.rasgos_tea, ResumenDiario.sexo, ResumenDiario.qchat_resultado]
+    with etapa("dashboard_resumen"):
+        filas = (await db.execute(
+            select(*claves, func.sum(ResumenDiario.cantidad)).where(*condiciones).group_by(*claves)
+        )).all()
+
+    # Solo los días parciales se cuentan sobre la tabla cruda
+    if bordes:
+        agregados = await _agregados(db, _filtros(start_date, end_date, tiene_tea) + [or_(*bordes)])
+    else:
+        agregados = {nombre: {} for nombre in DIMENSIONES}
+
+    for perfil, tea, sexo, qchat, cantidad in filas:
+        qchat = desde_clave(qchat)
+        for dimension, valor in (
+            ("perfil", desde_clave(perfil)), ("tea", desde_clave(tea)),
+            ("sexo", desde_clave(sexo)), ("qchat", None if qchat is None else str(qchat)),
+        ):
+            agregados[dimension][valor] = agregados[dimension].get(valor, 0) + int(cantidad)
+    return agregados
+
+
+async def _contar(db: AsyncSession, start_date, end_date, tiene_tea) -> int:
+    """Evaluaciones que cumplen los filtros: días completos desde el resumen, bordes desde la tabla."""
+    # pylint: disable=E1102
+    filtros = _filtros(start_date, end_date, tiene_tea)
+    with etapa("dashboard_total"):
+        if not DASHBOARD_USAR_RESUMEN:
+            return await db.scalar(select(func.count()).select_from(Evaluacion).where(*filtros))
+
+        condiciones, bordes = _particion_rango(start_date, end_date, db.bind.dialect.name)
+        if tiene_tea is not None:
+            condiciones.append(ResumenDiario.rasgos_tea == ('Si' if tiene_tea else 'No'))
+        total = await db.scalar(select(func.coalesce(func.sum(ResumenDiario.cantidad), 0)).where(*condiciones))
+        if bordes:
+            total += await db.scalar(select(func.count()).select_from(Evaluacion).where(*filtros, or_(*bordes)))
+        return int(total)
+
+
+# Totales del listado por (versión de datos, filtros): clave -> (calculado_en, total). Una inserción en
+# este proceso cambia la versión y el total se recalcula; el TTL acota lo insertado por otros workers
+cache_totales = CacheLRU(DASHBOARD_TOTALES_CACHE_SIZE)
+_refrescos_en_curso = {}  # clave -> tarea
+
+
+async def _refrescar_total(clave, start_date, end_date, tiene_tea):
+    try:
+        async with AsyncSessionLocal() as db:
+            total = await _contar(db, start_date, end_date, tiene_tea)
+        cache_totales.set(clave, (monotonic(), total))
+    except Exception as e:
+        print(f"No se pudo refrescar el total del listado: {e}")
+    finally:
+        _refrescos_en_curso.pop(clave, None)
+
+
+async def _total_evaluaciones(db: AsyncSession, start_date, end_date, tiene_tea) -> int:
+    """
+    Total cacheado por filtros. Si está vencido se devuelve el valor anterior y se
+    recalcula en segundo plano (stale-while-revalidate); solo la primera vez se espera.
+    """
+    clave = (version_evaluaciones.actual, _clave_filtros(start_date, end_date, tiene_tea))
+    entrada = cache_totales.get(clave)
+    if entrada is None:
+        total = await _contar(db, start_date, end_date, tiene_tea)
+        cache_totales.set(clave, (monotonic(), total))
+        return total
+
+    calculado_en, total = entrada
+    if monotonic() - calculado_en >= DASHBOARD_TOTALES_TTL and clave not in _refrescos_en_curso:
+        _refrescos_en_curso[clave] = asyncio.create_task(_refrescar_total(clave, start_date, end_date, tiene_tea))
+    return total
+
+
+def _histograma_qchat(conteos: dict) -> list:
+    # Bins fijos 0..10; valores nulos o fuera de rango no entran al histograma
+    histograma = [0] * (QCHAT_MAX + 1)
+    for valor, cantidad in conteos.items():
+        if valor is not None and 0 <= int(valor) <= QCHAT_MAX:
+            histograma[int(valor)] += cantidad
+    return histograma
+
+
+def _ordenados(conteos: dict) -> list:
+    return sorted(conteos.items(), key=lambda par: (par[0] is None, par[0] or ""))
+
+
+@router.get("/dashboard/datos", response_model=DatosDashboardResponse, response_model_exclude_none=True)
+async def obtener_datos_dashboard(
+    request: Request,
     start_date: datetime = Query(None),  # Filtro de fecha de inicio
     end_date: datetime = Query(None),    # Filtro de fecha de fin
     tiene_tea: Optional[bool] = Query(None),  # Filtro de TEA (True/False)
-    db: Session = Depends(get_db),
+    qchat_scores: Optional[bool] = Query(None),  # Incluir la lista de puntajes (por defecto según DASHBOARD_QCHAT_SCORES_LEGACY)
+    db: AsyncSession = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)  # Validación del usuario autenticado
 ):
-    # Normalizar la fecha de fin para incluir todo el día
-    if end_date:
-        end_date = end_date.replace(hour=23, minute=59, second=59)  # Aseguramos que se considere todo el día
+    incluir_scores = DASHBOARD_QCHAT_SCORES_LEGACY if qchat_scores is None else qchat_scores
+
+    # Respuesta ya serializada y su ETag: un sondeo sin inserciones nuevas no llega a la BD
+    clave = (
+        "datos", version_evaluaciones.actual, _clave_filtros(start_date, end_date, tiene_tea),
+        incluir_scores, DASHBOARD_USAR_RESUMEN,
+    )
+    entrada = cache_respuestas.get(clave)
+    if entrada is None:
+        datos = await _datos_dashboard(db, start_date, end_date, tiene_tea, incluir_scores)
+        cuerpo = _serializar(datos.model_dump(exclude_none=True))
+        entrada = (cuerpo, _etag(cuerpo))
+        cache_respuestas.set(clave, entrada)
+    return _respuesta_json(request, *entrada)
+
+
+async def _datos_dashboard(db: AsyncSession, start_date, end_date, tiene_tea, incluir_scores) -> DatosDashboardResponse:
+    # Filtros por fecha (la fecha de fin incluye todo el día) y TEA
+    filtros = _filtros(start_date, end_date, tiene_tea)
+
+    # Perfil, TEA, sexo y Q-CHAT: días completos desde el resumen diario, el resto en una sola consulta
+    if DASHBOARD_USAR_RESUMEN:
+        agregados = await _agregados_resumen(db, start_date, end_date, tiene_tea)
+    else:
+        agregados = await _agregados(db, filtros)
+    histograma = _histograma_qchat(agregados["qchat"])
+
+    # Retornar los datos de los gráficos en el formato adecuado
+    return DatosDashboardResponse(
+        perfil_tea=_ordenados(agregados["perfil"]),  # Datos para el gráfico de barras
+        qchat_histograma=histograma,  # Conteo por puntaje de QCHAT (0 a 10)
+        # Lista de puntajes expandida desde el histograma (mismo multiconjunto, sin traer filas)
+        qchat_scores=[p for p, n in enumerate(histograma) for _ in range(n)] if incluir_scores else None,
+        tea_pastel=_ordenados(agregados["tea"]),  # Datos para el gráfico de pastel TEA vs No TEA
+        sexo_pastel=_ordenados(agregados["sexo"])  # Datos para el gráfico de pastel por sexo
+    )
+
 
-    # Base query
-    query = db.query(Evaluacion)
+def _periodo(dia, granularidad: str):
+    # Las semanas empiezan el lunes; los meses se identifican por su primer día
+    if granularidad == "semana":
+        return dia - timedelta(days=dia.weekday())
+    if granularidad == "mes":
+        return dia.replace(day=1)
+    return dia
 
-    # Filtros por fecha y TEA
+
+@router.get("/tendencia", response_model=TendenciaResponse)
+async def obtener_tendencia(
+    granularidad: str = Query("dia", pattern="^(dia|semana|mes)$"),  # Agrupación de la serie
+    start_date: datetime = Query(None),  # Primer día (de hora_inicio, hora de Lima)
+    end_date: datetime = Query(None),    # Último día incluido
+    tiene_tea: Optional[bool] = Query(None),  # Filtro de TEA (True/False)
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)  # Validación del usuario autenticado
+):
+    # pylint: disable=E1102
+    dialecto = db.bind.dialect.name
+    condiciones = []
     if start_date:
-        query = query.filter(Evaluacion.hora_inicio >= start_date)
+        condiciones.append(ResumenDiario.dia >= _limite_local(start_date, dialecto).date())
     if end_date:
-        query = query.filter(Evaluacion.hora_fin <= end_date)
+        condiciones.append(ResumenDiario.dia <= _limite_local(end_date, dialecto).date())
     if tiene_tea is not None:
-        tea_value = 'Si' if tiene_tea else 'No'
-        query = query.filter(Evaluacion.rasgos_tea == tea_value)
-    # pylint: disable=E1102
-    # 1. Diagrama de barras para perfil de TEA detectado (perfil_clinico)
-    perfil_tea = query.with_entities(Evaluacion.perfil_clinico, func.count(Evaluacion.id).label('count')) \
-                      .group_by(Evaluacion.perfil_clinico) \
-                      .all()
-
-    # 2. Histograma con puntaje de QCHAT 10 (qchat_resultado)
-    qchat_scores = query.with_entities(Evaluacion.qchat_resultado).all()
+        condiciones.append(ResumenDiario.rasgos_tea == ('Si' if tiene_tea else 'No'))
 
-    # 3. Gráfico de pastel para cantidad de niños con TEA y sin TEA detectados
-    tea_pastel = query.with_entities(Evaluacion.rasgos_tea, func.count(Evaluacion.id).label('count')) \
-                       .group_by(Evaluacion.rasgos_tea) \
-                       .all()
+    with etapa("dashboard_tendencia"):
+        filas = (await db.execute(
+            select(
+                ResumenDiario.dia,
+                ResumenDiario.rasgos_tea,
+                func.sum(ResumenDiario.cantidad),
+                func.sum(ResumenDiario.suma_nivel_confianza),
+                func.sum(ResumenDiario.suma_duracion_minutos),
+            )
+            .where(*condiciones)
+            .group_by(ResumenDiario.dia, ResumenDiario.rasgos_tea)
+            .order_by(ResumenDiario.dia)
+        )).all()
 
-    # 4. Gráfico de pastel para cantidad de niños por sexo
-    sexo_pastel = query.with_entities(Evaluacion.sexo, func.count(Evaluacion.id).label('count')) \
-                        .group_by(Evaluacion.sexo) \
-                        .all()
+    # Serie por periodo: [total, con TEA, sin TEA, suma confianza, suma duración]
+    serie = {}
+    for dia, tea, cantidad, confianza, duracion in filas:
+        punto = serie.setdefault(_periodo(dia, granularidad), [0, 0, 0, 0.0, 0])
+        punto[0] += cantidad
+        punto[1] += cantidad if tea == "Si" else 0
+        punto[2] += cantidad if tea == "No" else 0
+        punto[3] += float(confianza or 0)
+        punto[4] += int(duracion or 0)
 
-    # Retornar los datos de los gráficos en el formato adecuado
-    return DatosDashboardResponse(
-        perfil_tea=perfil_tea,  # Datos para el gráfico de barras
-        qchat_scores=[score[0] for score in qchat_scores],  # Puntajes de QCHAT
-        tea_pastel=tea_pastel,  # Datos para el gráfico de pastel TEA vs No TEA
-        sexo_pastel=sexo_pastel  # Datos para el gráfico de pastel por sexo
-    )
\ No newline at end of file
+    return TendenciaResponse(
+        granularidad=granularidad,
+        serie=[
+            {
+                "periodo": periodo,
+                "total": total,
+                "con_tea": con_tea,
+                "sin_tea": sin_tea,
+                "nivel_confianza_promedio": round(confianza / total, 4),
+                "duracion_promedio_minutos": round(duracion / total, 2),
+            }
+            for periodo, (total, con_tea, sin_tea, confianza, duracion) in serie.items()
+        ],
+    )
@@ -1,26 +1,30 @@
 # app/api/deps_auth.py
 from typing import Optional, Tuple
 from datetime import datetime, timezone
+import hashlib
 
 from fastapi import Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordBearer
-from app.core.auth_settings import COOKIE_NAME, COOKIE_MAX_AGE, SAMESITE, SECURE_COOKIE, RENEW_THRESHOLD_SECONDS
+from app.core.auth_settings import (
+    COOKIE_NAME, COOKIE_MAX_AGE, SAMESITE, SECURE_COOKIE, RENEW_THRESHOLD_SECONDS,
+    AUTH_TOKEN_CACHE_SIZE, AUTH_USER_CACHE_SIZE, AUTH_USER_CACHE_TTL,
+)
 from jose import jwt, JWTError
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.database import SessionLocal
+from app.db.database import AsyncSessionLocal
 from app.db.models import Usuario
+from app.utils.cache import CacheLRU
 from app.utils.security import SECRET_KEY, ALGORITHM, create_access_token
 
 # Permite que falte el header Authorization para poder usar cookie como fallback
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 def _decode_token_return_sub_exp(token: str) -> Tuple[str, int]:
     """
@@ -40,11 +44,73 @@ def _decode_token_return_sub_exp(token: str) -> Tuple[str, int]:
             headers={"WWW-Authenticate": "Bearer"},
         ) from exc
 
-def get_current_user(
+# Tokens ya verificados: sha256(token) -> (sub, exp). Cada entrada vence junto con su token
+cache_tokens = CacheLRU(AUTH_TOKEN_CACHE_SIZE)
+
+# Usuarios por username: columnas del registro (sin password_hash)
+cache_usuarios = CacheLRU(AUTH_USER_CACHE_SIZE, AUTH_USER_CACHE_TTL)
+_COLUMNAS_USUARIO = [c.key for c in Usuario.__table__.columns if c.key != "password_hash"]
+
+
+def _verificar_token(token: str) -> Tuple[str, int]:
+    """Como _decode_token_return_sub_exp, pero sin repetir el HMAC de un token ya verificado."""
+    clave = hashlib.sha256(token.encode()).digest()
+    verificado = cache_tokens.get(clave)
+    if verificado is not None:
+        return verificado
+
+    sub, exp_ts = _decode_token_return_sub_exp(token)
+    restante = exp_ts - datetime.now(timezone.utc).timestamp()
+    if restante > 0:
+        cache_tokens.set(clave, (sub, exp_ts), ttl_segundos=restante)
+    return sub, exp_ts
+
+
+async def _cargar_usuario(db: AsyncSession, username: str) -> Optional[Usuario]:
+    datos = cache_usuarios.get(username)
+    if datos is None:
+        user = (await db.execute(select(Usuario).where(Usuario.username == username))).scalars().first()
+        if user is None:
+            return None
+        datos = {columna: getattr(user, columna) for columna in _COLUMNAS_USUARIO}
+        cache_usuarios.set(username, datos)
+    # Instancia nueva (transitoria) por request: nadie comparte ni modifica el objeto cacheado
+    return Usuario(**datos)
+
+
+@event.listens_for(Usuario, "after_update")
+@event.listens_for(Usuario, "after_delete")
+def _invalidar_usuario(mapper, connection, target):
+    # Usuario modificado o borrado con el ORM (también el username anterior si cambió)
+    historia = inspect(target).attrs.username.history
+    for username in (target.username, *historia.deleted):
+        cache_usuarios.pop(username)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidar_usuarios_masivo(estado):
+    # UPDATE/DELETE masivos (update(Usuario)...): no se sabe qué filas tocan, se vacía la cache
+    if (estado.is_update or estado.is_delete) and any(
+        m.class_ is Usuario for m in estado.all_mappers
+    ):
+        cache_usuarios.clear()
+
+
+def estadisticas_cache() -> dict:
+    return {
+        "tokens": cache_tokens.estadisticas(),
+        "usuarios": cache_usuarios.estadisticas(),
+        # Cada acierto es una verificación HMAC o un SELECT a usuario que no se hizo
+        "verificaciones_evitadas": cache_tokens.aciertos,
+        "consultas_evitadas": cache_usuarios.aciertos,
+    }
+
+
+async def get_current_user(
     request: Request,
     response: Response,
     bearer: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Usuario:
     # 1) Cookie HTTPOnly (preferente)
     token = request.cookies.get(COOKIE_NAME)
@@ -60,10 +126,10 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    username, exp_ts = _decode_token_return_sub_exp(token)
+    username, exp_ts = _verificar_token(token)
 
-    # Carga del usuario
-    user = db.query(Usuario).filter(Usuario.username == username).first()
+    # Carga del usuario (cacheada por username)
+    user = await _cargar_usuario(db, username)
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.db.database import AsyncSessionLocal
+from app.db.exportacion import FormatoNoDisponible, consulta_exportacion, crear_escritor, exportar_async
+from app.db.models import Usuario
+from app.api.dashboard import _filtros
+from app.api.deps_auth import get_current_user
+from app.core.dashboard_settings import EXPORTACION_LOTE
+from datetime import datetime
+from typing import Optional
+
+router = APIRouter(prefix="/exportar", tags=["exportar"])
+
+
+@router.get("/evaluaciones")
+async def exportar_evaluaciones(
+    formato: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),  # Formato del archivo
+    start_date: datetime = Query(None),  # Mismos filtros que el dashboard
+    end_date: datetime = Query(None),
+    tiene_tea: Optional[bool] = Query(None),
+    desde_id: Optional[int] = Query(None, ge=0),  # Retomar una exportación: solo ids mayores
+    current_user: Usuario = Depends(get_current_user)  # Validación del usuario autenticado
+):
+    try:
+        escritor = crear_escritor(formato)
+    except FormatoNoDisponible as e:
+        raise HTTPException(status_code=501, detail=str(e)) from e
+
+    consulta = consulta_exportacion(_filtros(start_date, end_date, tiene_tea), desde_id)
+    # La sesión la abre el generador: vive lo mismo que la respuesta en streaming
+    return StreamingResponse(
+        exportar_async(AsyncSessionLocal, consulta, escritor, EXPORTACION_LOTE),
+        media_type=escritor.media_type,
+        headers={"Content-Disposition": f'attachment; filename="evaluaciones.{escritor.extension}"'},
+    )
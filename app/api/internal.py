@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from app.db.models import Usuario
+from app.api.deps_auth import get_current_user
+from app.model.registry import registro
+from app.model.predictor import cache_predicciones
+from app.db.escritor_diferido import escritor_evaluaciones
+from app.utils.email_sender import cola_correo
+from app.db.pool_telemetria import telemetria_sync, telemetria_async
+from app.db.version_datos import version_evaluaciones
+from app.api.dashboard import cache_respuestas, cache_totales
+from app.api.deps_auth import estadisticas_cache
+from app.api.auth import pool_contrasenas, fallos_usuario, fallos_ip
+from app.utils.perfilador import perfilador
+from app.utils.memoria import memoria
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+@router.get("/modelo")
+def info_modelo(current_user: Usuario = Depends(get_current_user)):
+    # Versión, checksums y tiempo de carga de los artefactos en memoria
+    return {**registro.info(), "cache_predicciones": cache_predicciones.estadisticas()}
+
+@router.post("/modelo/recargar")
+def recargar_modelo(current_user: Usuario = Depends(get_current_user)):
+    recargado = registro.recargar_si_cambio()
+    return {"recargado": recargado, **registro.info()}
+
+@router.get("/escritor")
+def info_escritor(current_user: Usuario = Depends(get_current_user)):
+    # Estado de la escritura diferida de evaluaciones (cola, lotes, reintentos)
+    return escritor_evaluaciones.estadisticas()
+
+@router.get("/pool")
+def info_pool(current_user: Usuario = Depends(get_current_user)):
+    # Uso de los pools de conexiones: espera en checkout, overflow, invalidaciones, reconexiones
+    return {"sync": telemetria_sync.estadisticas(), "async": telemetria_async.estadisticas()}
+
+@router.get("/dashboard")
+def info_dashboard(current_user: Usuario = Depends(get_current_user)):
+    # Caches de respuestas y totales del dashboard, y la versión de datos que las invalida
+    return {
+        "version_datos": version_evaluaciones.actual,
+        "cache_respuestas": cache_respuestas.estadisticas(),
+        "cache_totales": cache_totales.estadisticas(),
+    }
+
+@router.get("/auth")
+def info_auth(current_user: Usuario = Depends(get_current_user)):
+    # Aciertos de las caches de tokens y usuarios; pool de bcrypt y bloqueos por intentos fallidos
+    return {
+        **estadisticas_cache(),
+        "pool_contrasenas": pool_contrasenas.estadisticas(),
+        "fallos_usuario": fallos_usuario.estadisticas(),
+        "fallos_ip": fallos_ip.estadisticas(),
+    }
+
+@router.get("/correo")
+def info_correo(current_user: Usuario = Depends(get_current_user)):
+    # Cola de envío de informes PDF: pendientes, reintentos, fallidos, conexiones SMTP abiertas
+    return cola_correo.estadisticas()
+
+@router.get("/perfiles")
+def listar_perfiles(current_user: Usuario = Depends(get_current_user)):
+    # Requests perfilados: primero los más lentos sobre el umbral, luego los muestreados más recientes
+    return {**perfilador.estadisticas(), "perfiles": [perfil.resumen() for perfil in perfilador.perfiles()]}
+
+@router.get("/perfiles/{perfil_id}", response_class=PlainTextResponse)
+def descargar_perfil(perfil_id: str, current_user: Usuario = Depends(get_current_user)):
+    # Pilas colapsadas ("hilo;funcion;funcion N") para flamegraph.pl o speedscope
+    perfil = perfilador.obtener(perfil_id)
+    if perfil is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil no encontrado")
+    return PlainTextResponse(
+        perfil.colapsado(),
+        headers={"Content-Disposition": f'attachment; filename="perfil-{perfil.id}.txt"'},
+    )
+
+@router.delete("/perfiles")
+def limpiar_perfiles(current_user: Usuario = Depends(get_current_user)):
+    perfilador.limpiar()
+    return {"ok": True}
+
+@router.post("/memoria/snapshot")
+def snapshot_memoria(
+    agrupar: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limite: int = Query(20, ge=1, le=200),
+    current_user: Usuario = Depends(get_current_user),
+):
+    # Inicia tracemalloc (si no estaba) y guarda la base para /memoria/diff
+    return memoria.tomar_base(agrupar, limite)
+
+@router.get("/memoria/diff")
+def diff_memoria(
+    agrupar: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limite: int = Query(20, ge=1, le=200),
+    actualizar: bool = False,
+    current_user: Usuario = Depends(get_current_user),
+):
+    # Crecimiento de memoria desde la base, por línea, archivo o traza; actualizar=true mueve la base
+    resultado = memoria.diferencia(agrupar, limite, actualizar)
+    if resultado is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Primero tome un snapshot base")
+    return resultado
+
+@router.delete("/memoria")
+def detener_memoria(current_user: Usuario = Depends(get_current_user)):
+    # Apaga tracemalloc y libera su sobrecarga
+    memoria.detener()
+    return {"ok": True}
@@ -0,0 +1,32 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps_auth import get_current_user, get_db, oauth2_scheme
+from app.core.metrics_settings import METRICS_TOKEN
+from app.utils.metricas import metricas
+
+router = APIRouter(tags=["metricas"])
+
+TIPO_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def autorizar_metricas(
+    request: Request,
+    response: Response,
+    bearer: Optional[str] = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+):
+    # Prometheus se autentica con METRICS_TOKEN; si no coincide, vale una sesión de usuario normal
+    if METRICS_TOKEN and bearer and hmac.compare_digest(bearer.encode(), METRICS_TOKEN.encode()):
+        return None
+    return await get_current_user(request, response, bearer, db)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def exponer_metricas(autorizado=Depends(autorizar_metricas)):
+    # Histogramas por ruta y por etapa, requests en curso y errores (formato de texto de Prometheus)
+    return PlainTextResponse(metricas.exponer(), media_type=TIPO_PROMETHEUS)
@@ -0,0 +1,79 @@
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+router = APIRouter(prefix="/health", tags=["salud"])
+
+
+class EstadoArranque:
+    """
+    Fases del arranque (lifespan de app.main) con su duración. uvicorn acepta conexiones después
+    de las fases críticas (base, modelos, pools): desde ahí el proceso está vivo. Está listo cuando
+    termina además el precalentamiento, que corre en segundo plano.
+    """
+
+    def __init__(self):
+        self.estado = "iniciando"  # iniciando | listo | error | deteniendo
+        self.importacion_ms = None
+        self.fases = {}
+        self.error = None
+        self._inicio = None
+        self.arranque_ms = None
+        self._lock = threading.Lock()
+
+    @property
+    def listo(self) -> bool:
+        return self.estado == "listo"
+
+    def comenzar(self):
+        self._inicio = perf_counter()
+
+    @contextmanager
+    def fase(self, nombre: str):
+        inicio = perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.estado = "error"
+            self.error = f"{nombre}: {e}"
+            raise
+        finally:
+            with self._lock:
+                self.fases[nombre] = round((perf_counter() - inicio) * 1000, 1)
+
+    def terminar(self):
+        self.arranque_ms = round((perf_counter() - self._inicio) * 1000, 1)
+        self.estado = "listo"
+
+    def detener(self):
+        self.estado = "deteniendo"
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                "estado": self.estado,
+                "importacion_ms": self.importacion_ms,
+                "arranque_ms": self.arranque_ms,
+                "fases_ms": dict(self.fases),
+                "error": self.error,
+            }
+
+
+estado_arranque = EstadoArranque()
+
+
+@router.get("/live")
+def vivo():
+    # Liveness: el proceso responde (no consulta la base ni los modelos)
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def listo():
+    # Readiness: precalentamiento terminado (modelo, pool de la base, resumen diario); 503 mientras
+    # precalienta o si una fase falló
+    codigo = status.HTTP_200_OK if estado_arranque.listo else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(estado_arranque.resumen(), status_code=codigo)
@@ -0,0 +1,105 @@
+# app/cli/exportar.py
+"""
+Exporta la tabla evaluaciones a CSV, NDJSON o Parquet con un cursor del servidor.
+
+    python -m app.cli.exportar --formato ndjson --salida evaluaciones.ndjson
+    python -m app.cli.exportar --formato csv --salida evaluaciones.csv --start-date 2025-01-01 --tiene-tea si
+    python -m app.cli.exportar --formato csv --salida evaluaciones.csv --continuar   # retoma tras un corte
+
+--continuar (CSV y NDJSON) lee el último id completo del archivo, descarta una
+última línea a medias y agrega desde ahí. --desde-id N exporta solo ids mayores a N.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from app.api.dashboard import _filtros
+from app.core.dashboard_settings import EXPORTACION_LOTE
+from app.db.database import SessionLocal
+from app.db.exportacion import COLUMNAS, FORMATOS, consulta_exportacion, crear_escritor, exportar
+
+
+def _ultima_linea_completa(ruta: Path):
+    """Última línea terminada en \\n del archivo; recorta lo que quedó a medio escribir."""
+    with open(ruta, "rb+") as f:
+        tamano = f.seek(0, 2)
+        leido, posicion = b"", tamano
+        # Se lee desde el final hasta tener una línea completa (o todo el archivo)
+        while posicion > 0:
+            paso = min(64 * 1024, posicion)
+            posicion -= paso
+            f.seek(posicion)
+            leido = f.read(paso) + leido
+            if leido.count(b"\n") >= 2:
+                break
+        lineas = leido.split(b"\n")
+        parcial = lineas[-1]
+        if parcial:
+            f.truncate(tamano - len(parcial))
+        if len(lineas) < 2:
+            return None
+        return lineas[-2].decode("utf-8")
+
+
+def ultimo_id(ruta: Path, formato: str):
+    """Id de la última fila completa de una exportación previa (None si no hay filas)."""
+    if not ruta.exists() or ruta.stat().st_size == 0:
+        return None
+    linea = _ultima_linea_completa(ruta)
+    if not linea:
+        return None
+    if formato == "ndjson":
+        return json.loads(linea)["id"]
+    valor = linea.split(",", 1)[0]
+    if valor == COLUMNAS[0]:  # solo el encabezado
+        return None
+    return int(valor)
+
+
+def _booleano(valor: str) -> bool:
+    if valor.lower() in ("si", "sí", "true", "1"):
+        return True
+    if valor.lower() in ("no", "false", "0"):
+        return False
+    raise argparse.ArgumentTypeError("usar si o no")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta evaluaciones en streaming")
+    parser.add_argument("--formato", choices=FORMATOS, default="csv")
+    parser.add_argument("--salida", default="-", help="archivo de salida ('-' = stdout)")
+    parser.add_argument("--start-date", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--end-date", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--tiene-tea", type=_booleano, default=None)
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--desde-id", type=int, default=None)
+    grupo.add_argument("--continuar", action="store_true", help="retoma desde el último id del archivo de salida")
+    parser.add_argument("--lote", type=int, default=EXPORTACION_LOTE)
+    args = parser.parse_args(argv)
+
+    desde_id, agregar = args.desde_id, False
+    if args.continuar:
+        if args.formato == "parquet" or args.salida == "-":
+            parser.error("--continuar solo aplica a CSV o NDJSON en un archivo")
+        ruta = Path(args.salida)
+        desde_id = ultimo_id(ruta, args.formato)
+        # Sin filas previas se reescribe desde cero (con encabezado)
+        agregar = ruta.exists() and ruta.stat().st_size > 0
+
+    escritor = crear_escritor(args.formato, encabezado=not agregar)
+    consulta = consulta_exportacion(_filtros(args.start_date, args.end_date, args.tiene_tea), desde_id)
+
+    salida = sys.stdout.buffer if args.salida == "-" else open(args.salida, "ab" if agregar else "wb")
+    try:
+        with SessionLocal() as db:
+            filas, ultimo = exportar(db, consulta, escritor, args.lote, salida)
+    finally:
+        if salida is not sys.stdout.buffer:
+            salida.close()
+    print(f"Exportadas {filas} evaluaciones (último id: {ultimo if ultimo is not None else desde_id})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
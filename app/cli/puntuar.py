@@ -0,0 +1,301 @@
+# app/cli/puntuar.py
+"""
+Puntúa tamizajes de un archivo CSV o JSONL con el mismo pipeline que /predict
+(DataPreprocessor → predecir), sin HTTP y sin escribir en la base de datos.
+
+    python -m app.cli.puntuar tamizajes.csv --salida resultados.csv
+    python -m app.cli.puntuar socios.jsonl --salida resultados.ndjson --workers 4 --errores errores.jsonl
+
+Entrada:
+- CSV: 25 columnas en el orden de CAMPOS. Si la primera fila es un encabezado con
+  los nombres de CAMPOS, las columnas se toman por nombre (en cualquier orden).
+- JSONL: una línea por registro, como lista de 25 valores, {"values": [...]} o un
+  objeto con las claves de CAMPOS.
+
+El archivo se lee por bloques (--lote) que se reparten entre procesos (--workers);
+cada proceso carga los modelos una sola vez al arrancar. Los resultados se escriben
+en el orden de entrada a medida que terminan los bloques. Una fila inválida se
+reporta con su número de línea y no detiene la corrida.
+"""
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+
+from app.core.model_settings import MODEL_ENGINE, MODEL_PATH, PCA_MODEL_PATH
+from app.model.campos import CAMPOS, N_NUMERICOS
+from app.model.predictor import evaluar_registros
+from app.model.registry import RegistroModelos
+
+COLUMNAS_SALIDA = [
+    "linea", "clase_predicha", "riesgo_autismo",
+    "edad", "sexo", *[f"a{i}" for i in range(1, 11)], "qchat_resultado",
+    "trastorno_habla", "trastorno_aprendizaje", "trastorno_genetico", "trastorno_depresion",
+    "retraso_global_intelectual", "problemas_comportamiento", "trastorno_ansiedad", "familiar_autista",
+    "porc_comorbilidad", "porc_deficiencia_social_interactiva", "porc_deficiencia_comunicativa",
+    "perfil_clinico", "rasgos_tea", "nivel_confianza", "hora_inicio", "hora_fin", "duracion_minutos",
+]
+FORMATOS_SALIDA = ("csv", "ndjson")
+MAX_ERRORES_EN_PANTALLA = 20
+
+# Modelos del proceso worker: se cargan una vez en _iniciar_worker
+_modelos = None
+
+
+def _iniciar_worker(ruta_modelo: str, ruta_pca: str, motor: str):
+    global _modelos
+    _modelos = RegistroModelos(ruta_modelo, ruta_pca, 0, motor).cargar()
+
+
+def _numero(valor):
+    # El CSV trae texto: los 23 campos numéricos se convierten como lo haría el JSON de /predict
+    if not isinstance(valor, str):
+        return valor
+    texto = valor.strip()
+    try:
+        return int(texto)
+    except ValueError:
+        pass
+    try:
+        return float(texto)
+    except ValueError:
+        return valor  # DataPreprocessor lo reporta como registro inválido
+
+
+def _duracion_minutos(fila):
+    diferencia = fila["hora_fin"] - fila["hora_inicio"]
+    return math.ceil(diferencia.total_seconds() / 60)
+
+
+def _puntuar_bloque(bloque):
+    """
+    bloque: [(linea, valores)], donde valores es la lista del registro o el texto
+    de un error de lectura. Devuelve (salidas, errores) con el número de línea.
+    """
+    salidas, errores, lineas, registros = [], [], [], []
+    for linea, valores in bloque:
+        if isinstance(valores, str):
+            errores.append({"linea": linea, "error": valores})
+            continue
+        lineas.append(linea)
+        registros.append([_numero(v) for v in valores[:N_NUMERICOS]] + list(valores[N_NUMERICOS:]))
+
+    resultados, errores_registro, filas = evaluar_registros(registros, modelos=_modelos)
+    errores.extend({"linea": lineas[e["indice"]], "error": e["error"]} for e in errores_registro)
+    for resultado, fila in zip(resultados, filas):
+        try:
+            duracion = _duracion_minutos(fila)
+        except TypeError as e:  # p. ej. una hora con zona y otra sin zona
+            errores.append({"linea": lineas[resultado["indice"]], "error": f"Registro inválido: {e}"})
+            continue
+        salidas.append({
+            "linea": lineas[resultado["indice"]],
+            "clase_predicha": resultado["clase_predicha"],
+            "riesgo_autismo": resultado["riesgo_autismo"],
+            **fila,
+            "duracion_minutos": duracion,
+        })
+    errores.sort(key=lambda e: e["linea"])
+    return salidas, errores
+
+
+def _leer_csv(archivo):
+    lector = csv.reader(archivo)
+    orden = None
+    for numero, fila in enumerate(lector, start=1):
+        if not fila:
+            continue
+        if numero == 1 and set(CAMPOS) <= {c.strip() for c in fila}:
+            # Encabezado: columnas por nombre
+            posiciones = {c.strip(): i for i, c in enumerate(fila)}
+            orden = [posiciones[c] for c in CAMPOS]
+            continue
+        if orden is not None:
+            if max(orden) >= len(fila):
+                yield numero, f"Se esperaban {len(orden)} columnas y la fila tiene {len(fila)}"
+                continue
+            fila = [fila[i] for i in orden]
+        yield numero, fila
+
+
+def _leer_jsonl(archivo):
+    for numero, linea in enumerate(archivo, start=1):
+        if not linea.strip():
+            continue
+        try:
+            registro = json.loads(linea)
+        except json.JSONDecodeError as e:
+            yield numero, f"JSON inválido: {e}"
+            continue
+        if isinstance(registro, dict):
+            if "values" in registro:
+                registro = registro["values"]
+            else:
+                faltantes = [c for c in CAMPOS if c not in registro]
+                if faltantes:
+                    yield numero, f"Faltan campos: {', '.join(faltantes)}"
+                    continue
+                registro = [registro[c] for c in CAMPOS]
+        if not isinstance(registro, list):
+            yield numero, "Se esperaba una lista de 25 valores o un objeto"
+            continue
+        yield numero, registro
+
+
+def _bloques(registros, tamano: int):
+    bloque = []
+    for registro in registros:
+        bloque.append(registro)
+        if len(bloque) >= tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def _texto(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return valor
+
+
+class _Salida:
+    """Escribe las filas puntuadas en CSV o NDJSON."""
+
+    def __init__(self, archivo, formato: str):
+        self.archivo = archivo
+        self.formato = formato
+        if formato == "csv":
+            self._csv = csv.writer(archivo, lineterminator="\n")
+            self._csv.writerow(COLUMNAS_SALIDA)
+
+    def escribir(self, filas):
+        if self.formato == "csv":
+            self._csv.writerows([_texto(fila[c]) for c in COLUMNAS_SALIDA] for fila in filas)
+        else:
+            self.archivo.write("".join(
+                json.dumps({c: _texto(fila[c]) for c in COLUMNAS_SALIDA}, ensure_ascii=False) + "\n"
+                for fila in filas
+            ))
+        self.archivo.flush()
+
+
+def puntuar(entrada, formato_entrada: str, salida, formato_salida: str, errores=None,
+            workers: int = 1, lote: int = 2000, ruta_modelo=MODEL_PATH, ruta_pca=PCA_MODEL_PATH,
+            motor: str = MODEL_ENGINE, progreso: float = 0) -> dict:
+    """
+    Puntúa todos los registros de `entrada` (archivo de texto abierto) y escribe en `salida`.
+    `errores` (opcional) recibe una línea JSON por fila inválida; sin él se muestran las
+    primeras en stderr. Devuelve el resumen de la corrida.
+    """
+    lector = _leer_csv(entrada) if formato_entrada == "csv" else _leer_jsonl(entrada)
+    escritor = _Salida(salida, formato_salida)
+    resumen = {"filas": 0, "puntuadas": 0, "errores": 0}
+    inicio = ultimo_reporte = time.perf_counter()
+
+    def registrar(salidas, errores_bloque):
+        escritor.escribir(salidas)
+        resumen["puntuadas"] += len(salidas)
+        for error in errores_bloque:
+            if errores is not None:
+                errores.write(json.dumps(error, ensure_ascii=False) + "\n")
+            elif resumen["errores"] < MAX_ERRORES_EN_PANTALLA:
+                print(f"línea {error['linea']}: {error['error']}", file=sys.stderr)
+            resumen["errores"] += 1
+
+    def reportar():
+        nonlocal ultimo_reporte
+        if progreso and time.perf_counter() - ultimo_reporte >= progreso:
+            ultimo_reporte = time.perf_counter()
+            segundos = ultimo_reporte - inicio
+            print(f"... {resumen['puntuadas']} filas puntuadas ({resumen['puntuadas'] / segundos:.0f} filas/s)",
+                  file=sys.stderr)
+
+    if workers <= 1:
+        _iniciar_worker(str(ruta_modelo), str(ruta_pca), motor)
+        for bloque in _bloques(lector, lote):
+            resumen["filas"] += len(bloque)
+            registrar(*_puntuar_bloque(bloque))
+            reportar()
+    else:
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=contexto,
+            initializer=_iniciar_worker, initargs=(str(ruta_modelo), str(ruta_pca), motor),
+        ) as pool:
+            # Pocos bloques en vuelo: la memoria no depende del tamaño del archivo y la salida conserva el orden
+            en_vuelo = deque()
+            for bloque in _bloques(lector, lote):
+                resumen["filas"] += len(bloque)
+                en_vuelo.append(pool.submit(_puntuar_bloque, bloque))
+                if len(en_vuelo) >= 2 * workers:
+                    registrar(*en_vuelo.popleft().result())
+                    reportar()
+            while en_vuelo:
+                registrar(*en_vuelo.popleft().result())
+                reportar()
+
+    resumen["segundos"] = round(time.perf_counter() - inicio, 3)
+    resumen["filas_por_segundo"] = round(resumen["filas"] / resumen["segundos"], 1) if resumen["segundos"] else 0.0
+    return resumen
+
+
+def _formato(ruta: str, explicito: str, opciones) -> str:
+    if explicito:
+        return explicito
+    sufijo = Path(ruta).suffix.lower().lstrip(".")
+    if sufijo in ("jsonl", "ndjson", "json"):
+        sufijo = opciones[1]
+    if sufijo not in opciones:
+        raise argparse.ArgumentTypeError(f"no se puede deducir el formato de {ruta!r}")
+    return sufijo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Puntúa tamizajes de un archivo sin pasar por la API")
+    parser.add_argument("entrada", help="archivo CSV o JSONL ('-' = stdin)")
+    parser.add_argument("--formato-entrada", choices=("csv", "jsonl"), default=None)
+    parser.add_argument("--salida", default="-", help="archivo de resultados ('-' = stdout)")
+    parser.add_argument("--formato-salida", choices=FORMATOS_SALIDA, default=None)
+    parser.add_argument("--errores", default=None, help="archivo JSONL con las filas inválidas")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="procesos de puntuación (1 = en este proceso)")
+    parser.add_argument("--lote", type=int, default=2000, help="registros por bloque")
+    parser.add_argument("--progreso", type=float, default=10, help="segundos entre reportes de avance (0 = sin avance)")
+    args = parser.parse_args(argv)
+
+    try:
+        formato_entrada = _formato(args.entrada, args.formato_entrada, ("csv", "jsonl"))
+        formato_salida = "csv" if args.salida == "-" and not args.formato_salida else \
+            _formato(args.salida, args.formato_salida, FORMATOS_SALIDA)
+    except argparse.ArgumentTypeError as e:
+        parser.error(f"{e}; usar --formato-entrada / --formato-salida")
+
+    entrada = sys.stdin if args.entrada == "-" else open(args.entrada, encoding="utf-8-sig", newline="")
+    salida = sys.stdout if args.salida == "-" else open(args.salida, "w", encoding="utf-8", newline="")
+    errores = open(args.errores, "w", encoding="utf-8") if args.errores else None
+    try:
+        resumen = puntuar(entrada, formato_entrada, salida, formato_salida, errores,
+                          workers=args.workers, lote=args.lote, progreso=args.progreso)
+    finally:
+        for archivo in (entrada, salida, errores):
+            if archivo is not None and archivo not in (sys.stdin, sys.stdout):
+                archivo.close()
+
+    print(
+        f"{resumen['filas']} filas: {resumen['puntuadas']} puntuadas, {resumen['errores']} con errores "
+        f"en {resumen['segundos']:.1f} s ({resumen['filas_por_segundo']:.0f} filas/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
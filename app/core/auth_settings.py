@@ -6,3 +6,24 @@ COOKIE_MAX_AGE = 15 * 60  # 15 min
 SAMESITE = os.getenv("COOKIE_SAMESITE", "lax")  # "lax" o "none"
 SECURE_COOKIE = os.getenv("ENV", "development") == "production"  # True en prod
 RENEW_THRESHOLD_SECONDS = int(os.getenv("RENEW_THRESHOLD_SECONDS", str(5 * 60)))
+
+# Cache de tokens ya verificados (hash del token -> sub, exp), válida hasta que el token vence
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+# Cache de usuarios por username: se invalida al modificar o borrar el usuario en este proceso;
+# el TTL acota lo que tarda en verse un cambio hecho en otro worker o por SQL directo. 0 = sin cache
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))  # segundos
+
+# bcrypt de /auth/login en un pool de procesos propio (no ocupa el threadpool ni compite por el GIL)
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", str(min(2, os.cpu_count() or 1))))
+# Verificaciones admitidas a la vez (en curso + en cola); las demás reciben 503
+AUTH_HASH_MAX_PENDIENTES = int(os.getenv("AUTH_HASH_MAX_PENDIENTES", str(4 * AUTH_HASH_WORKERS)))
+# Espera máxima de una verificación (cola + bcrypt) antes de responder 503
+AUTH_HASH_MAX_ESPERA = float(os.getenv("AUTH_HASH_MAX_ESPERA", "2"))  # segundos
+# Prioridad (nice) de los procesos de bcrypt: con CPU escasa, /predict y el dashboard van primero
+AUTH_HASH_NICE = int(os.getenv("AUTH_HASH_NICE", "10"))
+
+# Intentos fallidos de login permitidos por username y por IP dentro de la ventana (luego 429)
+AUTH_MAX_FALLOS_USUARIO = int(os.getenv("AUTH_MAX_FALLOS_USUARIO", "5"))
+AUTH_MAX_FALLOS_IP = int(os.getenv("AUTH_MAX_FALLOS_IP", "20"))
+AUTH_VENTANA_FALLOS = float(os.getenv("AUTH_VENTANA_FALLOS", "300"))  # segundos
@@ -0,0 +1,25 @@
+# app/core/dashboard_settings.py
+import os
+
+# Compatibilidad con el frontend actual: además de qchat_histograma, devolver la lista
+# qchat_scores (reconstruida desde el histograma). Se puede forzar por request con ?qchat_scores=
+# La lista tiene un elemento por evaluación: con 1M de filas son ~3 MiB por respuesta (ver
+# benchmarks/bench_dashboard.py). Desactivarla cuando el frontend lea qchat_histograma
+DASHBOARD_QCHAT_SCORES_LEGACY = os.getenv("DASHBOARD_QCHAT_SCORES_LEGACY", "true").lower() in ("1", "true", "yes")
+
+# Leer los días completos del rango desde evaluaciones_resumen_diario (false = siempre la tabla cruda)
+DASHBOARD_USAR_RESUMEN = os.getenv("DASHBOARD_USAR_RESUMEN", "true").lower() in ("1", "true", "yes")
+
+# Total del listado /dashboard/evaluaciones: cacheado por filtros y recalculado en segundo plano al vencer
+DASHBOARD_TOTALES_TTL = float(os.getenv("DASHBOARD_TOTALES_TTL", "30"))  # segundos
+DASHBOARD_TOTALES_CACHE_SIZE = int(os.getenv("DASHBOARD_TOTALES_CACHE_SIZE", "256"))
+
+# Cache de respuestas de /dashboard/dashboard/datos y /dashboard/evaluaciones por filtros normalizados.
+# Se invalida con cada inserción de evaluaciones (versión de datos); el TTL acota lo que tarda en verse
+# lo insertado por otros workers o por fuera de la API. DASHBOARD_CACHE_SIZE=0 la desactiva
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "30"))  # segundos
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", "512"))
+
+# Exportación masiva de evaluaciones (/exportar/evaluaciones y python -m app.cli.exportar):
+# filas por lote leídas del cursor del servidor y escritas de una vez (memoria constante)
+EXPORTACION_LOTE = int(os.getenv("EXPORTACION_LOTE", "1000"))
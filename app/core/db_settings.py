@@ -0,0 +1,31 @@
+# app/core/db_settings.py
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Escritura diferida (write-behind) de evaluaciones: /predict responde sin esperar el COMMIT
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() in ("1", "true", "yes")
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "200"))  # filas por INSERT
+WRITE_BEHIND_FLUSH_MS = float(os.getenv("WRITE_BEHIND_FLUSH_MS", "200"))  # espera máxima antes de escribir
+# Spool local (append-only) que respalda la cola en memoria; se reproduce al arrancar
+WRITE_BEHIND_SPOOL_PATH = Path(os.getenv("WRITE_BEHIND_SPOOL_PATH", str(BASE_DIR / "spool" / "evaluaciones.jsonl")))
+# fsync por cada escritura al spool: sobrevive también a un corte de energía, a costa de latencia
+WRITE_BEHIND_FSYNC = os.getenv("WRITE_BEHIND_FSYNC", "false").lower() in ("1", "true", "yes")
+
+# Pool de conexiones (se aplica al engine sync y al async; cada proceso tiene los suyos)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # segundos esperando una conexión libre
+# Reciclar conexiones antes de que el proxy de Railway las corte por inactividad (-1 = nunca)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Verificar la conexión al sacarla del pool; si el servidor la cerró se reconecta sin fallar el request
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Crear las tablas que falten al arrancar (create_all), sin Alembic: solo desarrollo y pruebas.
+# Desactivado, el arranque exige que la base esté en la última migración (`alembic upgrade head`)
+AUTO_CREATE_TABLES = os.getenv("AUTO_CREATE_TABLES", "false").lower() in ("1", "true", "yes")
+# Espera máxima (segundos) por el advisory lock con el que un solo worker crea tablas y el admin
+INIT_LOCK_TIMEOUT = float(os.getenv("INIT_LOCK_TIMEOUT", "60"))
+# Conexiones del pool async que se abren al arrancar, antes de declararse listo
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", "2"))
@@ -0,0 +1,16 @@
+# app/core/email_settings.py
+import os
+
+# Cola de envío de /enviar-pdf: trabajos en espera como máximo (luego 503)
+CORREO_MAX_COLA = int(os.getenv("CORREO_MAX_COLA", "100"))
+# Intentos por correo ante errores transitorios (red, 4xx) y espera inicial entre intentos (se duplica)
+CORREO_MAX_INTENTOS = int(os.getenv("CORREO_MAX_INTENTOS", "4"))
+CORREO_BACKOFF = float(os.getenv("CORREO_BACKOFF", "2"))  # segundos
+# La conexión SMTP se reutiliza entre correos y se cierra tras este tiempo sin envíos
+CORREO_INACTIVIDAD = float(os.getenv("CORREO_INACTIVIDAD", "60"))  # segundos
+
+# El PDF subido se guarda en memoria hasta este tamaño y luego en un temporal anónimo
+CORREO_SPOOL_MEMORIA = int(os.getenv("CORREO_SPOOL_MEMORIA", str(1024 * 1024)))
+CORREO_MAX_BYTES = int(os.getenv("CORREO_MAX_BYTES", str(10 * 1024 * 1024)))
+# Estados de envío consultables en /enviar-pdf/{trabajo_id} (se descartan los terminados más antiguos)
+CORREO_HISTORIAL = int(os.getenv("CORREO_HISTORIAL", "1000"))
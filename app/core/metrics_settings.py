@@ -0,0 +1,8 @@
+# app/core/metrics_settings.py
+import os
+
+# Middleware de tiempos por ruta y temporizadores de etapa (/predict, dashboard)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Token para que Prometheus lea /metrics (Authorization: Bearer <token>); sin él se exige un usuario autenticado
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
@@ -0,0 +1,21 @@
+# app/core/model_settings.py
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+MODEL_PATH = Path(os.getenv("MODEL_PATH", str(BASE_DIR / "model.pkl")))
+PCA_MODEL_PATH = Path(os.getenv("PCA_MODEL_PATH", str(BASE_DIR / "pca_model.pkl")))
+
+# Cada cuántos segundos se revisa si los artefactos cambiaron en disco (0 = sin recarga automática)
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "30"))
+
+# Motor de inferencia: "sklearn" (predict_proba de sklearn) o "kernel" (NumPy puro, app/model/svm_kernel.py)
+MODEL_ENGINE = os.getenv("MODEL_ENGINE", "sklearn").lower()
+
+# Cache LRU de predicciones por vector de características escalado (0 = desactivado)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))  # segundos
+
+# Hilos dedicados al trabajo de CPU del modelo (fuera del event loop y del threadpool de Starlette)
+MODEL_WORKERS = int(os.getenv("MODEL_WORKERS", str(min(4, os.cpu_count() or 1))))
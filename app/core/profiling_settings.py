@@ -0,0 +1,22 @@
+# app/core/profiling_settings.py
+import os
+
+# Perfilado de requests lentos (opt-in): un hilo toma muestras de las pilas de todos los hilos
+# mientras hay requests perfilados; los perfiles se descargan desde /internal/perfiles.
+# Costo: no se sabe de antemano qué request será lento, así que con PROFILING_THRESHOLD_MS > 0
+# cada request de PROFILING_RUTAS abre una sesión, y el muestreo (100 Hz con el intervalo por
+# defecto, ~0,3 ms de CPU por muestra: ~3 % de una CPU) corre siempre que haya tráfico en esas rutas
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+# Fracción de requests que se guardan aunque sean rápidos (0.01 = 1 %)
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+# Los requests que tardan al menos esto se guardan siempre (0 = solo la fracción muestreada)
+PROFILING_THRESHOLD_MS = float(os.getenv("PROFILING_THRESHOLD_MS", "1000"))
+# Perfiles guardados: los N más lentos sobre el umbral y los N muestreados más recientes
+PROFILING_MAX_PERFILES = int(os.getenv("PROFILING_MAX_PERFILES", "20"))
+# Intervalo entre muestras de las pilas (milisegundos)
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "10"))
+# Solo se perfilan las rutas con estos prefijos (vacío = todas)
+PROFILING_RUTAS = [r.strip() for r in os.getenv("PROFILING_RUTAS", "/predict,/dashboard").split(",") if r.strip()]
+
+# Frames guardados por asignación en los snapshots de tracemalloc (/internal/memoria)
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "10"))
@@ -0,0 +1,128 @@
+# app/db/arranque.py
+"""
+Inicialización de la base al arrancar (desde el lifespan de app.main, no al importar).
+
+0. El esquema debe estar en la última migración de Alembic (alembic_version = head); si no,
+   el arranque falla en vez de servir con tablas o índices de otra versión. Solo con
+   AUTO_CREATE_TABLES se admite una base sin alembic_version (desarrollo y pruebas).
+1. Verificación rápida sin lock: ¿están todas las tablas y el admin por defecto? Es el caso
+   normal de un worker más o de un reinicio, y cuesta un par de consultas.
+2. Si falta algo, un solo worker inicializa: toma un advisory lock de PostgreSQL, vuelve a
+   verificar (otro worker pudo terminar mientras esperaba), crea las tablas si
+   AUTO_CREATE_TABLES lo permite y crea el admin (el único bcrypt del arranque).
+   Si crea evaluaciones_resumen_diario, la llena con la historia en la misma transacción.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, select, text
+from sqlalchemy.orm import Session
+
+from app.core.db_settings import (
+    AUTO_CREATE_TABLES, BASE_DIR, DB_POOL_SIZE, DB_POOL_WARMUP, INIT_LOCK_TIMEOUT,
+)
+from app.db.database import Base, async_engine, engine
+from app.db.init_db import USUARIO_DEFAULT, crear_usuario_default
+from app.db.models import ResumenDiario, Usuario
+from app.db.resumen_diario import llenar_resumen
+
+# Clave del advisory lock de inicialización (constante compartida por todos los workers)
+CLAVE_BLOQUEO_INICIO = 7_311_025
+
+
+@contextmanager
+def bloqueo_inicializacion(conn, espera_maxima: float = INIT_LOCK_TIMEOUT):
+    """
+    Advisory lock de sesión en PostgreSQL. En SQLite (desarrollo local, un proceso) no hace
+    falta: CREATE TABLE IF NOT EXISTS y el manejo de IntegrityError del admin ya cubren la carrera.
+    """
+    if conn.dialect.name != "postgresql":
+        yield
+        return
+
+    limite = time.monotonic() + espera_maxima
+    while not conn.execute(text("SELECT pg_try_advisory_lock(:clave)"), {"clave": CLAVE_BLOQUEO_INICIO}).scalar():
+        if time.monotonic() >= limite:
+            raise TimeoutError(f"No se obtuvo el lock de inicialización en {espera_maxima:.0f} s")
+        time.sleep(0.2)
+    conn.commit()
+    try:
+        yield
+    finally:
+        conn.execute(text("SELECT pg_advisory_unlock(:clave)"), {"clave": CLAVE_BLOQUEO_INICIO})
+        conn.commit()
+
+
+def tablas_faltantes(conn) -> list:
+    existentes = set(inspect(conn).get_table_names())
+    return sorted(set(Base.metadata.tables) - existentes)
+
+
+def revision_esquema(conn) -> tuple:
+    """(revisión de Alembic de la base o None si nunca se migró, última revisión de migrations/)."""
+    actual = MigrationContext.configure(conn).get_current_revision()
+    return actual, ScriptDirectory(str(BASE_DIR / "migrations")).get_current_head()
+
+
+def verificar_revision(conn):
+    actual, esperada = revision_esquema(conn)
+    if actual == esperada or (actual is None and AUTO_CREATE_TABLES):
+        return
+    raise RuntimeError(
+        f"El esquema está en {actual or 'ninguna revisión'} y esta versión espera {esperada}: "
+        "ejecute `alembic upgrade head`"
+    )
+
+
+def _existe_admin(conn) -> bool:
+    consulta = select(Usuario.id).where(Usuario.username == USUARIO_DEFAULT["username"])
+    return conn.execute(consulta).first() is not None
+
+
+def preparar_base_de_datos(motor=engine) -> dict:
+    """Verifica el esquema y el admin por defecto; inicializa solo si falta algo. Devuelve qué hizo."""
+    with motor.connect() as conn:
+        verificar_revision(conn)
+        faltantes = tablas_faltantes(conn)
+        if not faltantes and _existe_admin(conn):
+            conn.rollback()
+            return {"inicializo": False, "tablas_creadas": []}
+        conn.rollback()
+
+        with bloqueo_inicializacion(conn):
+            faltantes = tablas_faltantes(conn)
+            if faltantes:
+                if not AUTO_CREATE_TABLES:
+                    raise RuntimeError(
+                        f"Faltan las tablas {', '.join(faltantes)}: ejecute `alembic upgrade head` "
+                        "o active AUTO_CREATE_TABLES"
+                    )
+                Base.metadata.create_all(bind=conn)
+                print(f"Tablas creadas: {', '.join(faltantes)}")
+                if ResumenDiario.__tablename__ in faltantes:
+                    # Antes del COMMIT: los upserts de otros workers no ven la tabla hasta que tenga la historia
+                    print(f"Resumen diario cargado: {llenar_resumen(conn)} filas")
+            conn.commit()
+
+            # Sesión propia (otra conexión del pool); el lock sigue tomado por conn
+            with Session(motor) as db:
+                crear_usuario_default(db)
+    return {"inicializo": True, "tablas_creadas": faltantes}
+
+
+async def precalentar_pool(conexiones: int = DB_POOL_WARMUP) -> int:
+    """
+    Abre varias conexiones del pool async a la vez (SELECT 1) y las devuelve al pool:
+    los primeros requests no pagan el connect ni el TLS hasta la base.
+    """
+    conexiones = min(conexiones, DB_POOL_SIZE)
+
+    async def abrir():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(abrir() for _ in range(conexiones)))
+    return conexiones
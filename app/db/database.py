@@ -1,19 +1,82 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base, sessionmaker
 from dotenv import load_dotenv
 
 # Cargar variables de entorno desde el archivo .env
 load_dotenv()
 
+from app.core.db_settings import (
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+)
+from app.db.pool_telemetria import clase_pool_medida, telemetria_sync, telemetria_async
+
 # Leer la URL de conexión a PostgreSQL
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
+
+def _opciones_pool(url, telemetria, asincrono=False) -> dict:
+    """Configuración del pool desde el entorno, con el checkout instrumentado."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # SQLite en memoria usa un pool de una sola conexión; no aplica QueuePool
+        return {}
+    return {
+        "poolclass": clase_pool_medida(telemetria, asincrono),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
 # Crear el engine de SQLAlchemy
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_opciones_pool(SQLALCHEMY_DATABASE_URL, telemetria_sync))
+telemetria_sync.instalar(engine)
 
 # Configurar sesión
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _url_async(url: str):
+    """
+    Deriva la URL del driver async a partir de DATABASE_URL:
+    asyncpg para PostgreSQL y aiosqlite para SQLite local.
+    """
+    url = make_url(url)
+    connect_args = {}
+    backend = url.get_backend_name()
+
+    if backend == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+        # asyncpg no entiende sslmode (habitual en las URLs de Railway)
+        sslmode = url.query.get("sslmode")
+        if sslmode:
+            url = url.difference_update_query(["sslmode"])
+            if sslmode != "disable":
+                connect_args["ssl"] = sslmode
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+
+    return url, connect_args
+
+
+# Engine y sesiones async para los endpoints del camino caliente (/predict y dashboard)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+if ASYNC_DATABASE_URL:
+    _url, _connect_args = ASYNC_DATABASE_URL, {}
+else:
+    _url, _connect_args = _url_async(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(
+    _url, connect_args=_connect_args, **_opciones_pool(_url, telemetria_async, asincrono=True),
+)
+telemetria_async.instalar(async_engine.sync_engine)
+
+# expire_on_commit=False: los objetos siguen legibles después del commit sin otro SELECT
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Declarative Base
 Base = declarative_base()
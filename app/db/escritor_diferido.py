@@ -0,0 +1,452 @@
+# app/db/escritor_diferido.py
+import asyncio
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import DateTime, exc
+
+from app.core.db_settings import (
+    WRITE_BEHIND_BATCH_SIZE, WRITE_BEHIND_FLUSH_MS, WRITE_BEHIND_FSYNC, WRITE_BEHIND_SPOOL_PATH,
+)
+from app.db.database import AsyncSessionLocal
+from app.db.models import Evaluacion
+from app.db.resumen_diario import insertar_evaluaciones
+from app.db.version_datos import version_evaluaciones
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin flock; se asume un solo proceso (desarrollo local)
+    fcntl = None
+
+# Columnas que viajan como texto ISO en el spool y se reconstruyen al reproducirlo
+_COLUMNAS_FECHA = {c.name for c in Evaluacion.__table__.columns if isinstance(c.type, DateTime)}
+
+_FIN = object()  # marca de cierre en la cola
+
+
+def _serializar(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    raise TypeError(f"Tipo no serializable en el spool: {type(valor).__name__}")
+
+
+def _deserializar(linea: bytes) -> dict:
+    fila = json.loads(linea)
+    for columna in _COLUMNAS_FECHA & fila.keys():
+        if fila[columna] is not None:
+            fila[columna] = datetime.fromisoformat(fila[columna])
+    return fila
+
+
+def _ruta_offset(ruta_spool: Path) -> Path:
+    return ruta_spool.with_name(ruta_spool.name + ".offset")
+
+
+def _leer_offset(ruta_offset: Path) -> int:
+    try:
+        return int(ruta_offset.read_text().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def _bloquear(archivo, esperar: bool) -> bool:
+    """flock exclusivo sobre el archivo abierto; False si lo tiene otro proceso (que sigue vivo)."""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | (0 if esperar else fcntl.LOCK_NB))
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _sigue_enlazado(archivo, ruta: Path) -> bool:
+    # Otro proceso pudo adoptar y borrar el spool entre el open y el flock
+    try:
+        return os.stat(ruta).st_ino == os.fstat(archivo.fileno()).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def _es_error_transitorio(error: Exception) -> bool:
+    # Caída de la BD o de la red: se reintenta el mismo lote. Un error de datos no se arregla reintentando.
+    if isinstance(error, (exc.OperationalError, exc.InterfaceError, OSError, asyncio.TimeoutError)):
+        return True
+    return bool(getattr(error, "connection_invalidated", False))
+
+
+class EscritorDiferido:
+    """
+    Escritura diferida (write-behind) de evaluaciones.
+
+    Cada fila se agrega primero a un spool local append-only y luego a una cola en
+    memoria. Una tarea de fondo escribe la cola con INSERT multi-fila cada
+    `tam_lote` filas o cada `intervalo_ms`, lo que ocurra antes. Tras cada COMMIT
+    se guarda en `<spool>.offset` hasta qué byte del spool está confirmado; al
+    arrancar se reproduce lo que quedó después de ese offset. La entrega es
+    "al menos una vez": una caída entre el COMMIT y la escritura del offset
+    puede repetir ese último lote.
+
+    Cada proceso (worker de uvicorn) escribe su propio spool, `<stem>.<pid><sufijo>`, y lo
+    mantiene con flock mientras vive. Al arrancar se adoptan los spools sin flock (su
+    proceso ya terminó, o el spool único de versiones anteriores): lo pendiente se copia
+    al spool propio y el huérfano se borra.
+    """
+
+    def __init__(self, ruta_spool: Path, tam_lote: int = 200, intervalo_ms: float = 200,
+                 fsync: bool = False, sesiones=AsyncSessionLocal):
+        self.ruta_base = Path(ruta_spool)
+        self.ruta_rechazadas = self.ruta_base.with_name(self.ruta_base.stem + ".rechazadas.jsonl")
+        self.tam_lote = max(1, tam_lote)
+        self.intervalo = intervalo_ms / 1000
+        self.fsync = fsync
+        self.sesiones = sesiones
+
+        self._cola = None
+        self._lote_listo = None
+        self._tarea = None
+        self._spool = None
+        self._lock_spool = threading.Lock()
+        self._por_escribir = []  # (líneas, futuro) de los requests que esperan el próximo volcado
+        self._volcado = None
+        self.offset_confirmado = 0
+
+        self.encoladas = 0
+        self.escritas = 0
+        self.lotes = 0
+        self.reintentos = 0
+        self.rechazadas = 0
+        self.reproducidas = 0
+        self.adoptadas = 0
+        self.ultimo_error = None
+
+    @property
+    def activo(self) -> bool:
+        return self._tarea is not None and not self._tarea.done()
+
+    @property
+    def ruta_spool(self) -> Path:
+        return self.ruta_base.with_name(f"{self.ruta_base.stem}.{os.getpid()}{self.ruta_base.suffix}")
+
+    @property
+    def ruta_offset(self) -> Path:
+        return _ruta_offset(self.ruta_spool)
+
+    # ---------- spool y offset
+
+    def _guardar_offset(self, offset: int):
+        # Reemplazo atómico: el sidecar nunca queda a medio escribir
+        temporal = self.ruta_offset.with_name(self.ruta_offset.name + ".tmp")
+        temporal.write_text(str(offset))
+        os.replace(temporal, self.ruta_offset)
+        self.offset_confirmado = offset
+
+    def _huerfanos(self):
+        """Spools de otros pids y el spool único (sin pid) de versiones anteriores."""
+        base = self.ruta_base
+        patron = re.compile(rf"{re.escape(base.stem)}\.\d+{re.escape(base.suffix)}")
+        for ruta in sorted(base.parent.glob(f"{base.stem}.*{base.suffix}")):
+            if ruta.name != self.ruta_spool.name and patron.fullmatch(ruta.name):
+                yield ruta
+        if base.exists():
+            yield base
+
+    def _sin_dueno(self, ruta: Path) -> bool:
+        try:
+            with open(ruta, "rb") as archivo:
+                return _bloquear(archivo, esperar=False)
+        except FileNotFoundError:
+            return False
+
+    def tiene_pendientes(self) -> bool:
+        """Indica si el spool propio o uno huérfano tiene filas sin confirmar en la BD."""
+        for ruta in [self.ruta_spool, *self._huerfanos()]:
+            try:
+                pendiente = ruta.stat().st_size > _leer_offset(_ruta_offset(ruta))
+            except FileNotFoundError:
+                continue
+            if pendiente and (ruta == self.ruta_spool or self._sin_dueno(ruta)):
+                return True
+        return False
+
+    @staticmethod
+    def _lineas_pendientes(ruta: Path):
+        """Líneas completas posteriores al offset confirmado: (offset, [(fin_en_spool, línea)], fin_válido)."""
+        tamano = ruta.stat().st_size
+        offset = _leer_offset(_ruta_offset(ruta))
+        if offset > tamano:
+            # El spool se compactó pero no llegó a guardarse el offset 0
+            offset = 0
+
+        lineas = []
+        posicion = offset
+        with open(ruta, "rb") as f:
+            f.seek(offset)
+            for linea in f:
+                if not linea.endswith(b"\n"):
+                    break  # escritura interrumpida por una caída: se descarta la línea parcial
+                posicion += len(linea)
+                lineas.append((posicion, linea))
+        return offset, lineas, posicion
+
+    @staticmethod
+    def _filas(lineas, ruta: Path):
+        filas = []
+        for fin, linea in lineas:
+            try:
+                filas.append((fin, _deserializar(linea)))
+            except (ValueError, TypeError) as e:
+                print(f"Línea inválida en el spool ({ruta}), se omite: {e}")
+        return filas
+
+    def _abrir_spool_propio(self):
+        # flock durante toda la vida del proceso: marca el spool como de un proceso vivo
+        while True:
+            if not self.ruta_spool.exists():
+                self.ruta_offset.unlink(missing_ok=True)  # sidecar de un proceso anterior con el mismo pid
+            archivo = open(self.ruta_spool, "ab")
+            _bloquear(archivo, esperar=True)
+            if _sigue_enlazado(archivo, self.ruta_spool):
+                return archivo
+            archivo.close()  # otro worker lo adoptó entre el open y el flock: se crea de nuevo
+
+    def _leer_pendientes(self):
+        """Filas del spool propio posteriores al offset confirmado, como (fin_en_spool, fila)."""
+        offset, lineas, valido = self._lineas_pendientes(self.ruta_spool)
+        if valido < self._spool.seek(0, os.SEEK_END):
+            self._spool.truncate(valido)
+            self._spool.seek(valido)
+        self.offset_confirmado = offset
+        return self._filas(lineas, self.ruta_spool)
+
+    def _adoptar_huerfanos(self):
+        """Copia al spool propio lo pendiente de los spools sin dueño y los borra."""
+        adoptadas = []
+        for ruta in self._huerfanos():
+            try:
+                archivo = open(ruta, "rb")
+            except FileNotFoundError:
+                continue  # otro worker lo adoptó primero
+            with archivo:
+                if not _bloquear(archivo, esperar=False) or not _sigue_enlazado(archivo, ruta):
+                    continue  # su proceso sigue vivo, o ya fue adoptado
+                _, lineas, _ = self._lineas_pendientes(ruta)
+                for _, linea in lineas:
+                    self._spool.write(linea)
+                    adoptadas.append((self._spool.tell(), linea))
+                self._spool.flush()
+                os.fsync(self._spool.fileno())
+                # Ya a salvo en el spool propio: se borra el huérfano y después su offset
+                ruta.unlink()
+                _ruta_offset(ruta).unlink(missing_ok=True)
+            if lineas:
+                print(f"Adoptadas {len(lineas)} evaluaciones pendientes de {ruta.name}")
+        return self._filas(adoptadas, self.ruta_spool)
+
+    def _compactar(self):
+        # Todo lo escrito al spool ya está en la BD: se vacía para que no crezca sin límite.
+        # Sin esperar el lock: si hay un volcado en curso el spool ya tiene filas nuevas.
+        if not self._lock_spool.acquire(blocking=False):
+            return
+        try:
+            if self.offset_confirmado == self._spool.tell():
+                self._spool.truncate(0)
+                self._spool.seek(0)
+                self._guardar_offset(0)
+        finally:
+            self._lock_spool.release()
+
+    # ---------- ciclo de vida
+
+    async def iniciar(self):
+        if self.activo:
+            return
+        self.ruta_spool.parent.mkdir(parents=True, exist_ok=True)
+        self._cola = asyncio.Queue()
+        self._lote_listo = asyncio.Event()
+
+        self._spool = self._abrir_spool_propio()
+        pendientes = self._leer_pendientes()
+        adoptadas = self._adoptar_huerfanos()
+        pendientes += adoptadas
+        for item in pendientes:
+            self._cola.put_nowait(item)
+        self.reproducidas += len(pendientes)
+        self.adoptadas += len(adoptadas)
+        if pendientes:
+            print(f"Reproduciendo {len(pendientes)} evaluaciones pendientes del spool")
+
+        self._tarea = asyncio.create_task(self._bucle(), name="escritor-evaluaciones")
+
+    async def detener(self, timeout: float = 10):
+        """Vacía la cola en la BD y cierra el spool. Lo que no alcance a escribirse queda en el spool."""
+        if self._tarea is None:
+            return
+        if self._volcado is not None:
+            await self._volcado
+        self._cola.put_nowait(_FIN)
+        self._lote_listo.set()
+        try:
+            await asyncio.wait_for(self._tarea, timeout)
+        except asyncio.TimeoutError:
+            print(f"El escritor no terminó en {timeout}s; {self._cola.qsize()} filas quedan en el spool")
+        finally:
+            self._tarea = None
+            if self.offset_confirmado == self._spool.tell():
+                # Nada pendiente: el spool de este pid no queda en disco
+                self.ruta_spool.unlink(missing_ok=True)
+                self.ruta_offset.unlink(missing_ok=True)
+            self._spool.close()
+            self._spool = None
+
+    async def encolar(self, filas):
+        """Persiste las filas en el spool y las deja en cola para el próximo INSERT."""
+        if not self.activo:
+            raise RuntimeError("El escritor diferido no está iniciado")
+
+        lineas = [json.dumps(fila, default=_serializar).encode() + b"\n" for fila in filas]
+        futuro = asyncio.get_running_loop().create_future()
+        self._por_escribir.append((filas, lineas, futuro))
+        if self._volcado is None or self._volcado.done():
+            self._volcado = asyncio.create_task(self._volcar_spool(), name="spool-evaluaciones")
+        await futuro
+
+    async def _volcar_spool(self):
+        # Un write (y un fsync) por grupo de requests concurrentes, en un hilo: el event loop no espera el disco
+        while self._por_escribir:
+            grupo, self._por_escribir = self._por_escribir, []
+            try:
+                lineas = [linea for _, lineas_request, _ in grupo for linea in lineas_request]
+                posiciones = await asyncio.to_thread(self._escribir_spool, lineas)
+            except Exception as e:
+                for _, _, futuro in grupo:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+
+            filas = [fila for filas, _, _ in grupo for fila in filas]
+            for item in zip(posiciones, filas):
+                self._cola.put_nowait(item)
+            self.encoladas += len(filas)
+            # El bucle ya tomó la primera fila del lote en curso
+            if self._cola.qsize() >= self.tam_lote - 1:
+                self._lote_listo.set()
+            for _, _, futuro in grupo:
+                if not futuro.done():
+                    futuro.set_result(None)
+
+    def _escribir_spool(self, lineas) -> list:
+        posiciones = []
+        with self._lock_spool:
+            for linea in lineas:
+                self._spool.write(linea)
+                posiciones.append(self._spool.tell())
+            self._spool.flush()
+            if self.fsync:
+                os.fsync(self._spool.fileno())
+        return posiciones
+
+    # ---------- escritura a la BD
+
+    async def _bucle(self):
+        while True:
+            primero = await self._cola.get()
+            if primero is _FIN:
+                return
+
+            # Se espera a juntar un lote completo o a que pase el intervalo. Se espera
+            # un Event y no cola.get() con timeout, para no perder un ítem al cancelar.
+            if self._cola.qsize() < self.tam_lote - 1:
+                self._lote_listo.clear()
+                try:
+                    await asyncio.wait_for(self._lote_listo.wait(), self.intervalo)
+                except asyncio.TimeoutError:
+                    pass
+
+            lote = [primero]
+            terminar = False
+            while len(lote) < self.tam_lote and not self._cola.empty():
+                item = self._cola.get_nowait()
+                if item is _FIN:
+                    terminar = True
+                    break
+                lote.append(item)
+
+            await self._escribir(lote)
+            if terminar:
+                return
+
+    async def _insertar(self, filas):
+        async with self.sesiones() as db:
+            await insertar_evaluaciones(db, filas)
+            await db.commit()
+        version_evaluaciones.incrementar()
+
+    async def _escribir(self, lote):
+        espera = 0.5
+        while True:
+            try:
+                try:
+                    await self._insertar([fila for _, fila in lote])
+                except Exception as e:
+                    if _es_error_transitorio(e):
+                        raise
+                    self.ultimo_error = f"{type(e).__name__}: {e}"
+                    await self._escribir_por_fila(lote)
+                break
+            except Exception as e:
+                # BD caída: se reintenta el mismo lote; las filas siguen a salvo en el spool
+                self.ultimo_error = f"{type(e).__name__}: {e}"
+                self.reintentos += 1
+                print(f"Error al escribir {len(lote)} evaluaciones, reintento en {espera}s: {e}")
+                await asyncio.sleep(espera)
+                espera = min(espera * 2, 30)
+
+        self.escritas += len(lote)
+        self.lotes += 1
+        self._guardar_offset(lote[-1][0])
+        if self._cola.empty():
+            self._compactar()
+
+    async def _escribir_por_fila(self, lote):
+        # Un error de datos en el INSERT multi-fila: se aísla la fila culpable en vez de bloquear la cola
+        for _, fila in lote:
+            try:
+                await self._insertar([fila])
+            except Exception as e:
+                if _es_error_transitorio(e):
+                    raise
+                self.rechazadas += 1
+                print(f"Evaluación rechazada por la BD, se guarda en {self.ruta_rechazadas.name}: {e}")
+                with open(self.ruta_rechazadas, "ab") as f:
+                    f.write(json.dumps(fila, default=_serializar).encode() + b"\n")
+
+    def estadisticas(self) -> dict:
+        return {
+            "activo": self.activo,
+            "pendientes": self._cola.qsize() if self._cola is not None else 0,
+            "encoladas": self.encoladas,
+            "escritas": self.escritas,
+            "lotes": self.lotes,
+            "reintentos": self.reintentos,
+            "rechazadas": self.rechazadas,
+            "reproducidas": self.reproducidas,
+            "adoptadas": self.adoptadas,
+            "offset_confirmado": self.offset_confirmado,
+            "ultimo_error": self.ultimo_error,
+        }
+
+
+escritor_evaluaciones = EscritorDiferido(
+    WRITE_BEHIND_SPOOL_PATH,
+    tam_lote=WRITE_BEHIND_BATCH_SIZE,
+    intervalo_ms=WRITE_BEHIND_FLUSH_MS,
+    fsync=WRITE_BEHIND_FSYNC,
+)
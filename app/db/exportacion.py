@@ -0,0 +1,205 @@
+# app/db/exportacion.py
+"""
+Exportación de la tabla evaluaciones en CSV, NDJSON o Parquet, por lotes.
+
+Las filas se leen en orden de id con un cursor del servidor (yield_per /
+stream_results) y cada lote se codifica y se entrega apenas se lee: la memoria
+no depende del tamaño de la tabla. Como el orden es por id, una exportación
+cortada se retoma con desde_id = último id recibido.
+
+Parquet usa pyarrow (en requirements.txt). Se importa al pedir el primer Parquet, no al arrancar.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import (
+    BigInteger, Boolean, Date, DateTime, Integer, Numeric, SmallInteger, select,
+)
+
+from app.db.models import Evaluacion
+
+COLUMNAS = [c.name for c in Evaluacion.__table__.columns]
+FORMATOS = ("csv", "ndjson", "parquet")
+
+
+class FormatoNoDisponible(RuntimeError):
+    """El formato pedido necesita una dependencia opcional que no está instalada."""
+
+
+def consulta_exportacion(filtros, desde_id: int = None):
+    """Todas las columnas de evaluaciones, filtradas y ordenadas por id (a partir de desde_id, exclusivo)."""
+    consulta = select(*Evaluacion.__table__.columns).where(*filtros)
+    if desde_id is not None:
+        consulta = consulta.where(Evaluacion.id > desde_id)
+    return consulta.order_by(Evaluacion.id)
+
+
+def _texto(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+
+class EscritorCSV:
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self, encabezado: bool = True):
+        self.encabezado = encabezado
+
+    def _codificar(self, filas) -> bytes:
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer, lineterminator="\n")
+        escritor.writerows([_texto(v) for v in fila] for fila in filas)
+        return buffer.getvalue().encode("utf-8")
+
+    def inicio(self) -> bytes:
+        return self._codificar([COLUMNAS]) if self.encabezado else b""
+
+    def lote(self, filas) -> bytes:
+        return self._codificar(filas)
+
+    def fin(self) -> bytes:
+        return b""
+
+
+class EscritorNDJSON:
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def inicio(self) -> bytes:
+        return b""
+
+    def lote(self, filas) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(COLUMNAS, map(_texto, fila))), ensure_ascii=False) + "\n" for fila in filas
+        ).encode("utf-8")
+
+    def fin(self) -> bytes:
+        return b""
+
+
+class _Sumidero:
+    """Destino de pyarrow que guarda lo escrito hasta que se drena (lleva la posición absoluta)."""
+
+    closed = False
+
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def write(self, datos) -> int:
+        datos = bytes(datos)
+        self._partes.append(datos)
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self) -> int:
+        return self._posicion
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drenar(self) -> bytes:
+        datos, self._partes = b"".join(self._partes), []
+        return datos
+
+
+class EscritorParquet:
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise FormatoNoDisponible("La exportación a Parquet requiere pyarrow (pip install pyarrow)") from e
+        self._pa = pa
+        self._esquema = pa.schema([
+            pa.field(c.name, self._tipo(c.type), nullable=c.nullable) for c in Evaluacion.__table__.columns
+        ])
+        self._sumidero = _Sumidero()
+        # Un row group por lote: el archivo se entrega a medida que se escribe
+        self._escritor = pq.ParquetWriter(self._sumidero, self._esquema)
+
+    def _tipo(self, tipo):
+        pa = self._pa
+        if isinstance(tipo, SmallInteger):
+            return pa.int16()
+        if isinstance(tipo, BigInteger):
+            return pa.int64()
+        if isinstance(tipo, Integer):
+            return pa.int32()
+        if isinstance(tipo, Numeric):
+            return pa.decimal128(tipo.precision, tipo.scale)
+        if isinstance(tipo, DateTime):
+            return pa.timestamp("us", tz="UTC" if tipo.timezone else None)
+        if isinstance(tipo, Date):
+            return pa.date32()
+        if isinstance(tipo, Boolean):
+            return pa.bool_()
+        return pa.string()
+
+    def inicio(self) -> bytes:
+        return self._sumidero.drenar()
+
+    def lote(self, filas) -> bytes:
+        columnas = list(zip(*filas))
+        tabla = self._pa.Table.from_arrays(
+            [self._pa.array(valores, type=campo.type) for valores, campo in zip(columnas, self._esquema)],
+            schema=self._esquema,
+        )
+        self._escritor.write_table(tabla)
+        return self._sumidero.drenar()
+
+    def fin(self) -> bytes:
+        self._escritor.close()
+        return self._sumidero.drenar()
+
+
+def crear_escritor(formato: str, encabezado: bool = True):
+    if formato == "csv":
+        return EscritorCSV(encabezado)
+    if formato == "ndjson":
+        return EscritorNDJSON()
+    if formato == "parquet":
+        return EscritorParquet()
+    raise ValueError(f"Formato desconocido: {formato}")
+
+
+async def exportar_async(sesiones, consulta, escritor, tam_lote: int):
+    """Genera los bytes de la exportación lote a lote (para StreamingResponse)."""
+    inicio = escritor.inicio()
+    if inicio:
+        yield inicio
+    async with sesiones() as db:
+        resultado = await db.stream(consulta.execution_options(yield_per=tam_lote))
+        async for filas in resultado.partitions():
+            datos = escritor.lote(filas)
+            if datos:
+                yield datos
+    fin = escritor.fin()
+    if fin:
+        yield fin
+
+
+def exportar(db, consulta, escritor, tam_lote: int, salida) -> tuple:
+    """Escribe la exportación en `salida` (archivo binario). Devuelve (filas, último id)."""
+    total, ultimo_id = 0, None
+    salida.write(escritor.inicio())
+    resultado = db.execute(consulta.execution_options(yield_per=tam_lote))
+    for filas in resultado.partitions():
+        salida.write(escritor.lote(filas))
+        total += len(filas)
+        ultimo_id = filas[-1].id
+    salida.write(escritor.fin())
+    return total, ultimo_id
@@ -1,16 +1,26 @@
 from sqlalchemy import (
-    Column, Integer, SmallInteger, Text, String, Numeric, Boolean, CHAR, DateTime,
+    Column, Integer, SmallInteger, BigInteger, Text, String, Numeric, Boolean, CHAR, Date, DateTime,
     UniqueConstraint, Index, text, func
 )
 from datetime import datetime, timezone
 from sqlalchemy.orm import validates
-from passlib.context import CryptContext
 from .database import Base
+from app.utils.contrasenas import pwd_context
+
+# Columnas que devuelve /dashboard/evaluaciones (además de la clave hora_fin, id)
+COLUMNAS_LISTADO = [
+    "edad", "sexo", "qchat_resultado", "porc_deficiencia_social_interactiva",
+    "porc_deficiencia_comunicativa", "perfil_clinico", "rasgos_tea", "nivel_confianza",
+]
+# Columnas que leen los agregados del dashboard y el resumen diario
+COLUMNAS_AGREGADOS = [
+    "hora_fin", "rasgos_tea", "perfil_clinico", "sexo", "qchat_resultado", "nivel_confianza", "duracion_minutos",
+]
 
 class Evaluacion(Base):
     __tablename__ = "evaluaciones"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     edad = Column(SmallInteger)
     sexo = Column(CHAR(1))
 
@@ -53,12 +63,38 @@ class Evaluacion(Base):
     hora_fin = Column(DateTime(timezone=True), nullable=False)
     duracion_minutos = Column(SmallInteger, nullable=False)
 
-# coste (rounds) >= 12
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__rounds=12, # coste explícito >= 12
-)
+    # Índices según las consultas de app/api/dashboard.py (migración 0002_indices_dashboard).
+    # INCLUDE (solo PostgreSQL) permite responder con un index-only scan.
+    __table_args__ = (
+        # Listado ordenado por (hora_fin, id) y paginación por cursor
+        Index("ix_evaluaciones_hora_fin_id", "hora_fin", "id", postgresql_include=COLUMNAS_LISTADO),
+        # Agregados por rango de hora_inicio, bordes del resumen diario y su reconstrucción
+        Index("ix_evaluaciones_hora_inicio", "hora_inicio", postgresql_include=COLUMNAS_AGREGADOS),
+        # Agregados con filtro tiene_tea (igualdad primero, luego el rango)
+        Index(
+            "ix_evaluaciones_rasgos_tea_hora_inicio", "rasgos_tea", "hora_inicio",
+            postgresql_include=["hora_fin", "perfil_clinico", "sexo", "qchat_resultado"],
+        ),
+    )
+
+class ResumenDiario(Base):
+    """
+    Conteos de evaluaciones por día local de Lima. Se actualiza en cada INSERT
+    (app/db/resumen_diario.py) y se puede reconstruir con el job de recuperación.
+    Las columnas de la clave no admiten NULL: un valor faltante se guarda como '' o -1.
+    """
+    __tablename__ = "evaluaciones_resumen_diario"
+
+    dia = Column(Date, primary_key=True)  # día de hora_inicio
+    dia_fin = Column(Date, primary_key=True)  # día de hora_fin (para el filtro end_date)
+    perfil_clinico = Column(String(30), primary_key=True)
+    rasgos_tea = Column(String(2), primary_key=True)
+    sexo = Column(String(1), primary_key=True)
+    qchat_resultado = Column(SmallInteger, primary_key=True)
+
+    cantidad = Column(Integer, nullable=False)
+    suma_nivel_confianza = Column(Numeric(14, 2), nullable=False)
+    suma_duracion_minutos = Column(BigInteger, nullable=False)
 
 class Usuario(Base):
     __tablename__ = "usuario"
@@ -71,13 +107,17 @@ class Usuario(Base):
     is_active = Column(Boolean, nullable=False, server_default=text("true"))
     last_login = Column(DateTime(timezone=True), nullable=True)
 
+    # default en Python (mismo valor que el server_default) para que el INSERT no dependa
+    # de date_trunc, que solo existe en PostgreSQL (p. ej. el admin por defecto sobre SQLite)
     created_at = Column(
         DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc).replace(microsecond=0),
         server_default=text("date_trunc('second', now())"),
         nullable=False,
     )
     updated_at = Column(
         DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc).replace(microsecond=0),
         server_default=text("date_trunc('second', now())"),
         server_onupdate=text("date_trunc('second', now())"),
         onupdate=func.now(), # pylint: disable=E1102
@@ -0,0 +1,181 @@
+# app/db/pool_telemetria.py
+import bisect
+import threading
+import time
+import weakref
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Límites superiores (ms) de los buckets del histograma de espera en checkout
+BUCKETS_ESPERA_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class TelemetriaPool:
+    """
+    Contadores de un pool de conexiones: tiempo de checkout (histograma),
+    conexiones en uso y overflow, invalidaciones y reconexiones.
+    Los eventos llegan desde varios hilos, así que todo se actualiza con lock.
+    """
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.engine = None
+        self._lock = threading.Lock()
+        self._registros_vistos = weakref.WeakSet()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.buckets = [0] * (len(BUCKETS_ESPERA_MS) + 1)
+            self.espera_total_ms = 0.0
+            self.espera_max_ms = 0.0
+            self.checkouts = 0
+            self.checkins = 0
+            self.timeouts = 0
+            self.errores_checkout = 0
+            self.conexiones_creadas = 0
+            self.reconexiones = 0
+            self.invalidaciones = 0
+            self.invalidaciones_suaves = 0
+            self.cerradas = 0
+            self.max_en_uso = 0
+            self._en_uso = 0
+
+    def registrar_fallo(self, timeout: bool):
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.errores_checkout += 1
+
+    def registrar_espera(self, ms: float):
+        with self._lock:
+            self.buckets[bisect.bisect_left(BUCKETS_ESPERA_MS, ms)] += 1
+            self.espera_total_ms += ms
+            self.espera_max_ms = max(self.espera_max_ms, ms)
+
+    def _percentil(self, p: float):
+        # Cota superior del bucket donde cae el percentil (None si cae en +inf)
+        total = sum(self.buckets)
+        if not total:
+            return 0.0
+        objetivo = p * total
+        acumulado = 0
+        for limite, cantidad in zip(BUCKETS_ESPERA_MS + (None,), self.buckets):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return limite
+        return None
+
+    # ---------- eventos del pool
+
+    def instalar(self, engine):
+        # Escuchar en el engine: los eventos se conservan en el pool nuevo tras engine.dispose()
+        self.engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        event.listen(engine, "soft_invalidate", self._on_soft_invalidate)
+        event.listen(engine, "close", self._on_close)
+
+    def _on_connect(self, dbapi_connection, registro):
+        with self._lock:
+            self.conexiones_creadas += 1
+            # El mismo registro del pool abriendo otra conexión: reemplaza una invalidada o reciclada
+            if registro in self._registros_vistos:
+                self.reconexiones += 1
+            else:
+                self._registros_vistos.add(registro)
+
+    def _on_checkout(self, dbapi_connection, registro, proxy):
+        with self._lock:
+            self.checkouts += 1
+            self._en_uso += 1
+            self.max_en_uso = max(self.max_en_uso, self._en_uso)
+
+    def _on_checkin(self, dbapi_connection, registro):
+        with self._lock:
+            self.checkins += 1
+            self._en_uso = max(0, self._en_uso - 1)
+
+    def _on_invalidate(self, dbapi_connection, registro, exception):
+        with self._lock:
+            self.invalidaciones += 1
+
+    def _on_soft_invalidate(self, dbapi_connection, registro, exception):
+        with self._lock:
+            self.invalidaciones_suaves += 1
+
+    def _on_close(self, dbapi_connection, registro):
+        with self._lock:
+            self.cerradas += 1
+
+    def estadisticas(self) -> dict:
+        pool = self.engine.pool if self.engine is not None else None
+        with self._lock:
+            observaciones = sum(self.buckets)
+            datos = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "errores_checkout": self.errores_checkout,
+                "espera_checkout_ms": {
+                    "media": round(self.espera_total_ms / observaciones, 3) if observaciones else 0.0,
+                    "max": round(self.espera_max_ms, 3),
+                    "p50": self._percentil(0.50),
+                    "p99": self._percentil(0.99),
+                    "histograma": {
+                        **{f"<={limite}": n for limite, n in zip(BUCKETS_ESPERA_MS, self.buckets)},
+                        "+inf": self.buckets[-1],
+                    },
+                },
+                "conexiones_creadas": self.conexiones_creadas,
+                "reconexiones": self.reconexiones,
+                "invalidaciones": self.invalidaciones,
+                "invalidaciones_suaves": self.invalidaciones_suaves,
+                "cerradas": self.cerradas,
+                "max_en_uso": self.max_en_uso,
+            }
+
+        if pool is not None and isinstance(pool, QueuePool):
+            datos.update({
+                "tamano": pool.size(),
+                "en_uso": pool.checkedout(),
+                "libres": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": pool._max_overflow,
+            })
+        return datos
+
+
+class _CheckoutMedido:
+    """
+    Mide connect() completo: espera en la cola del pool, pre-ping y, si hace
+    falta, la apertura de una conexión nueva. Es la latencia que ve el request.
+    """
+    telemetria: TelemetriaPool = None
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super().connect()
+        except exc.TimeoutError:
+            self.telemetria.registrar_fallo(timeout=True)
+            raise
+        except Exception:
+            self.telemetria.registrar_fallo(timeout=False)
+            raise
+        self.telemetria.registrar_espera((time.perf_counter() - inicio) * 1000)
+        return conexion
+
+
+def clase_pool_medida(telemetria: TelemetriaPool, asincrono: bool = False):
+    # La clase lleva la telemetría como atributo: pool.recreate() (tras dispose) usa self.__class__
+    base = AsyncAdaptedQueuePool if asincrono else QueuePool
+    return type(f"{base.__name__}Medido", (_CheckoutMedido, base), {"telemetria": telemetria})
+
+
+telemetria_sync = TelemetriaPool("sync")
+telemetria_async = TelemetriaPool("async")
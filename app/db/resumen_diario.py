@@ -0,0 +1,232 @@
+# app/db/resumen_diario.py
+"""
+Mantenimiento de evaluaciones_resumen_diario: conteos por día local de Lima ×
+perfil × rasgos TEA × sexo × Q-CHAT, con sumas de nivel de confianza y duración.
+
+- insertar_evaluaciones(): INSERT de evaluaciones + upsert del resumen en la misma
+  transacción (lo usan /predict, /predict/batch y el escritor diferido).
+- reconstruir_resumen(): job de recuperación; recalcula un rango de días desde la
+  tabla evaluaciones (filas cargadas por fuera de la API, borrados, etc.).
+- llenar_resumen(): carga la historia completa en la misma transacción que crea la
+  tabla (arranque con create_all); con Alembic la carga la migración que la crea.
+
+    python -m app.db.resumen_diario [--desde 2025-01-01] [--hasta 2025-12-31]
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, cast, delete, func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Evaluacion, ResumenDiario
+from app.db.version_datos import version_evaluaciones
+
+ZONA = "America/Lima"
+LIMA = ZoneInfo(ZONA)
+
+# Las columnas de la clave del resumen no admiten NULL
+SIN_TEXTO = ""
+SIN_QCHAT = -1
+
+COLUMNAS_CLAVE = ("dia", "dia_fin", "perfil_clinico", "rasgos_tea", "sexo", "qchat_resultado")
+_CENTESIMOS = Decimal("0.01")
+
+
+def dia_local(valor, dialecto: str):
+    """Día de Lima de un datetime, igual a como lo calcula reconstruir_resumen() en SQL."""
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor)
+    if dialecto == "sqlite" or valor.tzinfo is None:
+        # SQLite guarda la hora de pared tal como llega; un valor sin zona ya es hora de Lima
+        return valor.date()
+    return valor.astimezone(LIMA).date()
+
+
+def inicio_dia(dia: date, dialecto: str) -> datetime:
+    """Medianoche de Lima de un día, para comparar contra columnas timestamptz."""
+    if dialecto == "sqlite":
+        return datetime.combine(dia, time())
+    return datetime.combine(dia, time(), tzinfo=LIMA)
+
+
+def a_hora_lima(valor: datetime):
+    # Los filtros de fecha sin zona horaria son hora local de Lima (como hora_inicio en /predict)
+    if valor is not None and valor.tzinfo is None:
+        return valor.replace(tzinfo=LIMA)
+    return valor
+
+
+def desde_clave(valor):
+    """Convierte el centinela de la clave del resumen de vuelta a None."""
+    if valor == SIN_TEXTO or valor == SIN_QCHAT:
+        return None
+    return valor
+
+
+def _centesimos(valor) -> Decimal:
+    # Numeric(3, 2) redondea al guardar: la suma del resumen debe coincidir con SUM() de la tabla
+    return Decimal(str(valor)).quantize(_CENTESIMOS, rounding=ROUND_HALF_UP)
+
+
+def acumular(filas, dialecto: str):
+    """Agrupa las filas nuevas por clave del resumen: {clave: [cantidad, suma_confianza, suma_duracion]}."""
+    grupos = defaultdict(lambda: [0, Decimal(0), 0])
+    for fila in filas:
+        qchat = fila.get("qchat_resultado")
+        clave = (
+            dia_local(fila.get("hora_inicio"), dialecto),
+            dia_local(fila.get("hora_fin"), dialecto),
+            fila.get("perfil_clinico") or SIN_TEXTO,
+            fila.get("rasgos_tea") or SIN_TEXTO,
+            fila.get("sexo") or SIN_TEXTO,
+            SIN_QCHAT if qchat is None else int(qchat),
+        )
+        grupo = grupos[clave]
+        grupo[0] += 1
+        if fila.get("nivel_confianza") is not None:
+            grupo[1] += _centesimos(fila["nivel_confianza"])
+        grupo[2] += int(fila.get("duracion_minutos") or 0)
+    return grupos
+
+
+def _sentencia_upsert(dialecto: str, valores):
+    modulo = {"postgresql": postgresql, "sqlite": sqlite}.get(dialecto)
+    if modulo is None:
+        return None
+    sentencia = modulo.insert(ResumenDiario).values(valores)
+    excluido = sentencia.excluded
+    return sentencia.on_conflict_do_update(
+        index_elements=list(COLUMNAS_CLAVE),
+        set_={
+            "cantidad": ResumenDiario.cantidad + excluido.cantidad,
+            "suma_nivel_confianza": ResumenDiario.suma_nivel_confianza + excluido.suma_nivel_confianza,
+            "suma_duracion_minutos": ResumenDiario.suma_duracion_minutos + excluido.suma_duracion_minutos,
+        },
+    )
+
+
+async def registrar_en_resumen(db: AsyncSession, filas):
+    """Suma las filas nuevas al resumen diario (un solo upsert multi-fila)."""
+    dialecto = db.bind.dialect.name
+    grupos = acumular(filas, dialecto)
+    if not grupos:
+        return
+    valores = [
+        {**dict(zip(COLUMNAS_CLAVE, clave)), "cantidad": cantidad,
+         "suma_nivel_confianza": confianza, "suma_duracion_minutos": duracion}
+        for clave, (cantidad, confianza, duracion) in grupos.items()
+    ]
+    sentencia = _sentencia_upsert(dialecto, valores)
+    if sentencia is None:
+        print(f"Upsert del resumen diario no soportado en {dialecto}; usar reconstruir_resumen()")
+        return
+    await db.execute(sentencia)
+
+
+async def insertar_evaluaciones(db: AsyncSession, filas):
+    """INSERT multi-fila de evaluaciones y actualización del resumen, sin COMMIT."""
+    if not filas:
+        return
+    # El resumen necesita el mismo hora_inicio que se guarda: se fija aquí el default de la columna
+    ahora = datetime.now(timezone.utc).replace(microsecond=0)
+    for fila in filas:
+        if fila.get("hora_inicio") is None:
+            fila["hora_inicio"] = ahora
+    await db.execute(insert(Evaluacion), filas)
+    await registrar_en_resumen(db, filas)
+
+
+def _expr_dia(columna, dialecto: str):
+    if dialecto == "postgresql":
+        return cast(func.timezone(ZONA, columna), Date)
+    return func.date(columna)
+
+
+def _sentencia_reconstruccion(dialecto: str, condiciones):
+    """INSERT ... SELECT del resumen agregado desde evaluaciones (filtrado por condiciones)."""
+    # pylint: disable=E1102
+    clave = [
+        _expr_dia(Evaluacion.hora_inicio, dialecto),
+        _expr_dia(Evaluacion.hora_fin, dialecto),
+        func.coalesce(Evaluacion.perfil_clinico, SIN_TEXTO),
+        func.coalesce(Evaluacion.rasgos_tea, SIN_TEXTO),
+        func.coalesce(Evaluacion.sexo, SIN_TEXTO),
+        func.coalesce(Evaluacion.qchat_resultado, SIN_QCHAT),
+    ]
+    agregado = (
+        select(
+            *clave,
+            func.count(),
+            func.coalesce(func.sum(Evaluacion.nivel_confianza), 0),
+            func.coalesce(func.sum(Evaluacion.duracion_minutos), 0),
+        )
+        .where(*condiciones)
+        .group_by(*clave)
+    )
+    return insert(ResumenDiario).from_select(
+        [*COLUMNAS_CLAVE, "cantidad", "suma_nivel_confianza", "suma_duracion_minutos"], agregado,
+    )
+
+
+async def reconstruir_resumen(db: AsyncSession, desde: date = None, hasta: date = None) -> int:
+    """
+    Recalcula el resumen de los días [desde, hasta] (por día de hora_inicio) desde
+    la tabla evaluaciones y hace COMMIT. Devuelve la cantidad de filas del resumen escritas.
+    """
+    dialecto = db.bind.dialect.name
+    if dialecto == "postgresql":
+        # Los upserts concurrentes esperan a que termine la reconstrucción: ni se pierden ni se cuentan dos veces
+        await db.execute(text(f"LOCK TABLE {ResumenDiario.__tablename__} IN EXCLUSIVE MODE"))
+
+    condiciones_resumen, condiciones = [], []
+    if desde is not None:
+        condiciones_resumen.append(ResumenDiario.dia >= desde)
+        condiciones.append(Evaluacion.hora_inicio >= inicio_dia(desde, dialecto))
+    if hasta is not None:
+        condiciones_resumen.append(ResumenDiario.dia <= hasta)
+        condiciones.append(Evaluacion.hora_inicio < inicio_dia(hasta + timedelta(days=1), dialecto))
+
+    await db.execute(delete(ResumenDiario).where(*condiciones_resumen))
+    resultado = await db.execute(_sentencia_reconstruccion(dialecto, condiciones))
+    await db.commit()
+    version_evaluaciones.incrementar()
+    return resultado.rowcount
+
+
+def llenar_resumen(conn) -> int:
+    """
+    Carga en el resumen toda la historia de evaluaciones, sin COMMIT. Se llama en la
+    transacción que crea la tabla: ningún upsert puede adelantarse a la carga.
+    """
+    resultado = conn.execute(_sentencia_reconstruccion(conn.dialect.name, []))
+    return resultado.rowcount
+
+
+def main():
+    from app.db.database import AsyncSessionLocal, async_engine
+
+    parser = argparse.ArgumentParser(description="Reconstruye el resumen diario de evaluaciones")
+    parser.add_argument("--desde", type=date.fromisoformat, default=None)
+    parser.add_argument("--hasta", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    async def ejecutar():
+        try:
+            async with AsyncSessionLocal() as db:
+                filas = await reconstruir_resumen(db, args.desde, args.hasta)
+            print(f"Resumen diario reconstruido: {filas} filas")
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(ejecutar())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+# app/db/version_datos.py
+"""
+Versión de los datos de evaluaciones en este proceso. Sube después de cada COMMIT
+que agrega evaluaciones (/predict, /predict/batch, escritor diferido, reconstrucción
+del resumen); las caches del dashboard la incluyen en la clave, así que una
+inserción invalida todas las respuestas calculadas antes.
+
+Es un contador por proceso: con varios workers, lo insertado en otro proceso se
+ve al vencer el TTL de la cache (DASHBOARD_CACHE_TTL).
+"""
+import threading
+
+
+class VersionDatos:
+    """Contador monótono, seguro entre hilos."""
+
+    def __init__(self):
+        self._valor = 0
+        self._lock = threading.Lock()
+
+    @property
+    def actual(self) -> int:
+        return self._valor
+
+    def incrementar(self) -> int:
+        with self._lock:
+            self._valor += 1
+            return self._valor
+
+
+version_evaluaciones = VersionDatos()
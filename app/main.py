@@ -1,20 +1,105 @@
+from time import perf_counter
+_inicio_importacion = perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import api, auth, dashboard
-# Para crear las tablas en Railway (solo la primera vez o si no existen)
-from app.db.models import Base
-from app.db.init_db import init_usuario_default
-from app.db.database import engine
+from app.api import api, auth, dashboard, exportacion, internal, metricas, salud
+from app.api.auth import pool_contrasenas
+from app.api.salud import estado_arranque
+from app.utils.email_sender import cola_correo
+from app.db.arranque import precalentar_pool, preparar_base_de_datos
+from app.db.database import engine, async_engine
+from app.db.escritor_diferido import escritor_evaluaciones
+from app.core.db_settings import WRITE_BEHIND_ENABLED
+from app.model.predictor import precalentar
+from app.model.registry import registro
+from app.utils.metricas import MiddlewareMetricas
+from app.utils.perfilador import MiddlewarePerfiles
+
+
+async def _fase(nombre, funcion, *args):
+    # Fase bloqueante (base, disco, CPU) en un hilo, con su duración en /health/ready
+    with estado_arranque.fase(nombre):
+        return await asyncio.to_thread(funcion, *args)
+
+
+async def _iniciar_pool_contrasenas():
+    # Procesos de bcrypt listos antes del primer login
+    with estado_arranque.fase("pool_contrasenas"):
+        await pool_contrasenas.iniciar()
+
+
+async def _precalentar(modelos):
+    # Corre después del yield: uvicorn ya acepta conexiones, /health/live responde 200 y
+    # /health/ready 503 hasta que esto termina (o se queda en 503 si una fase falla)
+    try:
+        # Primera predicción y conexiones del pool async abiertas antes de recibir tráfico
+        await _fase("precalentar_modelo", precalentar, modelos)
+        with estado_arranque.fase("precalentar_pool"):
+            await precalentar_pool()
+    except Exception as e:
+        print(f"Error al precalentar, /health/ready seguirá respondiendo 503: {e}")
+        return
+
+    estado_arranque.terminar()
+    print(
+        f"Listo en {estado_arranque.arranque_ms} ms "
+        f"(importación {estado_arranque.importacion_ms} ms): {estado_arranque.fases}"
+    )
+
 
-# Crear automáticamente las tablas si no existen
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nada de esto corre al importar: importar app.main no toca la base ni hace hashing
+    estado_arranque.comenzar()
 
-app = FastAPI()
+    # En paralelo: esquema + admin por defecto (solo un worker inicializa, con advisory lock),
+    # carga de los modelos (una sola vez, no en cada /predict) y spawn de los procesos de bcrypt
+    _, modelos, _ = await asyncio.gather(
+        _fase("base_de_datos", preparar_base_de_datos),
+        _fase("modelos", registro.cargar),
+        _iniciar_pool_contrasenas(),
+    )
+    print(f"Modelos cargados (version {modelos.version}) en {modelos.duracion_carga_ms} ms")
+    # Recarga en caliente revisada en un hilo propio, no dentro de un request
+    registro.iniciar_vigilancia()
+
+    # Escritura diferida de evaluaciones; también se inicia si quedaron filas en el spool
+    with estado_arranque.fase("escritor"):
+        if WRITE_BEHIND_ENABLED or escritor_evaluaciones.tiene_pendientes():
+            await escritor_evaluaciones.iniciar()
+
+    # Envío de informes PDF en segundo plano (una conexión SMTP reutilizada)
+    with estado_arranque.fase("cola_correo"):
+        await cola_correo.iniciar()
+
+    # uvicorn abre el socket recién al salir de aquí: el precalentamiento sigue en segundo plano
+    precalentamiento = asyncio.create_task(_precalentar(modelos), name="precalentamiento")
+    try:
+        yield
+    finally:
+        # uvicorn ya no acepta conexiones nuevas; el estado solo queda para los logs
+        precalentamiento.cancel()
+        estado_arranque.detener()
+        registro.detener_vigilancia()
+        pool_contrasenas.detener()
+        await cola_correo.detener()
+        # Primero se vacía la cola de evaluaciones, luego se cierran las conexiones
+        await escritor_evaluaciones.detener()
+        await async_engine.dispose()
+        engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(api.router)
 app.include_router(auth.router)
 app.include_router(dashboard.router)
-
-init_usuario_default()
+app.include_router(exportacion.router)
+app.include_router(internal.router)
+app.include_router(metricas.router)
+app.include_router(salud.router)
 
 # Configurar CORS
 app.add_middleware(
@@ -26,4 +111,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
\ No newline at end of file
+)
+
+# Perfilado por muestreo de requests lentos (PROFILING_ENABLED; sin efecto si está desactivado)
+app.add_middleware(MiddlewarePerfiles)
+
+# Tiempos por ruta para /metrics (el último agregado es el más externo: incluye a CORS)
+app.add_middleware(MiddlewareMetricas)
+
+estado_arranque.importacion_ms = round((perf_counter() - _inicio_importacion) * 1000, 1)
@@ -0,0 +1,47 @@
+# app/model/campos.py
+"""
+Campos del registro de tamizaje y sus rangos. Sin dependencias: lo importan tanto el esquema
+de entrada (app.schemas.input_data) como el pipeline del modelo (app.model.data_preprocessor).
+"""
+
+# Orden de los 25 valores que envía el frontend
+CAMPOS = [
+    "Age_Years", "Sex_M", "A1", "A2", "A3", "A4", "A5", "A6", "A7", "A8", "A9", "A10_Autism_Spectrum_Quotient",
+    "Qchat_10_Score",
+    "Speech_Delay_Language_Disorder", "Learning_Disorder", "Genetic_Disorders", "Depression",
+    "Global_Developmental_Delay_Intellectual_Disability", "Social_Behavioural_Issues", "Anxiety_Disorder", "Family_Mem_With_Asd",
+    "Social_Interaction_Issues_%", "Communication_Issues_%", "Time_Start", "Time_End"
+]
+
+# Parámetros min-max para normalización
+SCALING_PARAMS = {
+    "Age_Years": (1, 18),
+    "Sex_M": (0, 1),
+    "A1": (0, 1),
+    "A2": (0, 1),
+    "A3": (0, 1),
+    "A4": (0, 1),
+    "A5": (0, 1),
+    "A6": (0, 1),
+    "A7": (0, 1),
+    "A8": (0, 1),
+    "A9": (0, 1),
+    "A10_Autism_Spectrum_Quotient": (0, 1),
+    "Qchat_10_Score": (0, 10),
+    "Speech_Delay_Language_Disorder": (0, 1),
+    "Learning_Disorder": (0, 1),
+    "Genetic_Disorders": (0, 1),
+    "Depression": (0, 1),
+    "Global_Developmental_Delay_Intellectual_Disability": (0, 1),
+    "Social_Behavioural_Issues": (0, 1),
+    "Anxiety_Disorder": (0, 1),
+    "Family_Mem_With_Asd": (0, 1),
+    "Social_Interaction_Issues_%": (0, 100),
+    "Communication_Issues_%": (0, 100),
+    "Comorbidity_%": (0, 100),
+    "Clinical_Profile_Mixed": (0, 1),
+    "Clinical_Profile_Social interaction": (0, 1)
+}
+
+# Los 23 primeros campos son numéricos; los dos últimos son las horas de inicio y fin
+N_NUMERICOS = 23
@@ -1,191 +1,234 @@
-from pathlib import Path
-import joblib
-import pandas as pd 
-class DataPreprocessor:
+import numpy as np
+import pandas as pd
+from app.model.campos import CAMPOS, N_NUMERICOS, SCALING_PARAMS
+from app.model.registry import obtener_modelos
+from app.utils.fechas import parsear_hora
+
+COMORBILIDADES = [
+    "Speech_Delay_Language_Disorder", "Learning_Disorder", "Genetic_Disorders",
+    "Depression", "Global_Developmental_Delay_Intellectual_Disability",
+    "Social_Behavioural_Issues", "Anxiety_Disorder"
+]
+
+# Orden usado para entrenar PCA
+VARIABLES_PCA = [
+    "A1", "A2", "A3", "A4", "A5", "A6", "A7", "A8", "A9", "A10_Autism_Spectrum_Quotient",
+    "Age_Years",
+    "Qchat_10_Score",
+    "Speech_Delay_Language_Disorder", "Learning_Disorder", "Genetic_Disorders", "Depression",
+    "Global_Developmental_Delay_Intellectual_Disability", "Social_Behavioural_Issues",
+    "Anxiety_Disorder", "Family_Mem_With_Asd",
+    "Comorbidity_%",
+    "Communication_Issues_%",
+    "Social_Interaction_Issues_%",
+    "Sex_M",
+    "Clinical_Profile_Mixed", "Clinical_Profile_Social interaction"
+]
+
+# Orden esperado por el modelo SVM
+VARIABLES_MODELO = [
+    "PCA_1", "A6", "A9", "Social_Interaction_Issues_%", "A7", "A5", "Qchat_10_Score",
+    "Communication_Issues_%", "A4", "A1", "A2", "A8", "Sex_M", "A3",
+    "Global_Developmental_Delay_Intellectual_Disability", "Speech_Delay_Language_Disorder",
+    "Depression", "Social_Behavioural_Issues", "Anxiety_Disorder", "Comorbidity_%"
+]
+
+# ---- Pipeline compilado: se calcula una sola vez al importar el módulo
+# Vector extendido = 23 valores numéricos + variables derivadas
+VARIABLES_EXTENDIDAS = CAMPOS[:N_NUMERICOS] + ["Comorbidity_%", "Clinical_Profile_Mixed", "Clinical_Profile_Social interaction"]
+_IDX_EXT = {var: i for i, var in enumerate(VARIABLES_EXTENDIDAS)}
+
+_MIN = np.array([SCALING_PARAMS[var][0] for var in VARIABLES_EXTENDIDAS], dtype=np.float64)
+_RANGO = np.array([SCALING_PARAMS[var][1] - SCALING_PARAMS[var][0] for var in VARIABLES_EXTENDIDAS], dtype=np.float64)
+# minmax_scale devuelve 0 si max == min; se evita la división por cero y se anula después
+_RANGO_NULO = _RANGO == 0
+_RANGO[_RANGO_NULO] = 1.0
+
+_IDX_PCA = np.array([_IDX_EXT[var] for var in VARIABLES_PCA])
+_VARIABLES_PCA_TUPLA = tuple(VARIABLES_PCA)
+_IDX_MODELO = np.array([_IDX_EXT[var] for var in VARIABLES_MODELO[1:]])
+_IDX_COMORB = np.array([_IDX_EXT[var] for var in COMORBILIDADES])
+_IDX_SEXO = _IDX_EXT["Sex_M"]
+_IDX_COMM = _IDX_EXT["Communication_Issues_%"]
+_IDX_SOCIAL = _IDX_EXT["Social_Interaction_Issues_%"]
+_IDX_COMORB_PCT = _IDX_EXT["Comorbidity_%"]
+_IDX_MIXTO = _IDX_EXT["Clinical_Profile_Mixed"]
+_IDX_PERFIL_SOCIAL = _IDX_EXT["Clinical_Profile_Social interaction"]
+
+PERFILES = np.array(["comunicativo", "mixto", "interactivo-social"])
+
+
+def _redondear(valores, decimales):
+    """
+    Redondeo vectorizado con el mismo resultado que round() de Python.
+    np.rint solo puede diferir cuando el valor queda prácticamente en .5,
+    y esos casos (raros) se resuelven con round() elemento a elemento.
+    """
+    factor = 10.0 ** decimales
+    escalado = valores * factor
+    redondeado = np.rint(escalado) / factor
+    dudosos = np.abs(np.abs(escalado - np.trunc(escalado)) - 0.5) < 1e-6
+    if dudosos.any():
+        redondeado[dudosos] = [round(float(v), decimales) for v in valores[dudosos]]
+    return redondeado
 
-    def __init__(self, raw_values):
-        self.campos = [
-            "Age_Years", "Sex_M", "A1", "A2", "A3", "A4", "A5", "A6", "A7", "A8", "A9", "A10_Autism_Spectrum_Quotient",
-            "Qchat_10_Score",
-            "Speech_Delay_Language_Disorder", "Learning_Disorder", "Genetic_Disorders", "Depression",
-            "Global_Developmental_Delay_Intellectual_Disability", "Social_Behavioural_Issues", "Anxiety_Disorder", "Family_Mem_With_Asd",
-            "Social_Interaction_Issues_%", "Communication_Issues_%", "Time_Start", "Time_End"
-        ]
-        self.data = dict(zip(self.campos, raw_values))
-
-        # Parámetros min-max para normalización
-        self.scaling_params = {
-            "Age_Years": (1, 18),
-            "Sex_M": (0, 1),
-            "A1": (0, 1),
-            "A2": (0, 1),
-            "A3": (0, 1),
-            "A4": (0, 1),
-            "A5": (0, 1),
-            "A6": (0, 1),
-            "A7": (0, 1),
-            "A8": (0, 1),
-            "A9": (0, 1),
-            "A10_Autism_Spectrum_Quotient": (0, 1),
-            "Qchat_10_Score": (0, 10),
-            "Speech_Delay_Language_Disorder": (0, 1),
-            "Learning_Disorder": (0, 1),
-            "Genetic_Disorders": (0, 1),
-            "Depression": (0, 1),
-            "Global_Developmental_Delay_Intellectual_Disability": (0, 1),
-            "Social_Behavioural_Issues": (0, 1),
-            "Anxiety_Disorder": (0, 1),
-            "Family_Mem_With_Asd": (0, 1),
-            "Social_Interaction_Issues_%": (0, 100),
-            "Communication_Issues_%": (0, 100),
-            "Comorbidity_%": (0, 100),
-            "Clinical_Profile_Mixed": (0, 1),
-            "Clinical_Profile_Social interaction": (0, 1)
-        }
+
+class DataPreprocessor:
+    """
+    Preprocesa un registro (lista de 25 valores) o un lote (matriz N x 25).
+    Las variables derivadas y el escalado min-max se calculan una sola vez,
+    de forma vectorizada, al construir el objeto.
+    """
+    __slots__ = ("modelos", "es_lote", "valores", "_comorb", "_perfil", "_escalados")
+
+    campos = CAMPOS
+    scaling_params = SCALING_PARAMS
+
+    def __init__(self, raw_values, modelos=None):
+        # Versión de los modelos a usar; si no se indica se toma la vigente del registro
+        self.modelos = modelos
+
+        filas = raw_values if isinstance(raw_values, np.ndarray) else np.asarray(raw_values, dtype=object)
+        self.es_lote = filas.ndim == 2
+        self.valores = filas if self.es_lote else filas.reshape(1, -1)
+
+        # (N x 26): numéricos + Comorbidity_% + dummies de perfil clínico
+        extendidos = np.empty((len(self.valores), len(VARIABLES_EXTENDIDAS)), dtype=np.float64)
+        extendidos[:, :N_NUMERICOS] = self.valores[:, :N_NUMERICOS].astype(np.float64)
+
+        # Porcentaje de comorbilidad (una vez por registro)
+        total = np.trunc(extendidos[:, _IDX_COMORB]).sum(axis=1)
+        self._comorb = _redondear((total / len(COMORBILIDADES)) * 100, 2)
+        extendidos[:, _IDX_COMORB_PCT] = self._comorb
+
+        # Perfil clínico: 1 = mixto, 0 = comunicativo, 2 = interactivo-social
+        comm = extendidos[:, _IDX_COMM]
+        social = extendidos[:, _IDX_SOCIAL]
+        mixto = np.abs(comm - social) < 10
+        self._perfil = np.where(mixto, 1, np.where(comm > social, 0, 2))
+        extendidos[:, _IDX_MIXTO] = mixto
+        extendidos[:, _IDX_PERFIL_SOCIAL] = self._perfil == 2
+
+        # El modelo se entrenó con Sex_M = 0 para todos los registros
+        extendidos[:, _IDX_SEXO] = 0
+
+        escalados = _redondear((extendidos - _MIN) / _RANGO, 4)
+        escalados[:, _RANGO_NULO] = 0
+        self._escalados = escalados
+
+    @property
+    def data(self):
+        return dict(zip(CAMPOS, self.valores[0].tolist()))
 
     def minmax_scale(self, variable, value):
-        min_val, max_val = self.scaling_params[variable]
+        min_val, max_val = SCALING_PARAMS[variable]
         if max_val == min_val:
             return 0
         return round((value - min_val) / (max_val - min_val), 4)
 
     def get_comorbidity_percent(self):
-        comorb_vars = [
-            "Speech_Delay_Language_Disorder", "Learning_Disorder", "Genetic_Disorders",
-            "Depression", "Global_Developmental_Delay_Intellectual_Disability",
-            "Social_Behavioural_Issues", "Anxiety_Disorder"
-        ]
-        total = sum(int(self.data[var]) for var in comorb_vars)
-        porcentaje = (total / len(comorb_vars)) * 100
-        return round(porcentaje, 2)
-    
+        if self.es_lote:
+            return self._comorb
+        return float(self._comorb[0])
+
     def get_clinical_profile(self):
-        comm = float(self.data["Communication_Issues_%"])
-        social = float(self.data["Social_Interaction_Issues_%"])
-        if abs(comm - social) < 10:
-            return "mixto", 1, 0
-        elif comm > social:
-            return "comunicativo", 0, 0
-        else:
-            return "interactivo-social", 0, 1
+        perfil = PERFILES[self._perfil]
+        mixto = (self._perfil == 1).astype(int)
+        social = (self._perfil == 2).astype(int)
+        if self.es_lote:
+            return perfil, mixto, social
+        return str(perfil[0]), int(mixto[0]), int(social[0])
+
+    def get_normalized_values(self):
+        normalizados = self._escalados[:, _IDX_PCA]
+        return normalizados if self.es_lote else normalizados[0].tolist()
 
     def get_normalized_dataframe(self):
-        _, dummy_mixed, dummy_social = self.get_clinical_profile()
-        comorb = self.get_comorbidity_percent()
-
-        # Variables extendidas
-        variables = {
-            **self.data,
-            "Comorbidity_%": comorb,
-            "Clinical_Profile_Mixed": dummy_mixed,
-            "Clinical_Profile_Social interaction": dummy_social,
-            "Sex_M": 0  
-        }
+        return pd.DataFrame(self._escalados[:, _IDX_PCA], columns=VARIABLES_PCA)
 
-        # Orden usado para entrenar PCA
-        ordered_vars = [
-            "A1", "A2", "A3", "A4", "A5", "A6", "A7", "A8", "A9", "A10_Autism_Spectrum_Quotient",
-            "Age_Years",
-            "Qchat_10_Score",
-            "Speech_Delay_Language_Disorder", "Learning_Disorder", "Genetic_Disorders", "Depression",
-            "Global_Developmental_Delay_Intellectual_Disability", "Social_Behavioural_Issues",
-            "Anxiety_Disorder", "Family_Mem_With_Asd",
-            "Comorbidity_%",
-            "Communication_Issues_%",
-            "Social_Interaction_Issues_%",
-            "Sex_M",
-            "Clinical_Profile_Mixed", "Clinical_Profile_Social interaction"
-        ]
-
-        valores = [self.minmax_scale(var, float(variables[var])) for var in ordered_vars]
-        return pd.DataFrame([valores], columns=ordered_vars)
-
-    
-    def get_pca_component_1(self):
-        df_vector = self.get_normalized_dataframe()
 
-        pca_path = Path(__file__).resolve().parent.parent.parent / "pca_model.pkl"
-        pca = joblib.load(pca_path)
+    def get_pca_component_1(self):
+        # Escalado min-max ya aplicado; PCA_1 queda como un solo producto punto
+        proyeccion = (self.modelos or obtener_modelos()).proyeccion_pca
+        if proyeccion.variables and proyeccion.variables != _VARIABLES_PCA_TUPLA:
+            raise ValueError("El PCA cargado no fue entrenado con el orden de variables esperado")
 
-        return round(pca.transform(df_vector)[0][0], 4)
+        pca1 = self._escalados[:, _IDX_PCA] @ proyeccion.pesos - proyeccion.desplazamiento
+        if self.es_lote:
+            return np.round(pca1, 4)
+        return round(pca1[0], 4)
 
 
-    def get_feature_vector(self):
-        # Obtener PCA_1
-        pca1 = self.get_pca_component_1()
-        
-        # Calcular valores extendidos necesarios
-        comorb = self.get_comorbidity_percent()
-
-        # Crear diccionario solo con las variables que se usarán
-        variables = {
-            **{k: self.data[k] for k in [
-                "A6", "A9", "Social_Interaction_Issues_%", "A7", "A5", "Qchat_10_Score",
-                "Communication_Issues_%", "A4", "A1", "A2", "A8", "Sex_M", "A3",
-                "Global_Developmental_Delay_Intellectual_Disability", "Speech_Delay_Language_Disorder",
-                "Depression", "Social_Behavioural_Issues", "Anxiety_Disorder"
-            ]},
-            "Sex_M": 0,  
-            "Comorbidity_%": comorb
-        }
+    def get_scaled_features(self):
+        # Todas las variables del modelo excepto PCA_1, ya escaladas
+        escalados = self._escalados[:, _IDX_MODELO]
+        return escalados if self.es_lote else escalados[0].tolist()
 
-        # Orden esperado por el modelo SVM
-        ordered_vars = [
-            "PCA_1", "A6", "A9", "Social_Interaction_Issues_%", "A7", "A5", "Qchat_10_Score",
-            "Communication_Issues_%", "A4", "A1", "A2", "A8", "Sex_M", "A3",
-            "Global_Developmental_Delay_Intellectual_Disability", "Speech_Delay_Language_Disorder",
-            "Depression", "Social_Behavioural_Issues", "Anxiety_Disorder", "Comorbidity_%"
-        ]
-
-        # Escalar automáticamente todas las variables excepto PCA_1
-        valores = {
-            "PCA_1": pca1,
-            **{var: self.minmax_scale(var, float(variables[var])) for var in ordered_vars[1:]}
-        }
+    def get_feature_matrix(self):
+        # Matriz (N x 20) en el orden esperado por el modelo SVM
+        matriz = np.empty((len(self.valores), len(VARIABLES_MODELO)), dtype=np.float64)
+        matriz[:, 0] = self.get_pca_component_1()
+        matriz[:, 1:] = self._escalados[:, _IDX_MODELO]
+        return matriz
 
+    def get_feature_vector(self):
         # Retornar como DataFrame para evitar warnings en el modelo
-        return pd.DataFrame([valores], columns=ordered_vars)
+        return pd.DataFrame(self.get_feature_matrix(), columns=VARIABLES_MODELO)
 
-    def get_ordered_column_dict(self):
+    def _column_dict(self, fila):
+        data = dict(zip(CAMPOS, self.valores[fila].tolist()))
         # Este orden corresponde al esquema de la tabla 'evaluaciones' en PostgreSQL
         return {
-            "edad": self.data["Age_Years"],
-            "sexo": "M" if self.data["Sex_M"] == 1 else "F",
-            "a1": self.data["A1"],
-            "a2": self.data["A2"],
-            "a3": self.data["A3"],
-            "a4": self.data["A4"],
-            "a5": self.data["A5"],
-            "a6": self.data["A6"],
-            "a7": self.data["A7"],
-            "a8": self.data["A8"],
-            "a9": self.data["A9"],
-            "a10": self.data["A10_Autism_Spectrum_Quotient"],
-            "qchat_resultado": self.data["Qchat_10_Score"],
-            "trastorno_habla": "Si" if self.data["Speech_Delay_Language_Disorder"] == 1 else "No",
-            "trastorno_aprendizaje": "Si" if self.data["Learning_Disorder"] == 1 else "No",
-            "trastorno_genetico": "Si" if self.data["Genetic_Disorders"] == 1 else "No",
-            "trastorno_depresion": "Si" if self.data["Depression"] == 1 else "No",
-            "retraso_global_intelectual": "Si" if self.data["Global_Developmental_Delay_Intellectual_Disability"] == 1 else "No",
-            "problemas_comportamiento": "Si" if self.data["Social_Behavioural_Issues"] == 1 else "No",
-            "trastorno_ansiedad": "Si" if self.data["Anxiety_Disorder"] == 1 else "No",
-            "familiar_autista": "Si" if self.data["Family_Mem_With_Asd"] == 1 else "No",
-            "porc_comorbilidad": round(self.get_comorbidity_percent() / 100, 2),
-            "porc_deficiencia_social_interactiva": round(float(self.data["Social_Interaction_Issues_%"]) / 100, 2),
-            "porc_deficiencia_comunicativa": round(float(self.data["Communication_Issues_%"]) / 100, 2),
-            "perfil_clinico": self.get_clinical_profile()[0],
+            "edad": data["Age_Years"],
+            "sexo": "M" if data["Sex_M"] == 1 else "F",
+            "a1": data["A1"],
+            "a2": data["A2"],
+            "a3": data["A3"],
+            "a4": data["A4"],
+            "a5": data["A5"],
+            "a6": data["A6"],
+            "a7": data["A7"],
+            "a8": data["A8"],
+            "a9": data["A9"],
+            "a10": data["A10_Autism_Spectrum_Quotient"],
+            "qchat_resultado": data["Qchat_10_Score"],
+            "trastorno_habla": "Si" if data["Speech_Delay_Language_Disorder"] == 1 else "No",
+            "trastorno_aprendizaje": "Si" if data["Learning_Disorder"] == 1 else "No",
+            "trastorno_genetico": "Si" if data["Genetic_Disorders"] == 1 else "No",
+            "trastorno_depresion": "Si" if data["Depression"] == 1 else "No",
+            "retraso_global_intelectual": "Si" if data["Global_Developmental_Delay_Intellectual_Disability"] == 1 else "No",
+            "problemas_comportamiento": "Si" if data["Social_Behavioural_Issues"] == 1 else "No",
+            "trastorno_ansiedad": "Si" if data["Anxiety_Disorder"] == 1 else "No",
+            "familiar_autista": "Si" if data["Family_Mem_With_Asd"] == 1 else "No",
+            "porc_comorbilidad": round(float(self._comorb[fila]) / 100, 2),
+            "porc_deficiencia_social_interactiva": round(float(data["Social_Interaction_Issues_%"]) / 100, 2),
+            "porc_deficiencia_comunicativa": round(float(data["Communication_Issues_%"]) / 100, 2),
+            "perfil_clinico": str(PERFILES[self._perfil[fila]]),
             # rasgos_tea y nivel_confianza serán añadidos después de la predicción
-            "hora_inicio": pd.to_datetime(self.data["Time_Start"]).to_pydatetime(),
-            "hora_fin": pd.to_datetime(self.data["Time_End"]).to_pydatetime(),
+            "hora_inicio": parsear_hora(data["Time_Start"]),
+            "hora_fin": parsear_hora(data["Time_End"]),
             # duracion_minutos se calcula en app/api.py
         }
 
-    def preparar_data_para_guardar(self, resultado_modelo) -> dict:
-        data = self.get_ordered_column_dict()
-        data["rasgos_tea"] = "Si" if resultado_modelo["clase_predicha"] == 1 else "No"
-        data["nivel_confianza"] = round(resultado_modelo["riesgo_autismo"] / 100, 2)
-        return data
+    def get_ordered_column_dict(self):
+        if self.es_lote:
+            return [self._column_dict(fila) for fila in range(len(self.valores))]
+        return self._column_dict(0)
+
+    def preparar_data_para_guardar(self, resultado_modelo):
+        if self.es_lote:
+            return [
+                agregar_resultado(self._column_dict(fila), resultado)
+                for fila, resultado in enumerate(resultado_modelo)
+            ]
+        return agregar_resultado(self._column_dict(0), resultado_modelo)
 
 
     def get_data_dict(self):
-        return self.data
\ No newline at end of file
+        return self.data
+
+
+def agregar_resultado(data, resultado_modelo) -> dict:
+    data["rasgos_tea"] = "Si" if resultado_modelo["clase_predicha"] == 1 else "No"
+    data["nivel_confianza"] = round(resultado_modelo["riesgo_autismo"] / 100, 2)
+    return data
@@ -0,0 +1,17 @@
+# app/model/executor.py
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.model_settings import MODEL_WORKERS
+from app.utils.perfilador import atribuir
+
+# Pool propio para preprocesamiento + predicción: no compite con el threadpool
+# de Starlette ni bloquea el event loop. NumPy libera el GIL en las operaciones pesadas.
+ejecutor_modelo = ThreadPoolExecutor(max_workers=MODEL_WORKERS, thread_name_prefix="modelo")
+
+
+async def en_ejecutor_modelo(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    # Con el perfilador activo, las muestras del hilo van solo al request que encargó el trabajo
+    return await loop.run_in_executor(ejecutor_modelo, atribuir(functools.partial(fn, *args, **kwargs)))
@@ -1,18 +1,27 @@
-import joblib
-from pathlib import Path
+import threading
 
-def predecir(df):
-    # Cargar el modelo desde la raíz del proyecto
-    model_path = Path(__file__).resolve().parent.parent.parent / "model.pkl"
-    model = joblib.load(model_path)
+import numpy as np
+import pandas as pd
+from app.core.model_settings import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL
+from app.model.campos import CAMPOS, N_NUMERICOS, SCALING_PARAMS
+from app.model.data_preprocessor import VARIABLES_MODELO, DataPreprocessor, agregar_resultado
+from app.model.registry import obtener_modelos, registro
+from app.utils.cache import CacheLRU
+from app.schemas.input_data import decodificar_valores
 
-    # Obtener la probabilidad de clase 1
-    probas = model.predict_proba(df)[0]
+# Umbral personalizado para la clase 1
+UMBRAL = 0.605
+
+# Resultados por (versión del modelo, vector de características escalado)
+cache_predicciones = CacheLRU(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+_version_cache = None
+_lock_version = threading.Lock()
+
+def _interpretar(probas):
     prob_clase_1 = probas[1]
 
     # Aplicar umbral personalizado
-    umbral = 0.605
-    clase_predicha = int(prob_clase_1 >= umbral)
+    clase_predicha = int(prob_clase_1 >= UMBRAL)
 
     # Convertir probabilidad a porcentaje (solo la de la clase predicha)
     probabilidad = probas[clase_predicha]
@@ -21,4 +30,100 @@ def predecir(df):
     return {
         "clase_predicha": clase_predicha,
         "riesgo_autismo": riesgo_autismo,
-    }
\ No newline at end of file
+    }
+
+def _probabilidades(X, modelos):
+    # El motor sklearn necesita nombres de columnas; el motor kernel trabaja directo con arrays
+    if modelos.nombre_motor == "sklearn":
+        X = pd.DataFrame(X, columns=VARIABLES_MODELO)
+    return modelos.motor.predict_proba(X)
+
+def _predecir_filas(df, modelos):
+    global _version_cache
+    modelos = modelos or obtener_modelos()
+    # + 0.0 normaliza -0.0 para que la clave sea canónica
+    filas = np.asarray(df, dtype=np.float64).reshape(-1, len(VARIABLES_MODELO)) + 0.0
+
+    if not cache_predicciones.activo:
+        return [_interpretar(probas) for probas in _probabilidades(filas, modelos)]
+
+    # Un modelo nuevo invalida lo cacheado con versiones anteriores. Solo limpia un request con la
+    # versión publicada: durante una recarga, los que siguen con el snapshot anterior no la pisan
+    # (las claves llevan la versión; lo que agreguen lo desaloja el LRU/TTL). Sin versión publicada
+    # (p. ej. un worker de app.cli.puntuar con su propio registro) manda la de `modelos`: consultar
+    # el registro global no debe cargar los artefactos por defecto
+    publicada = registro.version_publicada
+    if modelos.version != _version_cache and publicada in (None, modelos.version):
+        with _lock_version:
+            if modelos.version != _version_cache:
+                cache_predicciones.clear()
+                _version_cache = modelos.version
+
+    claves = [(modelos.version, fila.tobytes()) for fila in filas]
+    resultados = [cache_predicciones.get(clave) for clave in claves]
+
+    # Solo las filas no cacheadas pasan por el modelo, en una sola llamada
+    faltantes = [i for i, resultado in enumerate(resultados) if resultado is None]
+    if faltantes:
+        for i, probas in zip(faltantes, _probabilidades(filas[faltantes], modelos)):
+            resultados[i] = _interpretar(probas)
+            cache_predicciones.set(claves[i], resultados[i])
+
+    return [dict(resultado) for resultado in resultados]
+
+def precalentar(modelos=None):
+    """
+    Una pasada completa (validación, preprocesamiento, PCA y predict_proba) sobre un registro
+    sintético, sin pasar por la cache: el primer request no paga la inicialización perezosa.
+    """
+    modelos = modelos or obtener_modelos()
+    valores = [SCALING_PARAMS[campo][0] for campo in CAMPOS[:N_NUMERICOS]] + ["1/1/2025, 12:00:00 p. m."] * 2
+    processor = DataPreprocessor(decodificar_valores(valores), modelos=modelos)
+    processor.get_ordered_column_dict()
+    return _interpretar(_probabilidades(processor.get_feature_matrix(), modelos)[0])
+
+def predecir(df, modelos=None):
+    # Modelo ya cargado en memoria por el registro (se carga una vez al arrancar)
+    return _predecir_filas(df, modelos)[0]
+
+def predecir_lote(df, modelos=None):
+    # Una sola llamada a predict_proba para todas las filas del lote no cacheadas
+    return _predecir_filas(df, modelos)
+
+def evaluar_registros(registros, modelos=None):
+    """
+    Valida y puntúa varios registros de 25 valores con una sola llamada al modelo.
+    Un registro inválido no descarta el resto: devuelve (resultados, errores, filas),
+    donde resultados y errores llevan el índice del registro y filas son las columnas
+    de 'evaluaciones' de los válidos (en el mismo orden que resultados).
+    """
+    modelos = modelos or obtener_modelos()
+    errores = []
+    validos = []  # (indice, valores, columnas)
+
+    for indice, valores in enumerate(registros):
+        try:
+            # Tipos, rangos y horas en una sola pasada (mismo esquema que POST /predict)
+            processor = DataPreprocessor(decodificar_valores(valores), modelos=modelos)
+            columnas = processor.get_ordered_column_dict()
+        except (ValueError, TypeError) as e:
+            errores.append({"indice": indice, "error": f"Registro inválido: {e}"})
+            continue
+        validos.append((indice, processor.valores[0], columnas))
+
+    if not validos:
+        return [], errores, []
+
+    # Una matriz (N x 20), una proyección PCA y una llamada a predict_proba
+    lote = DataPreprocessor(np.vstack([valores for _, valores, _ in validos]), modelos=modelos)
+    predicciones = predecir_lote(lote.get_feature_matrix(), modelos=modelos)
+
+    resultados = [
+        {"indice": indice, **resultado}
+        for (indice, _, _), resultado in zip(validos, predicciones)
+    ]
+    filas = [
+        agregar_resultado(columnas, resultado)
+        for (_, _, columnas), resultado in zip(validos, predicciones)
+    ]
+    return resultados, errores, filas
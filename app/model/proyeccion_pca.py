@@ -0,0 +1,28 @@
+# app/model/proyeccion_pca.py
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+
+class ProyeccionPCA(NamedTuple):
+    """PCA_1 como proyección lineal: pca1 = X_escalado · pesos - desplazamiento"""
+    variables: Tuple[str, ...]
+    pesos: np.ndarray
+    desplazamiento: float
+
+
+def compilar_proyeccion(pca, componente: int = 0) -> ProyeccionPCA:
+    """
+    Extrae del PCA entrenado el vector de pesos de un componente y el término
+    constante (mean_ proyectado), con las mismas operaciones que usa
+    pca.transform para que el resultado coincida.
+    """
+    if getattr(pca, "whiten", False):
+        raise ValueError("La proyección lineal no soporta PCA con whiten=True")
+
+    componentes = np.asarray(pca.components_, dtype=np.float64)
+    pesos = np.ascontiguousarray(componentes[componente])
+    desplazamiento = float((np.asarray(pca.mean_, dtype=np.float64).reshape(1, -1) @ componentes.T)[0, componente])
+
+    variables = tuple(getattr(pca, "feature_names_in_", ()))
+    return ProyeccionPCA(variables=variables, pesos=pesos, desplazamiento=desplazamiento)
@@ -0,0 +1,164 @@
+# app/model/registry.py
+import hashlib
+import io
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import joblib
+
+from app.core.model_settings import MODEL_PATH, PCA_MODEL_PATH, MODEL_RELOAD_INTERVAL, MODEL_ENGINE
+from app.model.proyeccion_pca import ProyeccionPCA, compilar_proyeccion
+from app.model.svm_kernel import KernelSVM
+
+
+@dataclass(frozen=True)
+class ModelosCargados:
+    """
+    Versión inmutable de los artefactos cargados. Cada request toma una referencia
+    al inicio y la usa hasta el final, así una recarga no mezcla versiones.
+    """
+    modelo: object
+    pca: object
+    version: str
+    checksums: Dict[str, str]
+    cargado_en: datetime
+    duracion_carga_ms: float
+    # PCA_1 precalculado como producto punto (derivado de pca_model.pkl al cargar)
+    proyeccion_pca: ProyeccionPCA = field(repr=False)
+    # Objeto con predict_proba usado para predecir: el modelo sklearn o el KernelSVM
+    motor: object = field(repr=False)
+    nombre_motor: str
+    firmas: Tuple[Tuple[int, int], ...] = field(repr=False)
+
+
+def _firma_archivo(ruta: Path) -> Tuple[int, int]:
+    stat = ruta.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _crear_motor(modelo, motor: str) -> Tuple[object, str]:
+    if motor == "kernel":
+        try:
+            return KernelSVM(modelo), "kernel"
+        except (ValueError, AttributeError) as e:
+            print(f"Motor kernel no disponible para este modelo, se usa sklearn: {e}")
+    return modelo, "sklearn"
+
+
+def _cargar_artefacto(ruta: Path) -> Tuple[object, str]:
+    # Se lee una sola vez para que el checksum corresponda exactamente a lo deserializado
+    contenido = ruta.read_bytes()
+    return joblib.load(io.BytesIO(contenido)), hashlib.sha256(contenido).hexdigest()
+
+
+class RegistroModelos:
+    def __init__(self, ruta_modelo: Path, ruta_pca: Path, intervalo_recarga: float = 0, motor: str = "sklearn"):
+        self.ruta_modelo = Path(ruta_modelo)
+        self.ruta_pca = Path(ruta_pca)
+        self.intervalo_recarga = intervalo_recarga
+        self.motor = motor
+        self._actual: Optional[ModelosCargados] = None
+        self._lock_carga = threading.Lock()
+        self._vigilancia: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self.recargas = 0
+
+    def cargar(self) -> ModelosCargados:
+        """Carga ambos artefactos desde disco y los publica de forma atómica."""
+        with self._lock_carga:
+            return self._cargar()
+
+    def _cargar(self) -> ModelosCargados:
+        inicio = time.perf_counter()
+        firmas = (_firma_archivo(self.ruta_modelo), _firma_archivo(self.ruta_pca))
+        modelo, sha_modelo = _cargar_artefacto(self.ruta_modelo)
+        pca, sha_pca = _cargar_artefacto(self.ruta_pca)
+        proyeccion_pca = compilar_proyeccion(pca)
+        motor, nombre_motor = _crear_motor(modelo, self.motor)
+
+        nuevos = ModelosCargados(
+            modelo=modelo,
+            pca=pca,
+            version=hashlib.sha256((sha_modelo + sha_pca).encode()).hexdigest()[:12],
+            checksums={self.ruta_modelo.name: sha_modelo, self.ruta_pca.name: sha_pca},
+            cargado_en=datetime.now(timezone.utc),
+            duracion_carga_ms=round((time.perf_counter() - inicio) * 1000, 2),
+            proyeccion_pca=proyeccion_pca,
+            motor=motor,
+            nombre_motor=nombre_motor,
+            firmas=firmas,
+        )
+        if self._actual is not None:
+            self.recargas += 1
+        # Asignar la referencia es atómico: los requests en curso conservan la versión anterior
+        self._actual = nuevos
+        return nuevos
+
+    def actual(self) -> ModelosCargados:
+        # Solo devuelve la versión publicada: la revisión en disco y la recarga las hace el hilo de
+        # vigilancia. Fuera de la app (scripts, pruebas) la primera llamada carga los artefactos
+        modelos = self._actual
+        return modelos if modelos is not None else self.cargar()
+
+    @property
+    def version_publicada(self) -> Optional[str]:
+        """Versión publicada, o None si aún no se cargó nada (no carga los artefactos)."""
+        modelos = self._actual
+        return modelos.version if modelos is not None else None
+
+    def iniciar_vigilancia(self):
+        """Hilo de fondo que revisa los artefactos cada `intervalo_recarga` segundos y recarga si cambiaron."""
+        if self.intervalo_recarga <= 0 or (self._vigilancia is not None and self._vigilancia.is_alive()):
+            return
+        self._detener.clear()
+        self._vigilancia = threading.Thread(target=self._vigilar, name="recarga-modelos", daemon=True)
+        self._vigilancia.start()
+
+    def _vigilar(self):
+        while not self._detener.wait(self.intervalo_recarga):
+            self.recargar_si_cambio()
+
+    def detener_vigilancia(self):
+        self._detener.set()
+        if self._vigilancia is not None:
+            self._vigilancia.join(timeout=5)
+            self._vigilancia = None
+
+    def recargar_si_cambio(self) -> bool:
+        # Solo un hilo revisa/recarga; el resto sigue sirviendo con la versión vigente
+        if not self._lock_carga.acquire(blocking=False):
+            return False
+        try:
+            firmas = (_firma_archivo(self.ruta_modelo), _firma_archivo(self.ruta_pca))
+            if self._actual is not None and firmas == self._actual.firmas:
+                return False
+            self._cargar()
+            return True
+        except Exception as e:
+            # Un archivo a medio copiar no debe tumbar el servicio: se mantiene la versión anterior
+            print(f"Error al recargar modelos, se mantiene la versión vigente: {e}")
+            return False
+        finally:
+            self._lock_carga.release()
+
+    def info(self) -> dict:
+        modelos = self.actual()
+        return {
+            "version": modelos.version,
+            "checksums": modelos.checksums,
+            "cargado_en": modelos.cargado_en.isoformat(),
+            "duracion_carga_ms": modelos.duracion_carga_ms,
+            "motor": modelos.nombre_motor,
+            "recargas": self.recargas,
+        }
+
+
+registro = RegistroModelos(MODEL_PATH, PCA_MODEL_PATH, MODEL_RELOAD_INTERVAL, MODEL_ENGINE)
+
+
+def obtener_modelos() -> ModelosCargados:
+    return registro.actual()
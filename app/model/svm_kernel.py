@@ -0,0 +1,100 @@
+# app/model/svm_kernel.py
+import numpy as np
+
+# Límite que aplica libsvm a las probabilidades de Platt
+_MIN_PROB = 1e-7
+
+
+def _acoplar_binario(r01):
+    """
+    multiclass_probability de la libsvm incluida en sklearn para k = 2,
+    vectorizado sobre el lote. Es un método iterativo con tolerancia
+    0.005 / k, por eso no equivale exactamente a la sigmoide de Platt.
+    """
+    k = 2
+    r10 = 1 - r01
+    q00, q01, q11 = r10 * r10, -r10 * r01, r01 * r01
+    Q = [[q00, q01], [q01, q11]]
+
+    p = [np.full_like(r01, 1.0 / k), np.full_like(r01, 1.0 / k)]
+    activo = np.ones(r01.shape, dtype=bool)
+    for _ in range(100):
+        qp = [Q[t][0] * p[0] + Q[t][1] * p[1] for t in range(k)]
+        pqp = p[0] * qp[0] + p[1] * qp[1]
+        error = np.maximum(np.abs(qp[0] - pqp), np.abs(qp[1] - pqp))
+        activo &= ~(error < 0.005 / k)
+        if not activo.any():
+            break
+
+        for t in range(k):
+            diff = np.where(activo, (-qp[t] + pqp) / Q[t][t], 0.0)
+            p[t] = p[t] + diff
+            pqp = (pqp + diff * (diff * Q[t][t] + 2 * qp[t])) / (1 + diff) / (1 + diff)
+            for j in range(k):
+                qp[j] = (qp[j] + diff * Q[t][j]) / (1 + diff)
+                p[j] = p[j] / (1 + diff)
+    return p[0], p[1]
+
+
+class KernelSVM:
+    """
+    Evaluación en NumPy de un SVC binario de sklearn (función de decisión y
+    probabilidad calibrada con Platt), sin la validación por llamada de sklearn.
+    Los parámetros se extraen una sola vez del modelo entrenado.
+    """
+    __slots__ = (
+        "variables", "kernel", "gamma", "coef0", "degree",
+        "vectores", "normas_vectores", "coef_dual", "intercepto", "prob_a", "prob_b",
+    )
+
+    def __init__(self, svc):
+        if len(svc.classes_) != 2:
+            raise ValueError("El motor kernel solo soporta clasificación binaria")
+        if svc.kernel not in ("rbf", "linear", "poly", "sigmoid"):
+            raise ValueError(f"Kernel no soportado: {svc.kernel}")
+        if not getattr(svc, "probability", False):
+            raise ValueError("El modelo no fue entrenado con probability=True")
+
+        self.variables = list(getattr(svc, "feature_names_in_", []))
+        self.kernel = svc.kernel
+        self.gamma = float(svc._gamma)
+        self.coef0 = float(svc.coef0)
+        self.degree = int(svc.degree)
+
+        self.vectores = np.ascontiguousarray(svc.support_vectors_, dtype=np.float64)
+        self.normas_vectores = np.einsum("ij,ij->i", self.vectores, self.vectores)
+        # dual_coef_ e intercept_ públicos ya tienen el signo de decision_function
+        self.coef_dual = np.ascontiguousarray(svc.dual_coef_[0], dtype=np.float64)
+        self.intercepto = float(svc.intercept_[0])
+        self.prob_a = float(svc.probA_[0])
+        self.prob_b = float(svc.probB_[0])
+
+    def _matriz(self, X):
+        if hasattr(X, "columns") and self.variables and list(X.columns) != self.variables:
+            raise ValueError("Las columnas no coinciden con las usadas para entrenar el modelo")
+        X = np.asarray(X, dtype=np.float64)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def _kernel(self, X):
+        productos = X @ self.vectores.T
+        if self.kernel == "linear":
+            return productos
+        if self.kernel == "poly":
+            return (self.gamma * productos + self.coef0) ** self.degree
+        if self.kernel == "sigmoid":
+            return np.tanh(self.gamma * productos + self.coef0)
+        # rbf: ||x - sv||² = ||x||² + ||sv||² - 2 x·sv
+        distancias = np.einsum("ij,ij->i", X, X)[:, None] + self.normas_vectores[None, :] - 2 * productos
+        return np.exp(-self.gamma * distancias)
+
+    def decision_function(self, X):
+        return self._kernel(self._matriz(X)) @ self.coef_dual + self.intercepto
+
+    def predict_proba(self, X):
+        # libsvm calibra sobre su propio valor de decisión, que tiene el signo opuesto
+        f = -self.decision_function(X) * self.prob_a + self.prob_b
+        # Sigmoide numéricamente estable, igual que sigmoid_predict de libsvm
+        exp_neg = np.exp(-np.abs(f))
+        r01 = np.where(f >= 0, exp_neg / (1 + exp_neg), 1 / (1 + exp_neg))
+        r01 = np.clip(r01, _MIN_PROB, 1 - _MIN_PROB)
+        return np.column_stack(_acoplar_binario(r01))
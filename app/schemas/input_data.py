@@ -1,9 +1,104 @@
-from pydantic import BaseModel
-from typing import List, Union, Optional, Tuple
-from datetime import datetime
+from pydantic import (
+    BaseModel, BeforeValidator, ConfigDict, Discriminator, Field, RootModel, Tag, TypeAdapter, ValidationError, create_model,
+)
+from typing import Annotated, Any, List, Union, Optional, Tuple
+from datetime import date, datetime
+from app.model.campos import CAMPOS, N_NUMERICOS, SCALING_PARAMS
+from app.utils.fechas import parsear_hora
+
+# ---- Registro de tamizaje tipado: un tipo por posición, con el rango de SCALING_PARAMS
+PORCENTAJES = ("Social_Interaction_Issues_%", "Communication_Issues_%")
+
+
+def _tipo_numerico(campo):
+    minimo, maximo = SCALING_PARAMS[campo]
+    if campo in PORCENTAJES:
+        return Annotated[float, Field(ge=minimo, le=maximo, allow_inf_nan=False)]
+    return Annotated[int, Field(ge=minimo, le=maximo)]
+
+
+def _hora(valor):
+    # Time_Start / Time_End: texto del frontend ("11/5/2025, 3:08:53 p. m.") o ISO
+    if not isinstance(valor, (str, datetime)):
+        raise ValueError("se esperaba la fecha y hora como texto")
+    return parsear_hora(valor)
+
+
+Hora = Annotated[datetime, BeforeValidator(_hora)]
+TIPOS_CAMPOS = [_tipo_numerico(campo) for campo in CAMPOS[:N_NUMERICOS]] + [Hora, Hora]
+
+# Posicional: exactamente 25 valores en el orden de CAMPOS (sin Union: un solo tipo por posición)
+ValoresRegistro = Tuple[tuple(TIPOS_CAMPOS)]
+
 
 class InputArray(BaseModel):
-    values: List[Union[int, float, str]]
+    # {"values": [...]}: forma original del frontend
+    values: ValoresRegistro
+
+
+class _RegistroNombrado(BaseModel):
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+
+    def como_valores(self) -> tuple:
+        return tuple(getattr(self, nombre) for nombre in type(self).model_fields)
+
+
+def _nombre_campo(campo: str) -> str:
+    return campo.lower().replace("%", "pct")
+
+
+# Nombrado: {"Age_Years": 14, "Sex_M": 0, ..., "Time_End": "..."} con las claves de CAMPOS
+RegistroNombrado = create_model(
+    "RegistroNombrado",
+    __base__=_RegistroNombrado,
+    **{_nombre_campo(campo): (tipo, Field(alias=campo)) for campo, tipo in zip(CAMPOS, TIPOS_CAMPOS)},
+)
+
+
+def _forma(cuerpo):
+    # Se elige el esquema por la forma del cuerpo, sin probar uno y luego el otro
+    if isinstance(cuerpo, dict):
+        return "posicional" if "values" in cuerpo else "nombrado"
+    return "posicional" if isinstance(cuerpo, InputArray) else "nombrado"
+
+
+class EntradaPrediccion(RootModel[Annotated[
+    Union[Annotated[InputArray, Tag("posicional")], Annotated[RegistroNombrado, Tag("nombrado")]],
+    Discriminator(_forma),
+]]):
+    # Cuerpo de POST /predict: {"values": [...25 valores...]} o un objeto con las claves de CAMPOS
+
+    def valores(self) -> tuple:
+        # Los 25 valores ya validados, en el orden de CAMPOS
+        entrada = self.root
+        return entrada.values if isinstance(entrada, InputArray) else entrada.como_valores()
+
+
+_adaptador_valores = TypeAdapter(ValoresRegistro)
+
+
+def decodificar_valores(valores) -> tuple:
+    """
+    Valida tipos y rangos de un registro de 25 valores en una sola pasada.
+    Lanza ValueError con un mensaje por campo si el registro no es válido.
+    """
+    if len(valores) != len(CAMPOS):
+        raise ValueError(f"Se esperaban {len(CAMPOS)} valores y se recibieron {len(valores)}")
+    try:
+        return _adaptador_valores.validate_python(valores)
+    except ValidationError as e:
+        errores = [f"{CAMPOS[error['loc'][0]]}: {error['msg']}" for error in e.errors()[:3]]
+        raise ValueError("; ".join(errores)) from None
+
+
+class RegistroLote(BaseModel):
+    # Sin tipar aquí: cada registro se valida por separado (decodificar_valores) y uno
+    # inválido se informa en "errores" sin descartar el lote
+    values: List[Any]
+
+class InputBatch(BaseModel):
+    # Varios registros de 25 valores (p. ej. tamizajes sincronizados sin conexión)
+    registros: List[RegistroLote]
 
 class EvaluacionResponse(BaseModel):
     id: int
@@ -24,8 +119,11 @@ class DatosDashboardResponse(BaseModel):
     # Datos para el gráfico de barras de 'perfil_tea'
     perfil_tea: List[Tuple[str, int]]  # Una lista de tuplas (perfil_clinico, count)
     
-    # Datos para el histograma de 'qchat_scores'
-    qchat_scores: List[int]  # Lista de puntajes de QCHAT
+    # Histograma de Q-CHAT-10: qchat_histograma[p] = cantidad de evaluaciones con puntaje p (0 a 10)
+    qchat_histograma: List[int]
+
+    # Lista de puntajes de QCHAT (compatibilidad; se reconstruye desde el histograma)
+    qchat_scores: Optional[List[int]] = None
     
     # Datos para el gráfico de pastel 'tea_pastel' (TEA vs No TEA)
     tea_pastel: List[Tuple[str, int]]  # Una lista de tuplas ('Si'/'No', count)
@@ -34,4 +132,16 @@ class DatosDashboardResponse(BaseModel):
     sexo_pastel: List[Tuple[str, int]]  # Una lista de tuplas ('M'/'F', count)
 
     class Config:
-        from_attributes = True  # Permite la conversión de objetos ORM a Pydantic
\ No newline at end of file
+        from_attributes = True  # Permite la conversión de objetos ORM a Pydantic
+
+class PuntoTendencia(BaseModel):
+    periodo: date  # día, lunes de la semana o primer día del mes
+    total: int
+    con_tea: int
+    sin_tea: int
+    nivel_confianza_promedio: float
+    duracion_promedio_minutos: float
+
+class TendenciaResponse(BaseModel):
+    granularidad: str  # "dia", "semana" o "mes"
+    serie: List[PuntoTendencia]
@@ -0,0 +1,82 @@
+# utils/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+_FALTA = object()
+
+
+class CacheLRU:
+    """
+    Cache en memoria del proceso con límite de tamaño (LRU) y expiración (TTL).
+    Es seguro entre hilos y lleva contadores de aciertos, fallos y desalojos.
+    """
+
+    def __init__(self, max_items: int, ttl_segundos: float = 0):
+        self.max_items = max_items
+        self.ttl_segundos = ttl_segundos
+        self._datos = OrderedDict()  # clave -> (expira_en, valor)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.expirados = 0
+
+    @property
+    def activo(self) -> bool:
+        return self.max_items > 0
+
+    def get(self, clave, default=None):
+        with self._lock:
+            entrada = self._datos.get(clave, _FALTA)
+            if entrada is _FALTA:
+                self.fallos += 1
+                return default
+
+            expira_en, valor = entrada
+            if expira_en is not None and time.monotonic() >= expira_en:
+                del self._datos[clave]
+                self.expirados += 1
+                self.fallos += 1
+                return default
+
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def set(self, clave, valor, ttl_segundos: float = None):
+        if not self.activo:
+            return
+        ttl = self.ttl_segundos if ttl_segundos is None else ttl_segundos
+        expira_en = time.monotonic() + ttl if ttl and ttl > 0 else None
+        with self._lock:
+            self._datos[clave] = (expira_en, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+
+    def pop(self, clave, default=None):
+        with self._lock:
+            entrada = self._datos.pop(clave, _FALTA)
+        return default if entrada is _FALTA else entrada[1]
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+    def estadisticas(self) -> dict:
+        consultas = self.aciertos + self.fallos
+        return {
+            "items": len(self._datos),
+            "max_items": self.max_items,
+            "ttl_segundos": self.ttl_segundos,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+            "expirados": self.expirados,
+            "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+        }
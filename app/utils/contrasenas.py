@@ -0,0 +1,196 @@
+# app/utils/contrasenas.py
+"""
+Contraseñas con bcrypt fuera del event loop y del threadpool de Starlette.
+
+- pwd_context: contexto de passlib (bcrypt, coste 12: ~250 ms de CPU por verificación).
+- PoolContrasenas: ProcessPoolExecutor propio y acotado, con control de admisión:
+  si hay demasiadas verificaciones pendientes o la espera se alarga, PoolSaturado.
+- LimitadorIntentos: ventana deslizante de intentos fallidos por clave (username, IP),
+  para cortar los reintentos antes de gastar CPU en bcrypt.
+
+Este módulo no importa la app: es lo único que cargan los procesos del pool.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+
+# coste (rounds) >= 12
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=12, # coste explícito >= 12
+)
+
+
+def _verificar(password: str, password_hash: str, vence_en: float):
+    # Si el request ya recibió 503 mientras esto esperaba en la cola del proceso, no se gasta CPU
+    if time.time() >= vence_en:
+        return None
+    return pwd_context.verify(password, password_hash)
+
+
+def _hashear(password: str, vence_en: float):
+    if time.time() >= vence_en:
+        return None
+    return pwd_context.hash(password)
+
+
+def _nada(*_):
+    return None
+
+
+def _bajar_prioridad(incremento: int):
+    # Se ejecuta en cada proceso del pool al arrancar
+    if incremento > 0 and hasattr(os, "nice"):
+        os.nice(incremento)
+
+
+class PoolSaturado(Exception):
+    """No hay capacidad para otra verificación: el request se rechaza (503) en vez de esperar."""
+
+
+class PoolContrasenas:
+    def __init__(self, workers: int, max_pendientes: int, max_espera: float, nice: int = 0):
+        self.workers = workers
+        self.max_pendientes = max_pendientes
+        self.max_espera = max_espera
+        self.nice = nice
+        self._ejecutor = None
+        self._lock = threading.Lock()
+        self.pendientes = 0
+        self.max_pendientes_visto = 0
+        self.completadas = 0
+        self.rechazadas = 0
+        self.vencidas = 0
+
+    def _obtener_ejecutor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._ejecutor is None:
+                # spawn: los procesos no heredan hilos ni conexiones abiertas del servidor
+                self._ejecutor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_bajar_prioridad, initargs=(self.nice,),
+                )
+            return self._ejecutor
+
+    async def iniciar(self):
+        """Levanta los procesos antes del primer login (spawn tarda cientos de ms)."""
+        loop = asyncio.get_running_loop()
+        ejecutor = self._obtener_ejecutor()
+        await asyncio.gather(*[loop.run_in_executor(ejecutor, _nada) for _ in range(self.workers)])
+
+    def detener(self):
+        with self._lock:
+            ejecutor, self._ejecutor = self._ejecutor, None
+        if ejecutor is not None:
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    async def _ejecutar(self, fn, *args):
+        if self.pendientes >= self.max_pendientes:
+            self.rechazadas += 1
+            raise PoolSaturado()
+
+        self.pendientes += 1
+        self.max_pendientes_visto = max(self.max_pendientes_visto, self.pendientes)
+        try:
+            loop = asyncio.get_running_loop()
+            # Al vencer, la tarea que aún no empezó se cancela; la que ya pasó a la cola del
+            # proceso ve el vencimiento (hora de pared, compartida entre procesos) y no corre bcrypt
+            vence_en = time.time() + self.max_espera
+            resultado = await asyncio.wait_for(
+                loop.run_in_executor(self._obtener_ejecutor(), fn, *args, vence_en), timeout=self.max_espera,
+            )
+            if resultado is None:
+                # Venció en la cola del proceso justo antes que el timeout de asyncio: tampoco hubo
+                # capacidad. No es un "no" del bcrypt (un 401 contaría como intento fallido)
+                raise asyncio.TimeoutError()
+        except asyncio.TimeoutError as e:
+            self.vencidas += 1
+            raise PoolSaturado() from e
+        finally:
+            self.pendientes -= 1
+        self.completadas += 1
+        return resultado
+
+    async def verificar(self, password: str, password_hash: str) -> bool:
+        return await self._ejecutar(_verificar, password, password_hash)
+
+    async def hashear(self, password: str) -> str:
+        return await self._ejecutar(_hashear, password)
+
+    def estadisticas(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pendientes": self.pendientes,
+            "max_pendientes": self.max_pendientes,
+            "max_pendientes_visto": self.max_pendientes_visto,
+            "max_espera_s": self.max_espera,
+            "completadas": self.completadas,
+            "rechazadas": self.rechazadas,
+            "vencidas": self.vencidas,
+        }
+
+
+class LimitadorIntentos:
+    """
+    Intentos fallidos por clave en una ventana deslizante. Guarda como máximo
+    max_claves claves (se descartan las menos recientes) para acotar la memoria.
+    """
+
+    def __init__(self, max_fallos: int, ventana_segundos: float, max_claves: int = 10_000):
+        self.max_fallos = max_fallos
+        self.ventana_segundos = ventana_segundos
+        self.max_claves = max_claves
+        self._fallos = OrderedDict()  # clave -> deque de instantes (monotonic)
+        self._lock = threading.Lock()
+        self.bloqueos = 0
+
+    def _vigentes(self, clave, ahora):
+        fallos = self._fallos.get(clave)
+        if fallos is None:
+            return None
+        while fallos and ahora - fallos[0] >= self.ventana_segundos:
+            fallos.popleft()
+        if not fallos:
+            del self._fallos[clave]
+            return None
+        return fallos
+
+    def espera(self, clave) -> float:
+        """Segundos que faltan para poder intentar de nuevo (0 = permitido)."""
+        ahora = time.monotonic()
+        with self._lock:
+            fallos = self._vigentes(clave, ahora)
+            if fallos is None or len(fallos) < self.max_fallos:
+                return 0.0
+            self.bloqueos += 1
+            return fallos[-self.max_fallos] + self.ventana_segundos - ahora
+
+    def registrar_fallo(self, clave):
+        ahora = time.monotonic()
+        with self._lock:
+            fallos = self._vigentes(clave, ahora)
+            if fallos is None:
+                fallos = self._fallos[clave] = deque(maxlen=self.max_fallos)
+            fallos.append(ahora)
+            self._fallos.move_to_end(clave)
+            while len(self._fallos) > self.max_claves:
+                self._fallos.popitem(last=False)
+
+    def reiniciar(self, clave):
+        with self._lock:
+            self._fallos.pop(clave, None)
+
+    def estadisticas(self) -> dict:
+        return {
+            "claves": len(self._fallos),
+            "max_fallos": self.max_fallos,
+            "ventana_segundos": self.ventana_segundos,
+            "bloqueos": self.bloqueos,
+        }
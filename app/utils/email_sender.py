@@ -1,14 +1,306 @@
-from fastapi_mail import FastMail, MessageSchema
+# app/utils/email_sender.py
+"""
+Envío de informes PDF por correo en segundo plano.
+
+/enviar-pdf deja el trabajo en ColaCorreo y responde 202. Una única tarea de fondo
+envía la cola reutilizando una sola conexión SMTP autenticada (STARTTLS + login
+una vez, no por correo) y guarda el estado de cada trabajo para /enviar-pdf/{trabajo_id}.
+Un error transitorio no detiene la cola: el trabajo vuelve a ella cuando vence su
+espera exponencial (proximo_intento) y mientras tanto salen los demás.
+
+Los trabajos viven solo en memoria: un reinicio o una caída pierde los que no se
+enviaron (después del reinicio su estado responde 404 y hay que volver a subir el PDF).
+"""
+import asyncio
+import os
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import formataddr
+
+import aiosmtplib
 from fastapi_mail.config import ConnectionConfig
 
+from app.core.email_settings import (
+    CORREO_BACKOFF, CORREO_HISTORIAL, CORREO_INACTIVIDAD, CORREO_MAX_COLA, CORREO_MAX_INTENTOS,
+)
+from app.utils.email_config import conf
+
+ASUNTO = "📎 Informe adjunto"
+CUERPO = "Adjuntamos el informe PDF solicitado."
+
+_FIN = object()  # marca de cierre en la cola
+
+
+class ColaLlena(Exception):
+    """La cola de correos alcanzó su límite: el request se rechaza (503)."""
+
+
+@dataclass
+class TrabajoCorreo:
+    destinatario: str
+    nombre_archivo: str
+    archivo: object  # SpooledTemporaryFile con el PDF; se cierra al terminar
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    estado: str = "en_cola"  # en_cola | enviando | reintentando | enviado | fallido
+    intentos: int = 0
+    error: str = None
+    creado_en: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    proximo_intento: datetime = None  # mientras espera un reintento
+    terminado_en: datetime = None
+
+    @property
+    def terminado(self) -> bool:
+        return self.estado in ("enviado", "fallido")
+
+    def resumen(self) -> dict:
+        # Lo consulta GET /enviar-pdf/{trabajo_id} sin autenticación: no lleva la dirección del
+        # destinatario, ni tampoco dentro del error (los servidores SMTP suelen repetirla)
+        error = self.error.replace(self.destinatario, "<destinatario>") if self.error else self.error
+        return {
+            "trabajo_id": self.id,
+            "estado": self.estado,
+            "intentos": self.intentos,
+            "error": error,
+            "creado_en": self.creado_en.isoformat(),
+            "proximo_intento": self.proximo_intento.isoformat() if self.proximo_intento else None,
+            "terminado_en": self.terminado_en.isoformat() if self.terminado_en else None,
+        }
 
-async def enviar_pdf_por_correo(path: str, destinatario: str, conf: ConnectionConfig):
-    message = MessageSchema(
-        subject="📎 Informe adjunto",
-        recipients=[destinatario],
-        body="Adjuntamos el informe PDF solicitado.",
-        attachments=[path],
-        subtype="plain"
+
+def construir_mensaje(config: ConnectionConfig, trabajo: TrabajoCorreo) -> EmailMessage:
+    mensaje = EmailMessage()
+    mensaje["From"] = formataddr((config.MAIL_FROM_NAME or "", config.MAIL_FROM))
+    mensaje["To"] = trabajo.destinatario
+    mensaje["Subject"] = ASUNTO
+    mensaje.set_content(CUERPO)
+    trabajo.archivo.seek(0)
+    mensaje.add_attachment(
+        trabajo.archivo.read(), maintype="application", subtype="pdf", filename=trabajo.nombre_archivo,
     )
-    fm = FastMail(conf)
-    await fm.send_message(message)
+    return mensaje
+
+
+def nombre_adjunto(nombre: str) -> str:
+    # El nombre del cliente solo se usa como nombre del adjunto, nunca como ruta
+    nombre = os.path.basename((nombre or "").replace("\\", "/")).strip()
+    return nombre or "informe.pdf"
+
+
+def _es_error_transitorio(error: Exception) -> bool:
+    # Red, timeouts, desconexiones y respuestas 4xx se reintentan; 5xx (destinatario, auth) no
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return 400 <= error.code < 500
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(400 <= r.code < 500 for r in error.recipients)
+    return isinstance(error, (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError))
+
+
+class ColaCorreo:
+    def __init__(self, config: ConnectionConfig, max_cola: int = 100, max_intentos: int = 4,
+                 backoff: float = 2, inactividad: float = 60, historial: int = 1000):
+        self.config = config
+        self.max_cola = max_cola
+        self.max_intentos = max(1, max_intentos)
+        self.backoff = backoff
+        self.inactividad = inactividad
+        self.historial = historial
+
+        self._cola = None
+        self._tarea = None
+        self._smtp = None
+        self._trabajos = OrderedDict()  # id -> TrabajoCorreo
+        self._en_espera = {}  # id -> (TimerHandle, TrabajoCorreo) de los que esperan un reintento
+        self._deteniendo = False
+
+        self.encolados = 0
+        self.enviados = 0
+        self.fallidos = 0
+        self.reintentos = 0
+        self.rechazados = 0
+        self.conexiones = 0
+        self.ultimo_error = None
+
+    @property
+    def activo(self) -> bool:
+        return self._tarea is not None and not self._tarea.done()
+
+    # ---------- ciclo de vida
+
+    async def iniciar(self):
+        if self.activo:
+            return
+        self._cola = asyncio.Queue()
+        self._tarea = asyncio.create_task(self._bucle(), name="cola-correo")
+
+    async def detener(self, timeout: float = 30):
+        """Envía lo que queda en la cola (hasta timeout) y cierra la conexión SMTP."""
+        if self._tarea is None:
+            return
+        # Los que esperaban un reintento tienen un último intento antes de cerrar
+        self._deteniendo = True
+        for handle, trabajo in self._en_espera.values():
+            handle.cancel()
+            self._cola.put_nowait(trabajo)
+        self._en_espera.clear()
+        self._cola.put_nowait(_FIN)
+        try:
+            await asyncio.wait_for(self._tarea, timeout)
+        except asyncio.TimeoutError:
+            print(f"La cola de correo no terminó en {timeout}s; {self._cola.qsize()} correos sin enviar")
+        finally:
+            self._tarea = None
+            self._deteniendo = False
+            await self._cerrar_conexion()
+
+    async def encolar(self, destinatario: str, nombre_archivo: str, archivo) -> TrabajoCorreo:
+        """Registra el trabajo y lo deja en cola; la tarea de fondo se inicia si hace falta."""
+        if not self.activo:
+            await self.iniciar()
+        if self._cola.qsize() + len(self._en_espera) >= self.max_cola:
+            self.rechazados += 1
+            raise ColaLlena()
+
+        trabajo = TrabajoCorreo(destinatario, nombre_adjunto(nombre_archivo), archivo)
+        self._trabajos[trabajo.id] = trabajo
+        self._podar_historial()
+        self._cola.put_nowait(trabajo)
+        self.encolados += 1
+        return trabajo
+
+    def estado(self, trabajo_id: str):
+        trabajo = self._trabajos.get(trabajo_id)
+        return trabajo.resumen() if trabajo else None
+
+    def _podar_historial(self):
+        # Solo se descartan trabajos terminados, los más antiguos primero
+        exceso = len(self._trabajos) - self.historial
+        for trabajo_id in [t.id for t in self._trabajos.values() if t.terminado][:max(0, exceso)]:
+            del self._trabajos[trabajo_id]
+
+    # ---------- conexión SMTP
+
+    async def _conexion(self) -> aiosmtplib.SMTP:
+        if self._smtp is not None and self._smtp.is_connected:
+            return self._smtp
+        config = self.config
+        smtp = aiosmtplib.SMTP(
+            hostname=config.MAIL_SERVER,
+            port=config.MAIL_PORT,
+            use_tls=config.MAIL_SSL_TLS,
+            start_tls=config.MAIL_STARTTLS,
+            validate_certs=config.VALIDATE_CERTS,
+            timeout=config.TIMEOUT,
+        )
+        await smtp.connect()
+        if config.USE_CREDENTIALS:
+            await smtp.login(config.MAIL_USERNAME, config.MAIL_PASSWORD.get_secret_value())
+        self._smtp = smtp
+        self.conexiones += 1
+        return smtp
+
+    async def _cerrar_conexion(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            if smtp.is_connected:
+                await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    async def _enviar(self, mensaje: EmailMessage):
+        reutilizada = self._smtp is not None
+        smtp = await self._conexion()
+        try:
+            await smtp.send_message(mensaje)
+        except aiosmtplib.SMTPServerDisconnected:
+            await self._cerrar_conexion()
+            if not reutilizada:
+                raise
+            # El servidor cerró la conexión inactiva: una reconexión inmediata, sin contar intento
+            smtp = await self._conexion()
+            await smtp.send_message(mensaje)
+
+    # ---------- envío
+
+    async def _bucle(self):
+        siguiente = None
+        while True:
+            if siguiente is None:
+                siguiente = asyncio.ensure_future(self._cola.get())
+            if self._smtp is not None:
+                # Sin correos por un tiempo: se cierra la conexión (el get sigue pendiente, no se pierde nada)
+                listos, _ = await asyncio.wait({siguiente}, timeout=self.inactividad)
+                if not listos:
+                    await self._cerrar_conexion()
+                    continue
+            trabajo = await siguiente
+            siguiente = None
+            if trabajo is _FIN:
+                return
+            await self._entregar(trabajo)
+
+    async def _entregar(self, trabajo: TrabajoCorreo):
+        # Un intento por vez: si hay que reintentar, el trabajo vuelve a la cola más tarde
+        trabajo.estado = "enviando"
+        trabajo.intentos += 1
+        trabajo.proximo_intento = None
+        try:
+            await self._enviar(construir_mensaje(self.config, trabajo))
+        except Exception as e:
+            trabajo.error = self.ultimo_error = f"{type(e).__name__}: {e}"
+            await self._cerrar_conexion()
+            if _es_error_transitorio(e) and trabajo.intentos < self.max_intentos and not self._deteniendo:
+                self._reintentar_despues(trabajo, e)
+                return
+            trabajo.estado = "fallido"
+            self.fallidos += 1
+            print(f"No se pudo enviar el informe a {trabajo.destinatario}: {e}")
+        else:
+            trabajo.estado = "enviado"
+            self.enviados += 1
+
+        trabajo.terminado_en = datetime.now(timezone.utc)
+        trabajo.archivo.close()
+
+    def _reintentar_despues(self, trabajo: TrabajoCorreo, error: Exception):
+        espera = min(self.backoff * 2 ** (trabajo.intentos - 1), 60)
+        trabajo.estado = "reintentando"
+        trabajo.proximo_intento = datetime.now(timezone.utc) + timedelta(seconds=espera)
+        self.reintentos += 1
+        print(f"Error al enviar el informe a {trabajo.destinatario}, reintento en {espera}s: {error}")
+        handle = asyncio.get_running_loop().call_later(espera, self._reencolar, trabajo.id)
+        self._en_espera[trabajo.id] = (handle, trabajo)
+
+    def _reencolar(self, trabajo_id: str):
+        pendiente = self._en_espera.pop(trabajo_id, None)
+        if pendiente is not None:
+            self._cola.put_nowait(pendiente[1])
+
+    def estadisticas(self) -> dict:
+        return {
+            "activo": self.activo,
+            "en_cola": self._cola.qsize() if self._cola is not None else 0,
+            "esperando_reintento": len(self._en_espera),
+            "conectado": self._smtp is not None and self._smtp.is_connected,
+            "encolados": self.encolados,
+            "enviados": self.enviados,
+            "fallidos": self.fallidos,
+            "reintentos": self.reintentos,
+            "rechazados": self.rechazados,
+            "conexiones": self.conexiones,
+            "ultimo_error": self.ultimo_error,
+        }
+
+
+cola_correo = ColaCorreo(
+    conf,
+    max_cola=CORREO_MAX_COLA,
+    max_intentos=CORREO_MAX_INTENTOS,
+    backoff=CORREO_BACKOFF,
+    inactividad=CORREO_INACTIVIDAD,
+    historial=CORREO_HISTORIAL,
+)
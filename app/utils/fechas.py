@@ -0,0 +1,45 @@
+# utils/fechas.py
+import re
+from datetime import datetime
+
+import pandas as pd
+
+# Formato fijo del frontend (toLocaleString): "11/5/2025, 3:08:53 p. m." = mes/día/año, 12 h.
+# Acepta también "p.m.", "PM", espacios no separables y la variante de 24 h sin a. m./p. m.
+_HORA_FRONTEND = re.compile(
+    r"(\d{1,2})/(\d{1,2})/(\d{4}),?\s+(\d{1,2}):(\d{2}):(\d{2})(?:\s*([ap])\.?\s*m\.?)?",
+    re.IGNORECASE,
+)
+# ISO 8601 con fecha completa (lo que devuelven isoformat() y JSON.stringify de un Date)
+_ISO = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def parsear_hora(valor) -> datetime:
+    """
+    Convierte la hora que envía el frontend en datetime (sin zona), con el mismo resultado
+    que pd.to_datetime(valor).to_pydatetime() pero sin inferir el formato en cada llamada.
+    ISO 8601 va por datetime.fromisoformat; cualquier otro formato se delega a pandas.
+    """
+    if isinstance(valor, datetime):
+        return valor
+    if isinstance(valor, str):
+        coincidencia = _HORA_FRONTEND.fullmatch(valor.strip())
+        if coincidencia:
+            mes, dia, anio, hora, minuto, segundo = (int(g) for g in coincidencia.groups()[:6])
+            meridiano = coincidencia.group(7)
+            if mes > 12 >= dia:
+                # Igual que dateutil: si el primer número no puede ser mes, es el día
+                mes, dia = dia, mes
+            if meridiano is None or 1 <= hora <= 12:
+                if meridiano:
+                    hora = hora % 12 + (12 if meridiano in "pP" else 0)
+                try:
+                    return datetime(anio, mes, dia, hora, minuto, segundo)
+                except ValueError:
+                    pass  # fecha imposible: pandas decide (y arma el mensaje de error)
+        elif _ISO.match(valor):
+            try:
+                return datetime.fromisoformat(valor)
+            except ValueError:
+                pass
+    return pd.to_datetime(valor).to_pydatetime()
@@ -0,0 +1,100 @@
+# app/utils/memoria.py
+"""
+Snapshots de tracemalloc bajo demanda (/internal/memoria).
+
+tracemalloc solo registra las asignaciones posteriores a su inicio y cuesta CPU y memoria
+mientras está activo, así que arranca con el primer snapshot y se apaga con detener().
+El flujo es: snapshot base -> tráfico -> diff, que muestra dónde creció la memoria
+(p. ej. DataFrames o artefactos del modelo que se vuelven a cargar por request).
+"""
+import threading
+import tracemalloc
+from datetime import datetime, timezone
+
+from app.core.profiling_settings import TRACEMALLOC_FRAMES
+
+# Asignaciones del propio tracemalloc y del import de módulos: ruido en el diff
+_FILTROS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _ubicacion(traceback) -> list:
+    return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+
+
+class InstantaneasMemoria:
+    def __init__(self, frames: int = TRACEMALLOC_FRAMES):
+        self.frames = frames
+        self._base = None
+        self._base_en = None
+        self._lock = threading.Lock()
+
+    def _tomar(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        return tracemalloc.take_snapshot().filter_traces(_FILTROS)
+
+    def _uso(self) -> dict:
+        actual, pico = tracemalloc.get_traced_memory()
+        return {
+            "rastreando": tracemalloc.is_tracing(),
+            "memoria_rastreada_bytes": actual,
+            "pico_bytes": pico,
+            "sobrecarga_tracemalloc_bytes": tracemalloc.get_tracemalloc_memory(),
+            "base_tomada_en": self._base_en.isoformat() if self._base_en else None,
+        }
+
+    def tomar_base(self, agrupar: str = "lineno", limite: int = 20) -> dict:
+        """Inicia tracemalloc si hace falta y guarda un snapshot como base de los diffs."""
+        with self._lock:
+            self._base = self._tomar()
+            self._base_en = datetime.now(timezone.utc)
+            estadisticas = self._base.statistics(agrupar)
+            return {
+                **self._uso(),
+                "top": [
+                    {"ubicacion": _ubicacion(e.traceback), "bytes": e.size, "bloques": e.count}
+                    for e in estadisticas[:limite]
+                ],
+            }
+
+    def diferencia(self, agrupar: str = "lineno", limite: int = 20, actualizar: bool = False):
+        """Compara un snapshot nuevo con la base; None si todavía no hay base."""
+        with self._lock:
+            if self._base is None:
+                return None
+            actual = self._tomar()
+            diferencias = actual.compare_to(self._base, agrupar)
+            resultado = {
+                **self._uso(),
+                "crecimiento_total_bytes": sum(d.size_diff for d in diferencias),
+                "top": [
+                    {
+                        "ubicacion": _ubicacion(d.traceback),
+                        "bytes": d.size,
+                        "diferencia_bytes": d.size_diff,
+                        "bloques": d.count,
+                        "diferencia_bloques": d.count_diff,
+                    }
+                    for d in diferencias[:limite]
+                ],
+            }
+            if actualizar:
+                self._base = actual
+                self._base_en = datetime.now(timezone.utc)
+                resultado["base_tomada_en"] = self._base_en.isoformat()
+            return resultado
+
+    def detener(self):
+        with self._lock:
+            self._base = None
+            self._base_en = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+memoria = InstantaneasMemoria()
@@ -0,0 +1,258 @@
+# app/utils/metricas.py
+"""
+Métricas del proceso en memoria, expuestas en formato de texto de Prometheus (GET /metrics).
+
+- MiddlewareMetricas: middleware ASGI; por método y ruta (la plantilla, p. ej.
+  /dashboard/evaluacion/{evaluacion_id}) registra la duración, los requests por estado,
+  los errores (5xx y excepciones) y los requests en curso.
+- etapa("preprocesamiento"): temporizador de una etapa del camino caliente (/predict, dashboard).
+- registrar_entrada(request): etapa "entrada" = desde que llegó el request hasta que corre el
+  endpoint (lectura del body, JSON, validación pydantic y dependencias).
+
+Cada observación es un bisect y unas sumas bajo un lock: se puede dejar activo en producción.
+Con varios workers de uvicorn cada proceso tiene sus propias series.
+"""
+import bisect
+import threading
+from time import perf_counter
+
+from starlette.routing import Match
+
+from app.core.metrics_settings import METRICS_ENABLED
+from app.utils.cache import CacheLRU
+
+# Límites superiores (segundos) de los buckets de latencia
+BUCKETS_SEGUNDOS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIN_RUTA = "sin_ruta"  # 404: todas las rutas desconocidas en una sola serie
+CLAVE_INICIO = "metricas_inicio"
+LE_INF = 'le="+Inf"'
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _etiquetas(nombres, valores, extra: str = "") -> str:
+    partes = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(valor) -> str:
+    if isinstance(valor, float):
+        return repr(valor) if valor != int(valor) or abs(valor) >= 1e15 else str(int(valor))
+    return str(valor)
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def reiniciar(self):
+        with self._lock:
+            self._series = {}
+
+    def _encabezado(self):
+        return [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def incrementar(self, *valores, cantidad: float = 1):
+        with self._lock:
+            self._series[valores] = self._series.get(valores, 0) + cantidad
+
+    def valor(self, *valores):
+        return self._series.get(valores, 0)
+
+    def exponer(self):
+        with self._lock:
+            series = sorted(self._series.items())
+        return self._encabezado() + [
+            f"{self.nombre}{_etiquetas(self.etiquetas, valores)} {_numero(total)}" for valores, total in series
+        ]
+
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+
+    def sumar(self, delta: float, *valores):
+        with self._lock:
+            self._series[valores] = self._series.get(valores, 0) + delta
+
+    def valor(self, *valores):
+        return self._series.get(valores, 0)
+
+    exponer = Contador.exponer
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas=(), buckets=BUCKETS_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(buckets)
+
+    def observar(self, valor: float, *valores):
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                # [conteo por bucket (+Inf al final), suma, cantidad]
+                serie = self._series[valores] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def cantidad(self, *valores) -> int:
+        serie = self._series.get(valores)
+        return serie[2] if serie else 0
+
+    def exponer(self):
+        with self._lock:
+            series = sorted((valores, (list(c), s, n)) for valores, (c, s, n) in self._series.items())
+        lineas = self._encabezado()
+        for valores, (conteos, suma, cantidad) in series:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets, conteos):
+                acumulado += conteo
+                le = f'le="{_numero(float(limite))}"'
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, valores, le)} {acumulado}")
+            lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, valores, LE_INF)} {cantidad}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, valores)} {_numero(round(suma, 9))}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, valores)} {cantidad}")
+        return lineas
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self.metricas = []
+
+    def registrar(self, metrica):
+        self.metricas.append(metrica)
+        return metrica
+
+    def exponer(self) -> str:
+        return "\n".join(linea for metrica in self.metricas for linea in metrica.exponer()) + "\n"
+
+    def reiniciar(self):
+        for metrica in self.metricas:
+            metrica.reiniciar()
+
+
+metricas = RegistroMetricas()
+
+duracion_requests = metricas.registrar(Histograma(
+    "http_request_duration_seconds", "Duración de los requests HTTP hasta enviar la respuesta completa",
+    ("method", "route"),
+))
+requests_totales = metricas.registrar(Contador(
+    "http_requests_total", "Requests HTTP terminados, por estado", ("method", "route", "status"),
+))
+errores_requests = metricas.registrar(Contador(
+    "http_request_errors_total", "Requests con respuesta 5xx o excepción sin manejar", ("method", "route", "tipo"),
+))
+requests_en_curso = metricas.registrar(Medidor(
+    "http_requests_in_flight", "Requests HTTP en curso", ("route",),
+))
+duracion_etapas = metricas.registrar(Histograma(
+    "teanimo_stage_duration_seconds", "Duración de las etapas de /predict y del dashboard", ("etapa",),
+))
+errores_etapas = metricas.registrar(Contador(
+    "teanimo_stage_errors_total", "Etapas que terminaron con excepción", ("etapa",),
+))
+
+
+class _Etapa:
+    __slots__ = ("nombre", "inicio")
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if METRICS_ENABLED:
+            duracion_etapas.observar(perf_counter() - self.inicio, self.nombre)
+            if tipo is not None:
+                errores_etapas.incrementar(self.nombre)
+        return False
+
+
+def etapa(nombre: str) -> _Etapa:
+    """with etapa("prediccion"): ... registra la duración del bloque (también si es async)."""
+    return _Etapa(nombre)
+
+
+def registrar_entrada(request, nombre: str = "entrada"):
+    """Tiempo desde que el middleware recibió el request hasta este punto del endpoint."""
+    inicio = request.scope.get("state", {}).get(CLAVE_INICIO)
+    if METRICS_ENABLED and inicio is not None:
+        duracion_etapas.observar(perf_counter() - inicio, nombre)
+
+
+class MiddlewareMetricas:
+    """Middleware ASGI puro (sin BaseHTTPMiddleware): no envuelve el body ni cambia la respuesta."""
+
+    def __init__(self, app):
+        self.app = app
+        # (método, path) -> plantilla de la ruta; acotado para paths con ids
+        self._rutas = CacheLRU(2048)
+
+    def _ruta(self, scope) -> str:
+        clave = (scope["method"], scope["path"])
+        ruta = self._rutas.get(clave)
+        if ruta is None:
+            ruta = SIN_RUTA
+            aplicacion = scope.get("app")
+            for candidata in getattr(getattr(aplicacion, "router", None), "routes", ()):
+                coincidencia, _ = candidata.matches(scope)
+                if coincidencia == Match.FULL:
+                    ruta = candidata.path
+                    break
+                if coincidencia == Match.PARTIAL and ruta == SIN_RUTA:
+                    ruta = candidata.path  # método no permitido (405): misma plantilla
+            self._rutas.set(clave, ruta)
+        return ruta
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        inicio = perf_counter()
+        scope.setdefault("state", {})[CLAVE_INICIO] = inicio
+        metodo = scope["method"]
+        ruta = self._ruta(scope)
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        requests_en_curso.sumar(1, ruta)
+        try:
+            await self.app(scope, receive, enviar)
+        except Exception:
+            errores_requests.incrementar(metodo, ruta, "excepcion")
+            estado = 500
+            raise
+        else:
+            if estado >= 500:
+                errores_requests.incrementar(metodo, ruta, "5xx")
+        finally:
+            requests_en_curso.sumar(-1, ruta)
+            duracion_requests.observar(perf_counter() - inicio, metodo, ruta)
+            requests_totales.incrementar(metodo, ruta, str(estado))
@@ -0,0 +1,354 @@
+# app/utils/perfilador.py
+"""
+Perfilado de requests lentos por muestreo de pilas (opt-in con PROFILING_ENABLED).
+
+Mientras haya algún request perfilado, un hilo toma cada PROFILING_INTERVAL_MS las pilas de
+todos los hilos del proceso (sys._current_frames). Así se ve también lo que pasa fuera del
+event loop: el ejecutor del modelo, el threadpool de los endpoints sync y la espera de I/O.
+cProfile no sirve aquí: solo mide el hilo que lo activa y con requests concurrentes en el
+mismo event loop mezcla y pisa los perfiles.
+
+Cada pila se atribuye al request dueño del hilo:
+- hilo del event loop: el request cuya tarea asyncio está corriendo en ese momento;
+- hilo del ejecutor del modelo: el request que encargó el trabajo (atribuir(), desde
+  en_ejecutor_modelo).
+El loop ocupado en otra tarea (requests no perfilados, tareas de fondo) no suma a nadie. Las
+pilas de hilos sin dueño conocido (p. ej. el threadpool de los endpoints sync) se suman a todos
+los requests en curso y se cuentan en muestras_compartidas; sesiones_simultaneas dice con
+cuántos requests perfilados se solapó cada uno.
+
+Se guardan los PROFILING_MAX_PERFILES requests más lentos sobre PROFILING_THRESHOLD_MS y los
+más recientes de la fracción PROFILING_SAMPLE_RATE. Cada perfil se descarga en formato de
+pilas colapsadas ("hilo;funcion;funcion N"), que leen flamegraph.pl y speedscope.
+"""
+import asyncio
+import contextvars
+import heapq
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from time import perf_counter
+
+from app.core.profiling_settings import (
+    PROFILING_ENABLED, PROFILING_INTERVAL_MS, PROFILING_MAX_PERFILES, PROFILING_RUTAS, PROFILING_SAMPLE_RATE,
+    PROFILING_THRESHOLD_MS,
+)
+
+PROFUNDIDAD_MAXIMA = 128
+# Hoja de la pila de un hilo que está esperando (no consume CPU): se cuenta aparte
+ESPERAS = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),  # concurrent.futures esperando una tarea
+    ("core.py", "_connection_worker_thread"),  # hilo de aiosqlite esperando una consulta
+}
+_RAIZ = os.getcwd() + os.sep
+
+
+def _archivo(ruta: str) -> str:
+    if "site-packages" + os.sep in ruta:
+        return ruta.split("site-packages" + os.sep, 1)[1]
+    if ruta.startswith(_RAIZ):
+        return ruta[len(_RAIZ):]
+    return os.path.basename(ruta)
+
+
+_nombres = {}
+
+
+def _nombre(codigo) -> str:
+    nombre = _nombres.get(codigo)
+    if nombre is None:
+        nombre = _nombres[codigo] = f"{codigo.co_qualname} ({_archivo(codigo.co_filename)}:{codigo.co_firstlineno})"
+    return nombre
+
+
+def _en_espera(frame) -> bool:
+    codigo = frame.f_code
+    return (os.path.basename(codigo.co_filename), codigo.co_name) in ESPERAS
+
+
+def _pila(frame, hilo: str) -> str:
+    nombres = []
+    while frame is not None and len(nombres) < PROFUNDIDAD_MAXIMA:
+        nombres.append(_nombre(frame.f_code))
+        frame = frame.f_back
+    nombres.append(hilo)
+    return ";".join(reversed(nombres))
+
+
+class Sesion:
+    """Request en curso al que el hilo de muestreo le va sumando pilas."""
+
+    __slots__ = (
+        "metodo", "path", "muestreada", "inicio", "pilas", "muestras", "muestras_espera",
+        "muestras_compartidas", "simultaneas", "loop", "hilo_loop", "tarea", "hilos",
+    )
+
+    def __init__(self, metodo: str, path: str, muestreada: bool):
+        self.metodo = metodo
+        self.path = path
+        self.muestreada = muestreada
+        self.inicio = perf_counter()
+        self.pilas = Counter()
+        self.muestras = 0
+        self.muestras_espera = 0
+        self.muestras_compartidas = 0
+        self.simultaneas = 1
+        # Tarea del request en su event loop y hilos de ejecutores trabajando para él ahora mismo
+        try:
+            self.loop = asyncio.get_running_loop()
+            self.tarea = asyncio.current_task()
+            self.hilo_loop = threading.get_ident()
+        except RuntimeError:
+            self.loop = self.tarea = self.hilo_loop = None
+        self.hilos = set()
+
+
+# Sesión del request en curso; la leen los ejecutores al recibir trabajo (atribuir)
+_sesion_actual = contextvars.ContextVar("sesion_perfilada", default=None)
+
+
+def atribuir(fn):
+    """
+    Envuelve fn (que va a correr en otro hilo) para que las muestras de ese hilo se atribuyan
+    solo al request perfilado que la encargó. Sin request perfilado devuelve fn tal cual.
+    """
+    sesion = _sesion_actual.get()
+    if sesion is None:
+        return fn
+
+    def en_hilo():
+        ident = threading.get_ident()
+        sesion.hilos.add(ident)
+        try:
+            return fn()
+        finally:
+            sesion.hilos.discard(ident)
+
+    return en_hilo
+
+
+@dataclass
+class Perfil:
+    metodo: str
+    path: str
+    estado: int
+    duracion_ms: float
+    motivo: str  # umbral | muestra
+    muestras: int
+    muestras_espera: int
+    muestras_compartidas: int
+    sesiones_simultaneas: int
+    pilas: Counter
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    creado_en: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def __lt__(self, otro):
+        return self.duracion_ms < otro.duracion_ms
+
+    def resumen(self, funciones: int = 10) -> dict:
+        # Funciones en la hoja de más pilas activas (tiempo propio, no acumulado)
+        propias = Counter()
+        for pila, cantidad in self.pilas.items():
+            propias[pila.rsplit(";", 1)[-1]] += cantidad
+        return {
+            "id": self.id,
+            "metodo": self.metodo,
+            "path": self.path,
+            "estado": self.estado,
+            "duracion_ms": self.duracion_ms,
+            "motivo": self.motivo,
+            "creado_en": self.creado_en.isoformat(),
+            "muestras": self.muestras,
+            "muestras_espera": self.muestras_espera,
+            "muestras_compartidas": self.muestras_compartidas,
+            "sesiones_simultaneas": self.sesiones_simultaneas,
+            "funciones": [{"funcion": f, "muestras": n} for f, n in propias.most_common(funciones)],
+        }
+
+    def colapsado(self) -> str:
+        return "".join(f"{pila} {cantidad}\n" for pila, cantidad in self.pilas.most_common())
+
+
+class Perfilador:
+    def __init__(self, fraccion: float, umbral_ms: float, max_perfiles: int, intervalo_ms: float, rutas=()):
+        self.fraccion = fraccion
+        self.umbral_ms = umbral_ms
+        self.max_perfiles = max_perfiles
+        self.intervalo = intervalo_ms / 1000
+        self.rutas = tuple(rutas)
+        self._sesiones = set()
+        self._peores = []  # heap de mínimos por duración: la raíz es la primera en salir
+        self._recientes = deque(maxlen=max_perfiles)
+        self._lock = threading.Lock()
+        self._hay_sesiones = threading.Condition(self._lock)
+        self._hilo = None
+        self.perfilados = 0
+        self.descartados = 0
+        self.muestras_tomadas = 0
+        self.tiempo_muestreo_s = 0.0
+
+    def aplica(self, path: str) -> bool:
+        return not self.rutas or path.startswith(self.rutas)
+
+    def iniciar(self, metodo: str, path: str):
+        """Devuelve la Sesion del request, o None si este request no se perfila."""
+        muestreada = self.fraccion > 0 and random.random() < self.fraccion
+        if not muestreada and self.umbral_ms <= 0:
+            return None
+        sesion = Sesion(metodo, path, muestreada)
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._muestrear, name="perfilador", daemon=True)
+                self._hilo.start()
+            self._sesiones.add(sesion)
+            for otra in self._sesiones:
+                otra.simultaneas = max(otra.simultaneas, len(self._sesiones))
+            self._hay_sesiones.notify()
+        return sesion
+
+    def terminar(self, sesion: Sesion, estado: int):
+        duracion_ms = round((perf_counter() - sesion.inicio) * 1000, 3)
+        with self._lock:
+            self._sesiones.discard(sesion)
+            lento = self.umbral_ms > 0 and duracion_ms >= self.umbral_ms
+            if not lento and not sesion.muestreada:
+                self.descartados += 1
+                return None
+            perfil = Perfil(
+                sesion.metodo, sesion.path, estado, duracion_ms, "umbral" if lento else "muestra",
+                sesion.muestras, sesion.muestras_espera, sesion.muestras_compartidas, sesion.simultaneas,
+                sesion.pilas,
+            )
+            self.perfilados += 1
+            if not lento:
+                self._recientes.append(perfil)
+            elif len(self._peores) < self.max_perfiles:
+                heapq.heappush(self._peores, perfil)
+            elif self._peores and self._peores[0].duracion_ms < duracion_ms:
+                heapq.heapreplace(self._peores, perfil)
+        return perfil
+
+    @staticmethod
+    def _duenos(sesiones) -> dict:
+        """Hilo -> sesión que lo ocupa: hilos de ejecutor registrados y el loop de cada tarea en curso."""
+        duenos = {}
+        for sesion in sesiones:
+            for ident in list(sesion.hilos):
+                duenos[ident] = sesion
+        for sesion in sesiones:
+            if sesion.loop is not None and sesion.tarea is asyncio.current_task(sesion.loop):
+                duenos[sesion.hilo_loop] = sesion
+        return duenos
+
+    def _muestrear(self):
+        propio = threading.get_ident()
+        while True:
+            with self._lock:
+                while not self._sesiones:
+                    self._hay_sesiones.wait()
+                sesiones = list(self._sesiones)
+            inicio = perf_counter()
+            hilos = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+            duenos = self._duenos(sesiones)
+            loops = {sesion.hilo_loop for sesion in sesiones}
+            propias, compartidas, en_espera = [], [], 0
+            for ident, frame in sys._current_frames().items():
+                if ident == propio:
+                    continue
+                if _en_espera(frame):
+                    en_espera += 1
+                    continue
+                pila = _pila(frame, hilos.get(ident, str(ident)))
+                if ident in duenos:
+                    propias.append((duenos[ident], pila))
+                elif ident not in loops:
+                    compartidas.append(pila)
+            with self._lock:
+                for sesion in self._sesiones:
+                    sesion.muestras += 1
+                    sesion.muestras_espera += en_espera
+                    sesion.muestras_compartidas += len(compartidas)
+                    sesion.pilas.update(compartidas)
+                for sesion, pila in propias:
+                    if sesion in self._sesiones:  # pudo terminar después de tomar la muestra
+                        sesion.pilas[pila] += 1
+                self.muestras_tomadas += 1
+                self.tiempo_muestreo_s += perf_counter() - inicio
+            time.sleep(self.intervalo)
+
+    def perfiles(self) -> list:
+        with self._lock:
+            return sorted(self._peores, reverse=True) + list(reversed(self._recientes))
+
+    def obtener(self, perfil_id: str):
+        return next((perfil for perfil in self.perfiles() if perfil.id == perfil_id), None)
+
+    def limpiar(self):
+        with self._lock:
+            self._peores = []
+            self._recientes.clear()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "habilitado": PROFILING_ENABLED,
+                "fraccion": self.fraccion,
+                "umbral_ms": self.umbral_ms,
+                "intervalo_ms": self.intervalo * 1000,
+                "rutas": list(self.rutas),
+                "en_curso": len(self._sesiones),
+                "perfilados": self.perfilados,
+                "descartados": self.descartados,
+                "muestras_tomadas": self.muestras_tomadas,
+                "costo_medio_muestra_ms": round(self.tiempo_muestreo_s / self.muestras_tomadas * 1000, 3)
+                if self.muestras_tomadas else None,
+            }
+
+
+perfilador = Perfilador(
+    PROFILING_SAMPLE_RATE, PROFILING_THRESHOLD_MS, PROFILING_MAX_PERFILES, PROFILING_INTERVAL_MS, PROFILING_RUTAS,
+)
+
+
+class MiddlewarePerfiles:
+    """Middleware ASGI puro: abre una sesión de muestreo por request elegible y la cierra al responder."""
+
+    def __init__(self, app, perfilador: Perfilador = perfilador, habilitado: bool = None):
+        self.app = app
+        self.perfilador = perfilador
+        self.habilitado = PROFILING_ENABLED if habilitado is None else habilitado
+
+    async def __call__(self, scope, receive, send):
+        if not self.habilitado or scope["type"] != "http" or not self.perfilador.aplica(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        sesion = self.perfilador.iniciar(scope["method"], scope["path"])
+        if sesion is None:
+            await self.app(scope, receive, send)
+            return
+        token = _sesion_actual.set(sesion)
+
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _sesion_actual.reset(token)
+            self.perfilador.terminar(sesion, estado)
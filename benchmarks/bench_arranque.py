@@ -0,0 +1,86 @@
+"""
+Tiempo de arranque en frío: desde lanzar uvicorn hasta la primera respuesta 200 de
+/health/ready (importación + lifespan completo: base, admin, modelos, pools).
+
+    python -m benchmarks.bench_arranque
+    python -m benchmarks.bench_arranque --repeticiones 5 --workers 2
+    python -m benchmarks.bench_arranque --app otro.modulo:app --ruta /docs   # p. ej. una versión anterior
+
+Sin DATABASE_URL cada repetición usa una base SQLite nueva: "primer arranque" crea las tablas
+y el admin (bcrypt) y "reinicio" vuelve a arrancar sobre esa misma base. Con DATABASE_URL se
+usa esa base y los dos casos miden lo mismo salvo que la base esté vacía.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def medir_arranque(app: str, ruta: str, entorno: dict, workers: int = 1, limite_s: float = 120) -> float:
+    """Segundos desde el Popen de uvicorn hasta el primer 200 en `ruta`."""
+    puerto = _puerto_libre()
+    url = f"http://127.0.0.1:{puerto}{ruta}"
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(puerto),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=entorno, stdout=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - inicio < limite_s:
+            if proceso.poll() is not None:
+                raise RuntimeError(f"uvicorn terminó al arrancar (código {proceso.returncode})")
+            try:
+                if httpx.get(url, timeout=1).status_code == 200:
+                    return time.perf_counter() - inicio
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+        raise RuntimeError(f"{ruta} no respondió 200 en {limite_s:.0f} s")
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="app.main:app")
+    parser.add_argument("--ruta", default="/health/ready", help="ruta que indica que el servidor está listo")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    base = os.environ.copy()
+    base.setdefault("SECRET_KEY", "clave-de-benchmark")
+    base.setdefault("MAIL_USERNAME", "benchmark@example.com")
+    base.setdefault("MAIL_PASSWORD", "benchmark")
+    # "primer arranque" mide la creación de tablas con create_all
+    base.setdefault("AUTO_CREATE_TABLES", "true")
+
+    tiempos = {"primer arranque": [], "reinicio": []}
+    for _ in range(args.repeticiones):
+        entorno = dict(base)
+        if "DATABASE_URL" not in os.environ:
+            entorno["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/arranque.db"
+        for caso in tiempos:
+            tiempos[caso].append(medir_arranque(args.app, args.ruta, entorno, args.workers))
+
+    for caso, valores in tiempos.items():
+        detalle = ", ".join(f"{v:.2f}" for v in valores)
+        print(f"{caso:16s}: mediana {statistics.median(valores):.2f} s  ({detalle})")
+
+
+if __name__ == "__main__":
+    main()
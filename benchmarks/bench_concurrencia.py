@@ -0,0 +1,133 @@
+"""
+Latencia p50/p99 de /predict y del dashboard con 50, 200 y 500 clientes concurrentes:
+handlers async (AsyncSession + ejecutor del modelo) vs. réplica síncrona (def + SessionLocal,
+que ocupa un hilo del threadpool de Starlette durante todo el request).
+
+    python -m benchmarks.bench_concurrencia [--clientes 50 200 500] [--requests-por-cliente 5]
+
+Sin DATABASE_URL usa una base SQLite temporal.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.comun import preparar_entorno, registro_ejemplo
+
+preparar_entorno("bench_concurrencia")
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.api import api, dashboard
+from app.api.deps_auth import get_current_user
+from app.db.database import Base, SessionLocal, engine, async_engine
+from app.db.models import Evaluacion
+from app.model.registry import registro
+from app.schemas.input_data import InputArray
+
+
+def _app_sync():
+    """Réplica de los handlers síncronos anteriores, para comparar"""
+    router = APIRouter()
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @router.post("/predict")
+    def predict(data: InputArray, db: Session = Depends(get_db)):
+        resultado, data_dict = api._evaluar(data.values)
+        hora_actual = api.datetime.now(api.LIMA).replace(microsecond=0)
+        evaluacion = Evaluacion(**api._completar_evaluacion(data_dict, hora_actual))
+        db.add(evaluacion)
+        db.commit()
+        db.refresh(evaluacion)
+        return resultado
+
+    @router.get("/dashboard/dashboard/datos")
+    def datos(db: Session = Depends(get_db)):
+        query = db.query(Evaluacion)
+        perfil = query.with_entities(Evaluacion.perfil_clinico, func.count(Evaluacion.id)).group_by(Evaluacion.perfil_clinico).all()
+        qchat = query.with_entities(Evaluacion.qchat_resultado).all()
+        tea = query.with_entities(Evaluacion.rasgos_tea, func.count(Evaluacion.id)).group_by(Evaluacion.rasgos_tea).all()
+        sexo = query.with_entities(Evaluacion.sexo, func.count(Evaluacion.id)).group_by(Evaluacion.sexo).all()
+        return {"perfil_tea": len(perfil), "qchat_scores": len(qchat), "tea": len(tea), "sexo": len(sexo)}
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+def _app_async():
+    app = FastAPI()
+    app.include_router(api.router)
+    app.include_router(dashboard.router)
+    app.dependency_overrides[get_current_user] = lambda: None
+    return app
+
+
+async def _cliente(http, metodo, ruta, cuerpo, n, latencias, errores):
+    for _ in range(n):
+        inicio = time.perf_counter()
+        try:
+            response = await http.request(metodo, ruta, json=cuerpo)
+            if response.status_code >= 400:
+                errores.append(response.status_code)
+        except Exception as e:
+            errores.append(type(e).__name__)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+
+async def _escenario(app, metodo, ruta, cuerpo, clientes, por_cliente):
+    latencias, errores = [], []
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=120) as http:
+        inicio = time.perf_counter()
+        await asyncio.gather(*[
+            _cliente(http, metodo, ruta, cuerpo, por_cliente, latencias, errores) for _ in range(clientes)
+        ])
+        total = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "p50_ms": latencias[len(latencias) // 2],
+        "p99_ms": latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))],
+        "rps": len(latencias) / total,
+        "errores": len(errores),
+    }
+
+
+async def _ejecutar(args):
+    cuerpo = {"values": registro_ejemplo()}
+    apps = {"sync": _app_sync(), "async": _app_async()}
+    escenarios = [("POST", "/predict", cuerpo), ("GET", "/dashboard/dashboard/datos", None)]
+
+    print(f"{'endpoint':28s} {'modo':6s} {'clientes':>8s} {'p50 ms':>9s} {'p99 ms':>9s} {'req/s':>8s} {'errores':>8s}")
+    for metodo, ruta, body in escenarios:
+        for clientes in args.clientes:
+            for modo, app in apps.items():
+                r = await _escenario(app, metodo, ruta, body, clientes, args.requests_por_cliente)
+                print(f"{ruta:28s} {modo:6s} {clientes:8d} {r['p50_ms']:9.1f} {r['p99_ms']:9.1f} {r['rps']:8.1f} {r['errores']:8d}")
+
+    # Cerrar las conexiones async (aiosqlite usa un hilo por conexión)
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clientes", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--requests-por-cliente", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    registro.cargar()
+    asyncio.run(_ejecutar(args))
+
+
+if __name__ == "__main__":
+    main()
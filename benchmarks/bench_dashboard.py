@@ -0,0 +1,135 @@
+"""
+Datos del dashboard sobre 1M de evaluaciones: las 4 consultas anteriores (con todos los
+qchat_resultado viajando a Python), la consulta única con histograma en la BD y la
+lectura desde el resumen diario (evaluaciones_resumen_diario). Las variantes "+ lista"
+agregan qchat_scores expandida desde el histograma, como responde la API con
+DASHBOARD_QCHAT_SCORES_LEGACY=true (el valor por defecto).
+
+    python -m benchmarks.bench_dashboard [--filas 1000000] [--repeticiones 5]
+
+Sin DATABASE_URL usa una base SQLite temporal. Con DATABASE_URL apunta a una base
+de pruebas: la tabla evaluaciones se llena con filas sintéticas.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.comun import medir, preparar_entorno
+
+preparar_entorno("bench_dashboard")
+
+from sqlalchemy import func, insert, select
+
+from app.api.dashboard import _agregados_resumen, _consulta_agregados, _filtros, _histograma_qchat
+from app.db.database import AsyncSessionLocal, Base, SessionLocal, async_engine, engine
+from app.db.resumen_diario import reconstruir_resumen
+from app.db.models import Evaluacion
+
+PERFILES = ["comunicativo", "mixto", "interactivo-social"]
+
+
+def poblar(filas: int, lote: int = 50_000):
+    rnd = random.Random(42)
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        existentes = conn.scalar(select(func.count()).select_from(Evaluacion))  # pylint: disable=E1102
+        for inicio in range(existentes, filas, lote):
+            datos = []
+            for _ in range(min(lote, filas - inicio)):
+                hora = base + timedelta(minutes=rnd.randrange(365 * 24 * 60))
+                datos.append({
+                    "edad": rnd.randint(1, 4), "sexo": rnd.choice("MF"), "qchat_resultado": rnd.randint(0, 10),
+                    "perfil_clinico": rnd.choice(PERFILES), "rasgos_tea": rnd.choice(["Si", "No"]),
+                    "nivel_confianza": 0.7, "hora_inicio": hora, "hora_fin": hora + timedelta(minutes=8),
+                    "duracion_minutos": 8,
+                })
+            conn.execute(insert(Evaluacion), datos)
+
+
+def legacy(db, filtros):
+    # pylint: disable=E1102
+    def contar_por(columna):
+        return select(columna, func.count(Evaluacion.id)).where(*filtros).group_by(columna)
+
+    return {
+        "perfil_tea": db.execute(contar_por(Evaluacion.perfil_clinico)).all(),
+        "qchat_scores": [s for (s,) in db.execute(select(Evaluacion.qchat_resultado).where(*filtros))],
+        "tea_pastel": db.execute(contar_por(Evaluacion.rasgos_tea)).all(),
+        "sexo_pastel": db.execute(contar_por(Evaluacion.sexo)).all(),
+    }
+
+
+def consulta_unica(db, filtros):
+    agregados = {}
+    for dimension, valor, cantidad in db.execute(_consulta_agregados(filtros, engine.dialect.name)):
+        agregados.setdefault(dimension, {})[valor] = cantidad
+    return {
+        "perfil_tea": list(agregados.get("perfil", {}).items()),
+        "qchat_histograma": _histograma_qchat(agregados.get("qchat", {})),
+        "tea_pastel": list(agregados.get("tea", {}).items()),
+        "sexo_pastel": list(agregados.get("sexo", {}).items()),
+    }
+
+
+def con_lista(datos, histograma):
+    # Lista legacy qchat_scores, reconstruida igual que en /dashboard/dashboard/datos
+    return {**datos, "qchat_scores": [p for p, n in enumerate(histograma) for _ in range(n)]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    poblar(args.filas)
+
+    loop = asyncio.new_event_loop()
+    sesion_async = AsyncSessionLocal()
+    inicio = time.perf_counter()
+    filas_resumen = loop.run_until_complete(reconstruir_resumen(sesion_async))
+    print(f"resumen diario reconstruido: {filas_resumen} filas en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    def resumen(start, end, tea):
+        return loop.run_until_complete(_agregados_resumen(sesion_async, start, end, tea))
+
+    escenarios = {
+        "sin filtros": (None, None, None),
+        "TEA=Si, 3 meses": (datetime(2025, 3, 1), datetime(2025, 5, 31), True),
+        "inicio parcial": (datetime(2025, 3, 1, 12, 30), datetime(2025, 5, 31), None),
+    }
+    with SessionLocal() as db:
+        for nombre, (start, end, tea) in escenarios.items():
+            filtros = _filtros(start, end, tea)
+            def unica_con_lista():
+                datos = consulta_unica(db, filtros)
+                return con_lista(datos, datos["qchat_histograma"])
+
+            def resumen_con_lista():
+                agregados = resumen(start, end, tea)
+                return con_lista(agregados, _histograma_qchat(agregados["qchat"]))
+
+            variantes = (
+                ("4 consultas + lista", lambda: legacy(db, filtros)),
+                ("consulta única", lambda: consulta_unica(db, filtros)),
+                ("consulta única + lista", unica_con_lista),
+                ("resumen diario", lambda: resumen(start, end, tea)),
+                ("resumen diario + lista", resumen_con_lista),
+            )
+            for etiqueta, fn in variantes:
+                # Serialización incluida: con la lista legacy es una parte importante del costo
+                stats = medir(lambda: json.dumps(fn(), default=str), repeticiones=args.repeticiones, calentamiento=1)
+                tamano = len(json.dumps(fn(), default=str))
+                print(f"{nombre:18s} {etiqueta:24s} p50 {stats['p50_ms']:9.1f} ms  respuesta {tamano / 1024:9.1f} KiB")
+
+    loop.run_until_complete(sesion_async.close())
+    loop.run_until_complete(async_engine.dispose())
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Costo de decodificar la entrada de /predict, antes y después del esquema tipado:
+
+- antes: InputArray con values: List[Union[int, float, str]] (pydantic prueba cada miembro
+  de la unión por elemento) y pd.to_datetime para Time_Start / Time_End (infiere el formato
+  en cada llamada).
+- después: EntradaPrediccion (un tipo y un rango por posición, en una pasada) con las horas
+  ya interpretadas por parsear_hora (formato fijo del frontend).
+
+    python -m benchmarks.bench_entrada
+"""
+import json
+from typing import List, Union
+
+import pandas as pd
+from pydantic import BaseModel
+
+from benchmarks.comun import medir, preparar_entorno, registro_ejemplo
+
+preparar_entorno("entrada")
+
+from app.model.campos import CAMPOS
+from app.schemas.input_data import EntradaPrediccion
+from app.utils.fechas import parsear_hora
+
+
+class InputArrayAnterior(BaseModel):
+    values: List[Union[int, float, str]]
+
+
+def _decodificar_antes(cuerpo):
+    valores = InputArrayAnterior.model_validate_json(cuerpo).values
+    return [pd.to_datetime(valores[23]).to_pydatetime(), pd.to_datetime(valores[24]).to_pydatetime()]
+
+
+def _decodificar_despues(cuerpo):
+    valores = EntradaPrediccion.model_validate_json(cuerpo).valores()
+    return [valores[23], valores[24]]
+
+
+def main():
+    registro = registro_ejemplo()
+    hora = registro[23]
+    posicional = InputArrayAnterior(values=registro).model_dump_json()
+    nombrado = json.dumps(dict(zip(CAMPOS, registro)))
+
+    casos = [
+        ("hora: pd.to_datetime", lambda: pd.to_datetime(hora).to_pydatetime()),
+        ("hora: parsear_hora", lambda: parsear_hora(hora)),
+        ("cuerpo posicional: antes", lambda: _decodificar_antes(posicional)),
+        ("cuerpo posicional: después", lambda: _decodificar_despues(posicional)),
+        ("cuerpo nombrado: después", lambda: _decodificar_despues(nombrado)),
+    ]
+    for nombre, fn in casos:
+        stats = medir(fn, repeticiones=2000, calentamiento=100)
+        print(f"{nombre:28s}: {stats['p50_ms'] * 1000:8.1f} µs (p99 {stats['p99_ms'] * 1000:.1f} µs)")
+
+
+if __name__ == "__main__":
+    main()
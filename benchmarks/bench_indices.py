@@ -0,0 +1,85 @@
+"""
+Consultas del dashboard sobre 1M de evaluaciones sin y con los índices de la
+migración 0002_indices_dashboard: plan de ejecución y tiempo de cada una.
+
+    python -m benchmarks.bench_indices [--filas 1000000] [--repeticiones 5]
+
+En SQLite muestra EXPLAIN QUERY PLAN; en PostgreSQL, EXPLAIN (ANALYZE, BUFFERS).
+"""
+import argparse
+from datetime import datetime
+
+from benchmarks.comun import medir, preparar_entorno
+
+preparar_entorno("bench_indices")
+
+from sqlalchemy import func, or_, select, text, tuple_
+
+from app.api.dashboard import ORDEN_LISTADO, _consulta_agregados, _filtros, _limite_local
+from app.db.database import Base, SessionLocal, engine
+from app.db.models import Evaluacion
+from benchmarks.bench_dashboard import poblar
+
+LIMITE = 5
+INDICES = [indice for indice in Evaluacion.__table__.indexes if indice.name.startswith("ix_evaluaciones_")]
+
+
+def consultas(dialecto: str):
+    # pylint: disable=E1102
+    rango = _filtros(datetime(2025, 3, 1), datetime(2025, 5, 31), None)
+    borde = Evaluacion.hora_inicio < _limite_local(datetime(2025, 3, 2), dialecto)
+    listado = select(Evaluacion).order_by(*ORDEN_LISTADO)
+    return {
+        "listado, página siguiente": listado.where(
+            tuple_(Evaluacion.hora_fin, Evaluacion.id) < tuple_(datetime(2025, 6, 1), 0)
+        ).limit(LIMITE + 1),
+        "listado TEA=Si": listado.where(*_filtros(None, None, True)).limit(LIMITE + 1),
+        "agregados 3 meses": _consulta_agregados(rango, dialecto),
+        "conteo de bordes": select(func.count()).select_from(Evaluacion).where(*rango, or_(borde)),
+    }
+
+
+def plan(db, sentencia, dialecto: str) -> str:
+    compilada = sentencia.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    if dialecto == "postgresql":
+        filas = db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compilada}")).scalars()
+    else:
+        filas = (fila[-1] for fila in db.execute(text(f"EXPLAIN QUERY PLAN {compilada}")))
+    return "\n".join(f"    {linea}" for linea in filas)
+
+
+def ejecutar(db, repeticiones: int, etiqueta: str):
+    dialecto = engine.dialect.name
+    print(f"== {etiqueta}")
+    for nombre, sentencia in consultas(dialecto).items():
+        stats = medir(lambda: db.execute(sentencia).all(), repeticiones=repeticiones, calentamiento=1)
+        print(f"{nombre:28s} p50 {stats['p50_ms']:9.1f} ms")
+        print(plan(db, sentencia, dialecto))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    poblar(args.filas)
+
+    with engine.begin() as conn:
+        for indice in INDICES:
+            indice.drop(conn, checkfirst=True)
+        conn.execute(text("ANALYZE"))
+    with SessionLocal() as db:
+        ejecutar(db, args.repeticiones, "sin índices")
+
+    with engine.begin() as conn:
+        for indice in INDICES:
+            indice.create(conn)
+        conn.execute(text("ANALYZE"))
+    with SessionLocal() as db:
+        ejecutar(db, args.repeticiones, "con índices")
+
+
+if __name__ == "__main__":
+    main()
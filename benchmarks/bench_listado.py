@@ -0,0 +1,63 @@
+"""
+/dashboard/evaluaciones sobre 1M de evaluaciones: página profunda con OFFSET + COUNT
+por request vs. keyset sobre (hora_fin, id) con el total cacheado.
+
+    python -m benchmarks.bench_listado [--filas 1000000] [--repeticiones 5]
+"""
+import argparse
+
+from benchmarks.comun import medir, preparar_entorno
+
+preparar_entorno("bench_listado")
+
+from sqlalchemy import func, select, tuple_
+
+from app.api.dashboard import ORDEN_LISTADO
+from app.db.database import Base, SessionLocal, engine
+from app.db.models import Evaluacion
+from benchmarks.bench_dashboard import poblar
+
+LIMITE = 5
+
+
+def offset_y_count(db, skip):
+    # pylint: disable=E1102
+    query = select(Evaluacion.id, Evaluacion.hora_fin).order_by(*ORDEN_LISTADO)
+    filas = db.execute(query.offset(skip).limit(LIMITE)).all()
+    total = db.scalar(select(func.count()).select_from(query.subquery()))
+    return filas, total
+
+
+def keyset(db, despues_de):
+    query = select(Evaluacion.id, Evaluacion.hora_fin).order_by(*ORDEN_LISTADO)
+    if despues_de is not None:
+        query = query.where(tuple_(Evaluacion.hora_fin, Evaluacion.id) < tuple_(*despues_de))
+    return db.execute(query.limit(LIMITE + 1)).all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    poblar(args.filas)
+
+    with SessionLocal() as db:
+        for skip in (0, 10_000, args.filas // 2):
+            # Posición equivalente para el keyset: la última fila de la página anterior
+            anterior = None
+            if skip:
+                fila = db.execute(
+                    select(Evaluacion.hora_fin, Evaluacion.id).order_by(*ORDEN_LISTADO).offset(skip - 1).limit(1)
+                ).one()
+                anterior = (fila.hora_fin, fila.id)
+
+            antes = medir(lambda: offset_y_count(db, skip), repeticiones=args.repeticiones, calentamiento=1)
+            despues = medir(lambda: keyset(db, anterior), repeticiones=args.repeticiones, calentamiento=1)
+            print(f"skip {skip:8d}: OFFSET+COUNT p50 {antes['p50_ms']:9.1f} ms   keyset p50 {despues['p50_ms']:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Latencia de /predict durante una ráfaga de logins (bcrypt, coste 12): sin ráfaga,
+con el login anterior (def + verify_password en el threadpool de Starlette) y con
+el login actual (pool de procesos con control de admisión).
+
+    python -m benchmarks.bench_login [--clientes-predict 20] [--clientes-login 50] [--duracion 10]
+
+Sin DATABASE_URL usa una base SQLite temporal.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from benchmarks.comun import preparar_entorno, registro_ejemplo
+
+preparar_entorno("bench_login")
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import delete
+
+from app.api import api, auth
+from app.db.database import Base, SessionLocal, async_engine, engine
+from app.db.models import Usuario
+from app.model.registry import registro
+
+USUARIO, PASSWORD = "bench", "clave-bench"
+
+
+def _login_sync():
+    """Réplica del login anterior, para comparar"""
+    router = APIRouter()
+
+    @router.post("/auth/login")
+    def login(form: OAuth2PasswordRequestForm = Depends()):
+        with SessionLocal() as db:
+            user = db.query(Usuario).filter(Usuario.username == form.username).first()
+            if not user or not user.verify_password(form.password):
+                raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    return router
+
+
+def _app(modo):
+    app = FastAPI()
+    app.include_router(api.router)
+    if modo == "login anterior":
+        app.include_router(_login_sync())
+    elif modo == "login con pool":
+        app.include_router(auth.router)
+    return app
+
+
+async def _predict(http, cuerpo, fin, latencias, errores):
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        try:
+            response = await http.post("/predict", json=cuerpo)
+            if response.status_code >= 400:
+                errores.append(response.status_code)
+        except Exception as e:
+            errores.append(type(e).__name__)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+
+async def _login(http, fin, estados):
+    # Logins válidos: la ráfaga no se corta por intentos fallidos, solo por admisión (503)
+    while time.perf_counter() < fin:
+        response = await http.post("/auth/login", data={"username": USUARIO, "password": PASSWORD})
+        estados[response.status_code] = estados.get(response.status_code, 0) + 1
+        if response.status_code == 503:
+            # Cliente que respeta Retry-After
+            await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+
+async def _escenario(modo, args):
+    cuerpo = {"values": registro_ejemplo()}
+    latencias, errores, estados = [], [], {}
+    transporte = httpx.ASGITransport(app=_app(modo))
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=120) as http:
+        fin = time.perf_counter() + args.duracion
+        tareas = [_predict(http, cuerpo, fin, latencias, errores) for _ in range(args.clientes_predict)]
+        if modo != "sin ráfaga":
+            tareas += [_login(http, fin, estados) for _ in range(args.clientes_login)]
+        await asyncio.gather(*tareas)
+
+    latencias.sort()
+    return {
+        "p50_ms": latencias[len(latencias) // 2],
+        "p99_ms": latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))],
+        "predicts": len(latencias),
+        "errores": len(errores),
+        "logins": estados,
+    }
+
+
+async def _ejecutar(args):
+    await auth.pool_contrasenas.iniciar()
+    print(f"{'escenario':16s} {'p50 ms':>9s} {'p99 ms':>9s} {'predicts':>9s} {'errores':>8s}  logins por estado")
+    for modo in ("sin ráfaga", "login anterior", "login con pool"):
+        r = await _escenario(modo, args)
+        print(f"{modo:16s} {r['p50_ms']:9.1f} {r['p99_ms']:9.1f} {r['predicts']:9d} {r['errores']:8d}  {r['logins']}")
+    auth.pool_contrasenas.detener()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clientes-predict", type=int, default=10)
+    parser.add_argument("--clientes-login", type=int, default=50)
+    parser.add_argument("--duracion", type=float, default=10)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    ahora = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.execute(delete(Usuario).where(Usuario.username == USUARIO))
+        usuario = Usuario(username=USUARIO, is_active=True, created_at=ahora, updated_at=ahora)
+        usuario.set_password(PASSWORD)
+        db.add(usuario)
+        db.commit()
+    registro.cargar()
+    asyncio.run(_ejecutar(args))
+
+
+if __name__ == "__main__":
+    main()
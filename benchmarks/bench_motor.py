@@ -0,0 +1,26 @@
+"""
+predict_proba de sklearn vs. motor NumPy (KernelSVM) para un registro y por lotes.
+
+    python -m benchmarks.bench_motor
+"""
+import numpy as np
+
+from app.core.model_settings import MODEL_PATH, PCA_MODEL_PATH
+from app.model.data_preprocessor import DataPreprocessor
+from app.model.predictor import predecir_lote
+from app.model.registry import RegistroModelos
+from benchmarks.comun import medir, registro_ejemplo
+
+
+def main():
+    registro = registro_ejemplo()
+    for motor in ("sklearn", "kernel"):
+        modelos = RegistroModelos(MODEL_PATH, PCA_MODEL_PATH, motor=motor).actual()
+        for n in (1, 100, 1000):
+            X = DataPreprocessor(np.array([registro] * n, dtype=object), modelos=modelos).get_feature_matrix()
+            stats = medir(lambda: predecir_lote(X, modelos=modelos), repeticiones=100 if n > 1 else 500)
+            print(f"{motor:8s} lote {n:5d}: {stats['media_ms'] * 1000 / n:9.1f} µs/registro (p99 lote {stats['p99_ms']:.3f} ms)")
+
+
+if __name__ == "__main__":
+    main()
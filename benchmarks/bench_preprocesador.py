@@ -0,0 +1,27 @@
+"""
+Costo por registro del preprocesamiento (escalado + variables derivadas + PCA_1).
+
+    python -m benchmarks.bench_preprocesador
+"""
+import numpy as np
+
+from app.model.data_preprocessor import DataPreprocessor
+from app.model.registry import obtener_modelos
+from benchmarks.comun import medir, registro_ejemplo
+
+
+def main():
+    modelos = obtener_modelos()
+    registro = registro_ejemplo()
+
+    stats = medir(lambda: DataPreprocessor(registro, modelos=modelos).get_feature_vector())
+    print(f"registro individual      : {stats['media_ms'] * 1000:9.1f} µs/registro (p99 {stats['p99_ms'] * 1000:.1f} µs)")
+
+    for n in (10, 100, 1000):
+        lote = np.array([registro] * n, dtype=object)
+        stats = medir(lambda: DataPreprocessor(lote, modelos=modelos).get_feature_matrix(), repeticiones=50)
+        print(f"lote de {n:5d} registros  : {stats['media_ms'] * 1000 / n:9.1f} µs/registro")
+
+
+if __name__ == "__main__":
+    main()
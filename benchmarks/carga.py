@@ -0,0 +1,439 @@
+"""
+Generador de carga: reproduce un corpus JSONL de requests (/predict, /auth/login y el
+dashboard) y reporta throughput, p50/p95/p99/máx y tasa de errores por endpoint.
+
+    python -m benchmarks.carga sintetizar --requests 2000 --mezcla predict=70,login=5,datos=15,evaluaciones=10
+    python -m benchmarks.carga reproducir --modo cerrado --concurrencia 20
+    python -m benchmarks.carga reproducir --modo abierto --tasa 50 --destino uvicorn --duracion 60
+    python -m benchmarks.carga reproducir --url https://staging.example.com --usuario ... --password ...
+
+Cada línea del corpus es un request:
+
+    {"endpoint": "predict", "metodo": "POST", "ruta": "/predict", "json": {...}, "t": 0.84, "duracion_s": 312}
+    {"endpoint": "login", "metodo": "POST", "ruta": "/auth/login", "form": {"username": "$USUARIO", "password": "$PASSWORD"}}
+    {"endpoint": "datos", "metodo": "GET", "ruta": "/dashboard/dashboard/datos", "params": {...}, "auth": true}
+
+- "t" (opcional): segundos desde el inicio de la grabación; el modo abierto sin --tasa los respeta.
+- "auth": se envía con el token obtenido al arrancar (login con --usuario/--password).
+- "$USUARIO" / "$PASSWORD" se reemplazan por las credenciales de la corrida.
+- "duracion_s": las horas de inicio y fin del registro se recalculan al enviar (fin = ahora),
+  para que duracion_minutos sea realista sin importar cuándo se grabó el corpus.
+
+Destinos: "proceso" (la app en este proceso con httpx.ASGITransport), "uvicorn" (un uvicorn local
+lanzado por la herramienta) o --url (un servidor ya corriendo). Los dos primeros usan SQLite
+(sin DATABASE_URL, una base temporal) con el usuario de carga ya creado.
+
+Modo cerrado: --concurrencia clientes, cada uno envía el siguiente request al recibir la respuesta.
+Modo abierto: los requests salen a su hora (Poisson a --tasa req/s, o los "t" del corpus) aunque
+el servidor se atrase; la latencia se mide desde la hora programada, así la espera del cliente
+también cuenta (sin omisión coordinada).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import cycle
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from benchmarks.comun import preparar_entorno
+
+preparar_entorno("carga")
+
+import httpx
+
+CORPUS = Path(__file__).resolve().parent / "corpus.jsonl"
+USUARIO, PASSWORD = "carga", "clave-carga"
+LIMA = ZoneInfo("America/Lima")
+
+ENDPOINTS = {
+    "predict": ("POST", "/predict"),
+    "login": ("POST", "/auth/login"),
+    "datos": ("GET", "/dashboard/dashboard/datos"),
+    "evaluaciones": ("GET", "/dashboard/evaluaciones"),
+    "tendencia": ("GET", "/dashboard/tendencia"),
+}
+MEZCLA = "predict=70,login=5,datos=15,evaluaciones=7,tendencia=3"
+PERCENTILES = (50, 95, 99)
+
+
+# ---- Corpus sintético
+
+def _hora_frontend(valor: datetime) -> str:
+    # Formato del frontend: "11/5/2025, 3:08:53 p. m." (mes/día/año, 12 horas)
+    hora = valor.hour % 12 or 12
+    sufijo = "a. m." if valor.hour < 12 else "p. m."
+    return f"{valor.month}/{valor.day}/{valor.year}, {hora}:{valor.minute:02d}:{valor.second:02d} {sufijo}"
+
+
+def _registro(rnd: random.Random, fin: datetime, duracion_s: int):
+    respuestas = [rnd.randint(0, 1) for _ in range(10)]
+    comorbilidades = [int(rnd.random() < 0.15) for _ in range(7)]
+    inicio = fin - timedelta(seconds=duracion_s)
+    return (
+        [rnd.randint(1, 18), rnd.randint(0, 1), *respuestas, rnd.randint(0, 10), *comorbilidades,
+         int(rnd.random() < 0.2), rnd.randint(0, 100), rnd.randint(0, 100)]
+        + [_hora_frontend(inicio), _hora_frontend(fin)]
+    )
+
+
+def _rango_fechas(rnd: random.Random):
+    inicio = datetime(2025, 1, 1) + timedelta(days=rnd.randrange(300))
+    return inicio, inicio + timedelta(days=rnd.choice((7, 30, 90)))
+
+
+def _entrada(endpoint: str, rnd: random.Random, ahora: datetime) -> dict:
+    metodo, ruta = ENDPOINTS[endpoint]
+    entrada = {"endpoint": endpoint, "metodo": metodo, "ruta": ruta}
+    if endpoint == "predict":
+        duracion = rnd.randint(120, 1200)
+        entrada["json"] = {"values": _registro(rnd, ahora, duracion)}
+        entrada["duracion_s"] = duracion
+    elif endpoint == "login":
+        entrada["form"] = {"username": "$USUARIO", "password": "$PASSWORD"}
+    else:
+        params = {}
+        if rnd.random() < 0.5:
+            inicio, fin = _rango_fechas(rnd)
+            params.update(start_date=inicio.isoformat(), end_date=fin.isoformat())
+        if rnd.random() < 0.3:
+            params["tiene_tea"] = rnd.choice(("true", "false"))
+        if endpoint == "evaluaciones":
+            params.update(skip=rnd.choice((0, 0, 0, 5, 10, 50)), limit=5)
+        elif endpoint == "tendencia":
+            params["granularidad"] = rnd.choice(("dia", "semana", "mes"))
+        entrada["params"] = params
+        entrada["auth"] = True
+    return entrada
+
+
+def _mezcla(texto: str) -> dict:
+    pesos = {}
+    for parte in texto.split(","):
+        nombre, _, peso = parte.partition("=")
+        nombre = nombre.strip()
+        if nombre not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"endpoint desconocido: {nombre} (usar {', '.join(ENDPOINTS)})")
+        pesos[nombre] = float(peso)
+    if not pesos or sum(pesos.values()) <= 0:
+        raise argparse.ArgumentTypeError("la mezcla necesita al menos un peso positivo")
+    return pesos
+
+
+def sintetizar(requests: int, mezcla: dict, tasa: float, semilla: int):
+    """Genera `requests` entradas con la mezcla de endpoints; "t" sigue llegadas Poisson a `tasa` req/s."""
+    rnd = random.Random(semilla)
+    nombres, pesos = list(mezcla), list(mezcla.values())
+    ahora = datetime.now(LIMA).replace(microsecond=0, tzinfo=None)
+    t = 0.0
+    for _ in range(requests):
+        entrada = _entrada(rnd.choices(nombres, pesos)[0], rnd, ahora)
+        entrada["t"] = round(t, 4)
+        t += rnd.expovariate(tasa)
+        yield entrada
+
+
+def leer_corpus(ruta: Path):
+    with open(ruta, encoding="utf-8") as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+# ---- Reproducción
+
+class Estadisticas:
+    """Latencias y estados por endpoint."""
+
+    def __init__(self):
+        self.latencias = {}
+        self.errores = {}
+
+    def registrar(self, endpoint: str, latencia_ms: float, estado):
+        self.latencias.setdefault(endpoint, []).append(latencia_ms)
+        if not isinstance(estado, int) or estado >= 400:
+            por_estado = self.errores.setdefault(endpoint, {})
+            por_estado[str(estado)] = por_estado.get(str(estado), 0) + 1
+
+    def reporte(self, segundos: float) -> dict:
+        def resumen(latencias, errores):
+            ordenadas = sorted(latencias)
+            total_errores = sum(errores.values())
+            fila = {
+                "requests": len(ordenadas),
+                "req_por_s": round(len(ordenadas) / segundos, 2) if segundos else 0.0,
+                "errores": total_errores,
+                "tasa_errores": round(total_errores / len(ordenadas), 4) if ordenadas else 0.0,
+                "errores_por_estado": errores,
+            }
+            for p in PERCENTILES:
+                fila[f"p{p}_ms"] = round(ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))], 2)
+            fila["max_ms"] = round(ordenadas[-1], 2)
+            return fila
+
+        endpoints = {
+            endpoint: resumen(latencias, self.errores.get(endpoint, {}))
+            for endpoint, latencias in sorted(self.latencias.items())
+        }
+        todas = [l for latencias in self.latencias.values() for l in latencias]
+        errores = {}
+        for por_estado in self.errores.values():
+            for estado, cantidad in por_estado.items():
+                errores[estado] = errores.get(estado, 0) + cantidad
+        return {"segundos": round(segundos, 3), "endpoints": endpoints, "total": resumen(todas, errores) if todas else None}
+
+
+def _preparar_request(entrada: dict, token: str, usuario: str, password: str) -> dict:
+    kwargs = {}
+    if "json" in entrada:
+        cuerpo = entrada["json"]
+        if "duracion_s" in entrada and len(cuerpo.get("values", [])) == 25:
+            # Horas recalculadas al enviar: fin = ahora (hora de Lima, como el frontend)
+            fin = datetime.now(LIMA).replace(microsecond=0, tzinfo=None)
+            inicio = fin - timedelta(seconds=entrada["duracion_s"])
+            cuerpo = {**cuerpo, "values": [*cuerpo["values"][:23], _hora_frontend(inicio), _hora_frontend(fin)]}
+        kwargs["json"] = cuerpo
+    if "form" in entrada:
+        reemplazos = {"$USUARIO": usuario, "$PASSWORD": password}
+        kwargs["data"] = {k: reemplazos.get(v, v) for k, v in entrada["form"].items()}
+    if entrada.get("params"):
+        kwargs["params"] = entrada["params"]
+    if entrada.get("auth") and token:
+        kwargs["headers"] = {"Authorization": f"Bearer {token}"}
+    return kwargs
+
+
+async def _enviar(http, entrada, kwargs, desde: float, stats: Estadisticas):
+    try:
+        respuesta = await http.request(entrada["metodo"], entrada["ruta"], **kwargs)
+        estado = respuesta.status_code
+    except httpx.HTTPError as e:
+        estado = type(e).__name__
+    stats.registrar(entrada.get("endpoint", entrada["ruta"]), (time.perf_counter() - desde) * 1000, estado)
+
+
+async def _login(http, usuario: str, password: str) -> str:
+    respuesta = await http.post("/auth/login", data={"username": usuario, "password": password})
+    if respuesta.status_code != 200:
+        print(f"Login inicial falló ({respuesta.status_code}); los requests con auth fallarán", file=sys.stderr)
+        return None
+    return respuesta.json()["access_token"]
+
+
+async def modo_cerrado(http, corpus, concurrencia: int, duracion: float, preparar, stats: Estadisticas):
+    """`concurrencia` clientes; cada uno envía el siguiente request apenas recibe la respuesta."""
+    entradas = cycle(corpus) if duracion else iter(corpus)
+    fin = time.perf_counter() + duracion if duracion else None
+
+    async def cliente():
+        for entrada in entradas:  # el iterador es compartido: cada entrada la envía un solo cliente
+            if fin is not None and time.perf_counter() >= fin:
+                return
+            await _enviar(http, entrada, preparar(entrada), time.perf_counter(), stats)
+
+    await asyncio.gather(*[cliente() for _ in range(concurrencia)])
+
+
+async def modo_abierto(http, corpus, tasa: float, duracion: float, semilla: int, preparar, stats: Estadisticas):
+    """Cada request sale a su hora programada, sin esperar a los anteriores."""
+    rnd = random.Random(semilla)
+    if tasa:
+        horas, t = [], 0.0
+        entradas = cycle(corpus) if duracion else iter(corpus)
+        for entrada in entradas:
+            if duracion and t >= duracion:
+                break
+            horas.append((t, entrada))
+            t += rnd.expovariate(tasa)
+    else:
+        if any("t" not in entrada for entrada in corpus):
+            raise ValueError("el modo abierto sin --tasa necesita el campo \"t\" en todas las entradas del corpus")
+        horas = [(entrada["t"], entrada) for entrada in corpus if not duracion or entrada["t"] < duracion]
+
+    inicio = time.perf_counter()
+    tareas = []
+    for t, entrada in horas:
+        programada = inicio + t
+        espera = programada - time.perf_counter()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        tareas.append(asyncio.create_task(_enviar(http, entrada, preparar(entrada), programada, stats)))
+    await asyncio.gather(*tareas)
+
+
+# ---- Destinos
+
+def crear_app():
+    """App de carga: los mismos routers que app.main con sus pools, sobre la base de DATABASE_URL."""
+    from fastapi import FastAPI
+
+    from app.api import api, auth, dashboard
+    from app.db.database import async_engine
+    from app.model.registry import registro
+
+    app = FastAPI()
+    app.include_router(api.router)
+    app.include_router(auth.router)
+    app.include_router(dashboard.router)
+
+    @app.on_event("startup")
+    async def iniciar():
+        registro.cargar()
+        await auth.pool_contrasenas.iniciar()
+
+    @app.on_event("shutdown")
+    async def detener():
+        auth.pool_contrasenas.detener()
+        await async_engine.dispose()
+
+    return app
+
+
+def preparar_base(usuario: str, password: str):
+    """Tablas y usuario de carga en la base local (SQLite)."""
+    from sqlalchemy import delete
+
+    from app.db.database import Base, SessionLocal, engine
+    from app.db.models import Usuario
+
+    Base.metadata.create_all(bind=engine)
+    ahora = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.execute(delete(Usuario).where(Usuario.username == usuario))
+        nuevo = Usuario(username=usuario, is_active=True, created_at=ahora, updated_at=ahora)
+        nuevo.set_password(password)
+        db.add(nuevo)
+        db.commit()
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _lanzar_uvicorn():
+    puerto = _puerto_libre()
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "benchmarks.carga:crear_app",
+         "--host", "127.0.0.1", "--port", str(puerto), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    url = f"http://127.0.0.1:{puerto}"
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"uvicorn terminó al arrancar (código {proceso.returncode})")
+        try:
+            httpx.get(f"{url}/docs", timeout=1)
+            return proceso, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError("uvicorn no respondió en 60 s")
+
+
+async def reproducir(args, corpus) -> dict:
+    stats = Estadisticas()
+    proceso = None
+    if args.url:
+        cliente = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    elif args.destino == "uvicorn":
+        proceso, url = await asyncio.to_thread(_lanzar_uvicorn)
+        cliente = httpx.AsyncClient(base_url=url, timeout=args.timeout,
+                                    limits=httpx.Limits(max_connections=args.max_conexiones))
+    else:
+        app = crear_app()
+        await app.router.startup()
+        cliente = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://carga", timeout=args.timeout)
+
+    try:
+        async with cliente as http:
+            token = await _login(http, args.usuario, args.password) if any(e.get("auth") for e in corpus) else None
+            http.cookies.clear()  # solo el token explícito: los requests sin "auth" van sin sesión
+
+            def preparar(entrada):
+                return _preparar_request(entrada, token, args.usuario, args.password)
+
+            inicio = time.perf_counter()
+            if args.modo == "cerrado":
+                await modo_cerrado(http, corpus, args.concurrencia, args.duracion, preparar, stats)
+            else:
+                await modo_abierto(http, corpus, args.tasa, args.duracion, args.semilla, preparar, stats)
+            segundos = time.perf_counter() - inicio
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait(timeout=30)
+        elif not args.url:
+            await app.router.shutdown()
+
+    reporte = stats.reporte(segundos)
+    reporte["configuracion"] = {
+        "modo": args.modo, "destino": args.url or args.destino, "concurrencia": args.concurrencia,
+        "tasa": args.tasa, "duracion": args.duracion, "corpus": str(args.corpus), "entradas": len(corpus),
+    }
+    return reporte
+
+
+def imprimir(reporte: dict):
+    print(f"{'endpoint':14s} {'requests':>8s} {'req/s':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} "
+          f"{'máx ms':>9s} {'errores':>8s}")
+    filas = list(reporte["endpoints"].items())
+    if reporte["total"]:
+        filas.append(("TOTAL", reporte["total"]))
+    for nombre, r in filas:
+        errores = f"{r['tasa_errores']:.1%}"
+        print(f"{nombre:14s} {r['requests']:8d} {r['req_por_s']:8.1f} {r['p50_ms']:9.1f} {r['p95_ms']:9.1f} "
+              f"{r['p99_ms']:9.1f} {r['max_ms']:9.1f} {errores:>8s}  {r['errores_por_estado'] or ''}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generador de carga sobre un corpus JSONL de requests")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    sint = sub.add_parser("sintetizar", help="genera un corpus con una mezcla de endpoints")
+    sint.add_argument("--requests", type=int, default=1000)
+    sint.add_argument("--mezcla", type=_mezcla, default=_mezcla(MEZCLA), help=f"pesos por endpoint ({MEZCLA})")
+    sint.add_argument("--tasa", type=float, default=20, help="req/s de la grabación sintética (campo \"t\")")
+    sint.add_argument("--semilla", type=int, default=42)
+    sint.add_argument("--salida", type=Path, default=CORPUS)
+
+    rep = sub.add_parser("reproducir", help="reproduce un corpus y reporta latencias por endpoint")
+    rep.add_argument("--corpus", type=Path, default=CORPUS)
+    rep.add_argument("--modo", choices=("cerrado", "abierto"), default="cerrado")
+    rep.add_argument("--concurrencia", type=int, default=10, help="clientes del modo cerrado")
+    rep.add_argument("--tasa", type=float, default=None, help="req/s del modo abierto (sin ella, los \"t\" del corpus)")
+    rep.add_argument("--duracion", type=float, default=None, help="segundos; el corpus se repite hasta cumplirlos")
+    rep.add_argument("--destino", choices=("proceso", "uvicorn"), default="proceso")
+    rep.add_argument("--url", default=None, help="servidor ya corriendo (ignora --destino)")
+    rep.add_argument("--usuario", default=USUARIO)
+    rep.add_argument("--password", default=PASSWORD)
+    rep.add_argument("--timeout", type=float, default=60)
+    rep.add_argument("--max-conexiones", type=int, default=100)
+    rep.add_argument("--semilla", type=int, default=42)
+    rep.add_argument("--json", type=Path, default=None, help="escribe el reporte en este archivo")
+    args = parser.parse_args(argv)
+
+    if args.comando == "sintetizar":
+        with open(args.salida, "w", encoding="utf-8") as f:
+            for entrada in sintetizar(args.requests, args.mezcla, args.tasa, args.semilla):
+                f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+        print(f"Corpus de {args.requests} requests en {args.salida}", file=sys.stderr)
+        return
+
+    corpus = leer_corpus(args.corpus)
+    if not args.url:
+        preparar_base(args.usuario, args.password)
+    reporte = asyncio.run(reproducir(args, corpus))
+    imprimir(reporte)
+    if args.json:
+        args.json.write_text(json.dumps(reporte, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
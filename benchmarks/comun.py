@@ -0,0 +1,59 @@
+# benchmarks/comun.py
+import os
+import statistics
+import tempfile
+import time
+
+
+def preparar_entorno(nombre: str):
+    """
+    Variables mínimas para importar la app fuera de producción. Se llama antes de
+    importar app.*: sin DATABASE_URL se usa una base SQLite temporal.
+    """
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/{nombre}.db"
+    os.environ.setdefault("SECRET_KEY", "clave-de-benchmark")
+    os.environ.setdefault("MAIL_USERNAME", "bench@example.com")
+    os.environ.setdefault("MAIL_PASSWORD", "bench")
+    # Las bases de benchmark se crean con create_all, sin alembic_version
+    os.environ.setdefault("AUTO_CREATE_TABLES", "true")
+
+
+def medir(fn, repeticiones=200, calentamiento=10):
+    """Ejecuta fn varias veces y devuelve estadísticas en milisegundos."""
+    for _ in range(calentamiento):
+        fn()
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    tiempos.sort()
+    return {
+        "repeticiones": repeticiones,
+        "media_ms": statistics.fmean(tiempos),
+        "p50_ms": tiempos[len(tiempos) // 2],
+        "p99_ms": tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))],
+    }
+
+
+def registro_ejemplo():
+    return [14,0,0,0,1,1,1,1,1,1,1,1,8,0,0,0,0,0,0,0,0,55,60,"11/5/2025, 3:08:53 p. m.","11/5/2025, 3:09:44 p. m."]
+
+
+def comparar(base: dict, actual: dict, umbral: float, minimo_ms: float = 0.0, metrica: str = "p50_ms"):
+    """
+    Compara dos resultados de la suite ({caso: estadísticas}) por `metrica`.
+    Un caso es regresión si empeora más que `umbral` (0.2 = 20 %) y además en más de
+    `minimo_ms` absolutos. Devuelve [(caso, base_ms, actual_ms, cambio, es_regresion)]
+    de los casos presentes en ambos.
+    """
+    filas = []
+    for caso in sorted(base.keys() & actual.keys()):
+        antes, despues = base[caso][metrica], actual[caso][metrica]
+        cambio = (despues - antes) / antes if antes > 0 else 0.0
+        regresion = cambio > umbral and despues - antes > minimo_ms
+        filas.append((caso, antes, despues, cambio, regresion))
+    return filas
@@ -0,0 +1,219 @@
+"""
+Suite de benchmarks de los caminos calientes, con resultados en JSON comparables entre commits:
+
+- modelo: decodificación del cuerpo de /predict, DataPreprocessor.get_feature_vector,
+  get_pca_component_1 y predecir (sin y con cache).
+- predict: POST /predict de punta a punta con TestClient contra SQLite.
+- dashboard: /dashboard/dashboard/datos (sin y con filtros), /dashboard/evaluaciones y
+  /dashboard/tendencia sobre tablas de 10k, 1M y 10M evaluaciones (cache de respuestas vaciado
+  antes de cada request: se mide el cálculo, no el acierto).
+
+    python -m benchmarks.suite                                  # todo; escribe benchmarks/resultados/<commit>.json
+    python -m benchmarks.suite --tamanos 10000 --salida actual.json
+    python -m benchmarks.suite --tamanos 10000 --comparar benchmarks/resultados/abc1234.json --umbral 0.25
+
+Con --comparar, termina con código 1 si algún caso empeora (p50) más que --umbral
+(BENCH_UMBRAL, por defecto 0.2 = 20 %) y más que --minimo-ms absolutos.
+Sin DATABASE_URL usa una base SQLite temporal; las tablas se llenan de forma incremental
+(10k → 1M → 10M), así que los tamaños se recorren de menor a mayor.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.comun import comparar, medir, preparar_entorno, registro_ejemplo
+
+preparar_entorno("suite")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import api, dashboard
+from app.api.deps_auth import get_current_user
+from app.db.database import AsyncSessionLocal, Base, async_engine, engine
+from app.db.resumen_diario import reconstruir_resumen
+from app.model.data_preprocessor import DataPreprocessor
+from app.model.predictor import cache_predicciones, predecir
+from app.model.registry import obtener_modelos
+from app.schemas.input_data import EntradaPrediccion
+from benchmarks.bench_dashboard import poblar
+
+GRUPOS = ("modelo", "predict", "dashboard")
+TAMANOS = (10_000, 1_000_000, 10_000_000)
+RESULTADOS = Path(__file__).resolve().parent / "resultados"
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+class _SinCachePredicciones:
+    """Desactiva cache_predicciones mientras dura el bloque (se mide el modelo, no el acierto)."""
+
+    def __enter__(self):
+        self.max_items = cache_predicciones.max_items
+        cache_predicciones.max_items = 0
+
+    def __exit__(self, *exc):
+        cache_predicciones.max_items = self.max_items
+
+
+def casos_modelo(repeticiones: int):
+    modelos = obtener_modelos()
+    registro = registro_ejemplo()
+    procesado = DataPreprocessor(registro, modelos=modelos)
+    X = procesado.get_feature_matrix()
+    cuerpo = json.dumps({"values": registro})
+
+    yield "modelo.decodificar_entrada", lambda: EntradaPrediccion.model_validate_json(cuerpo).valores(), repeticiones
+    yield "modelo.get_feature_vector", lambda: DataPreprocessor(registro, modelos=modelos).get_feature_vector(), repeticiones
+    yield "modelo.get_pca_component_1", procesado.get_pca_component_1, repeticiones
+    with _SinCachePredicciones():
+        yield "modelo.predecir", lambda: predecir(X, modelos=modelos), repeticiones
+    yield "modelo.predecir_cache", lambda: predecir(X, modelos=modelos), repeticiones
+
+
+def _app():
+    app = FastAPI()
+    app.include_router(api.router)
+    app.include_router(dashboard.router)
+    app.dependency_overrides[get_current_user] = lambda: None
+    return app
+
+
+def _pedir(cliente, metodo, url, **kwargs):
+    respuesta = cliente.request(metodo, url, **kwargs)
+    if respuesta.status_code != 200:
+        raise RuntimeError(f"{metodo} {url}: {respuesta.status_code} {respuesta.text[:200]}")
+    return respuesta
+
+
+def casos_predict(repeticiones: int):
+    cuerpo = {"values": registro_ejemplo()}
+    with TestClient(_app()) as cliente, _SinCachePredicciones():
+        yield "predict.post", lambda: _pedir(cliente, "POST", "/predict", json=cuerpo), repeticiones
+        cliente.portal.call(async_engine.dispose)
+
+
+def _reconstruir_resumen():
+    async def ejecutar():
+        try:
+            async with AsyncSessionLocal() as db:
+                await reconstruir_resumen(db)
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(ejecutar())
+
+
+def casos_dashboard(tamanos, repeticiones: int):
+    consultas = {
+        "datos": "/dashboard/dashboard/datos",
+        "datos_filtrado": "/dashboard/dashboard/datos?start_date=2025-03-01T00:00:00&end_date=2025-05-31T00:00:00&tiene_tea=true",
+        "evaluaciones": "/dashboard/evaluaciones?limit=5",
+        "tendencia": "/dashboard/tendencia?granularidad=semana",
+    }
+
+    def pedir_sin_cache(cliente, url):
+        dashboard.cache_respuestas.clear()
+        return _pedir(cliente, "GET", url)
+
+    for tamano in sorted(tamanos):
+        print(f"... poblando evaluaciones hasta {tamano} filas", file=sys.stderr)
+        poblar(tamano)
+        _reconstruir_resumen()
+        with TestClient(_app()) as cliente:
+            for nombre, url in consultas.items():
+                yield f"dashboard.{nombre}[{tamano}]", lambda url=url: pedir_sin_cache(cliente, url), repeticiones
+            cliente.portal.call(async_engine.dispose)
+
+
+def ejecutar(grupos, tamanos, repeticiones: int, repeticiones_dashboard: int, rondas: int = 3) -> dict:
+    """
+    Corre los casos de cada grupo. Cada caso se mide en `rondas` rondas y se guarda la de
+    menor p50: una ronda con ruido de otros procesos no se confunde con una regresión.
+    """
+    Base.metadata.create_all(bind=engine)
+    generadores = {
+        "modelo": lambda: casos_modelo(repeticiones),
+        "predict": lambda: casos_predict(max(1, repeticiones // 4)),
+        "dashboard": lambda: casos_dashboard(tamanos, repeticiones_dashboard),
+    }
+    resultados = {}
+    for grupo in grupos:
+        for caso, fn, repeticiones_caso in generadores[grupo]():
+            calentamiento = min(10, max(1, repeticiones_caso // 10))
+            stats = min(
+                (medir(fn, repeticiones_caso, calentamiento) for _ in range(rondas)),
+                key=lambda s: s["p50_ms"],
+            )
+            resultados[caso] = {k: round(v, 6) if isinstance(v, float) else v for k, v in stats.items()}
+            print(f"{caso:42s} p50 {stats['p50_ms']:10.3f} ms   p99 {stats['p99_ms']:10.3f} ms", file=sys.stderr)
+    return {
+        "commit": _commit(),
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "base_datos": engine.dialect.name,
+        "resultados": resultados,
+    }
+
+
+def _lista(tipo):
+    def convertir(texto):
+        return [tipo(v) for v in texto.split(",") if v]
+    return convertir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks de /predict y el dashboard")
+    parser.add_argument("--grupos", type=_lista(str), default=list(GRUPOS), help="modelo,predict,dashboard")
+    parser.add_argument("--tamanos", type=_lista(int), default=list(TAMANOS), help="filas de evaluaciones para el dashboard")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--repeticiones-dashboard", type=int, default=10)
+    parser.add_argument("--rondas", type=int, default=3, help="rondas por caso; se guarda la de menor p50")
+    parser.add_argument("--salida", type=Path, default=None, help="JSON de resultados (por defecto benchmarks/resultados/<commit>.json)")
+    parser.add_argument("--comparar", type=Path, default=None, help="JSON de una corrida anterior")
+    parser.add_argument("--umbral", type=float, default=float(os.getenv("BENCH_UMBRAL", "0.2")))
+    parser.add_argument("--minimo-ms", type=float, default=float(os.getenv("BENCH_MINIMO_MS", "0")))
+    args = parser.parse_args()
+
+    desconocidos = set(args.grupos) - set(GRUPOS)
+    if desconocidos:
+        parser.error(f"grupos desconocidos: {', '.join(sorted(desconocidos))}")
+
+    corrida = ejecutar(args.grupos, args.tamanos, args.repeticiones, args.repeticiones_dashboard, args.rondas)
+    salida = args.salida or RESULTADOS / f"{corrida['commit']}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(corrida, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"Resultados en {salida}", file=sys.stderr)
+
+    if args.comparar is None:
+        return
+    base = json.loads(args.comparar.read_text(encoding="utf-8"))
+    filas = comparar(base["resultados"], corrida["resultados"], args.umbral, args.minimo_ms)
+    print(f"\nComparación con {base.get('commit')} (umbral {args.umbral:.0%}):")
+    for caso, antes, despues, cambio, regresion in filas:
+        marca = "  REGRESIÓN" if regresion else ""
+        print(f"{caso:42s} {antes:10.3f} → {despues:10.3f} ms  {cambio:+7.1%}{marca}")
+    regresiones = [fila for fila in filas if fila[4]]
+    if regresiones:
+        print(f"{len(regresiones)} caso(s) superan el umbral", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
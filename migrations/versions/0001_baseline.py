@@ -0,0 +1,72 @@
+"""Esquema base: evaluaciones y usuario
+
+Reproduce lo que creaba Base.metadata.create_all. En una base que ya tiene
+estas tablas, marcarla sin ejecutar nada:
+
+    alembic stamp 0001_baseline
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "evaluaciones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("edad", sa.SmallInteger()),
+        sa.Column("sexo", sa.CHAR(1)),
+        *[sa.Column(f"a{i}", sa.SmallInteger()) for i in range(1, 11)],
+        sa.Column("qchat_resultado", sa.SmallInteger()),
+        sa.Column("trastorno_habla", sa.String(2)),
+        sa.Column("trastorno_aprendizaje", sa.String(2)),
+        sa.Column("trastorno_genetico", sa.String(2)),
+        sa.Column("trastorno_depresion", sa.String(2)),
+        sa.Column("retraso_global_intelectual", sa.String(2)),
+        sa.Column("problemas_comportamiento", sa.String(2)),
+        sa.Column("trastorno_ansiedad", sa.String(2)),
+        sa.Column("familiar_autista", sa.String(2)),
+        sa.Column("porc_comorbilidad", sa.Numeric(3, 2)),
+        sa.Column("porc_deficiencia_social_interactiva", sa.Numeric(3, 2)),
+        sa.Column("porc_deficiencia_comunicativa", sa.Numeric(3, 2)),
+        sa.Column("perfil_clinico", sa.String(30)),
+        sa.Column("rasgos_tea", sa.String(2)),
+        sa.Column("nivel_confianza", sa.Numeric(3, 2)),
+        sa.Column("hora_inicio", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("hora_fin", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("duracion_minutos", sa.SmallInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_evaluaciones_id", "evaluaciones", ["id"])
+
+    op.create_table(
+        "usuario",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.Text(), nullable=False),
+        sa.Column("password_hash", sa.Text(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), server_default=sa.text("true"), nullable=False),
+        sa.Column("last_login", sa.DateTime(timezone=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("date_trunc('second', now())"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("date_trunc('second', now())"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("username"),
+        sa.UniqueConstraint("username", name="uq_usuario_username"),
+    )
+    op.create_index("ix_usuario_id", "usuario", ["id"])
+    op.create_index("ix_usuario_is_active", "usuario", ["is_active"])
+
+
+def downgrade():
+    op.drop_index("ix_usuario_is_active", table_name="usuario")
+    op.drop_index("ix_usuario_id", table_name="usuario")
+    op.drop_table("usuario")
+    op.drop_index("ix_evaluaciones_id", table_name="evaluaciones")
+    op.drop_table("evaluaciones")
@@ -0,0 +1,52 @@
+"""Índices de evaluaciones para las consultas del dashboard
+
+- (hora_fin, id): listado ordenado y paginación por cursor.
+- hora_inicio: agregados por rango, bordes del resumen diario y su reconstrucción.
+- (rasgos_tea, hora_inicio): agregados con filtro tiene_tea.
+En PostgreSQL llevan INCLUDE con las columnas que se leen (index-only scan) y se
+crean con CONCURRENTLY para no bloquear los INSERT de /predict.
+Se elimina ix_evaluaciones_id: duplicaba el índice de la clave primaria.
+
+Revision ID: 0002_indices_dashboard
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002_indices_dashboard"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+COLUMNAS_LISTADO = [
+    "edad", "sexo", "qchat_resultado", "porc_deficiencia_social_interactiva",
+    "porc_deficiencia_comunicativa", "perfil_clinico", "rasgos_tea", "nivel_confianza",
+]
+COLUMNAS_AGREGADOS = [
+    "hora_fin", "rasgos_tea", "perfil_clinico", "sexo", "qchat_resultado", "nivel_confianza", "duracion_minutos",
+]
+
+INDICES = [
+    ("ix_evaluaciones_hora_fin_id", ["hora_fin", "id"], COLUMNAS_LISTADO),
+    ("ix_evaluaciones_hora_inicio", ["hora_inicio"], COLUMNAS_AGREGADOS),
+    ("ix_evaluaciones_rasgos_tea_hora_inicio", ["rasgos_tea", "hora_inicio"],
+     ["hora_fin", "perfil_clinico", "sexo", "qchat_resultado"]),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY no puede correr dentro de una transacción
+    with op.get_context().autocommit_block():
+        for nombre, columnas, incluidas in INDICES:
+            op.create_index(
+                nombre, "evaluaciones", columnas,
+                postgresql_include=incluidas, postgresql_concurrently=True, if_not_exists=True,
+            )
+    op.drop_index("ix_evaluaciones_id", table_name="evaluaciones")
+
+
+def downgrade():
+    op.create_index("ix_evaluaciones_id", "evaluaciones", ["id"])
+    with op.get_context().autocommit_block():
+        for nombre, _, _ in reversed(INDICES):
+            op.drop_index(nombre, table_name="evaluaciones", postgresql_concurrently=True, if_exists=True)
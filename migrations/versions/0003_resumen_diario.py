@@ -0,0 +1,68 @@
+"""Resumen diario de evaluaciones (evaluaciones_resumen_diario) cargado con la historia
+
+Crea la tabla si falta (una base marcada con 0001_baseline antes de este cambio
+pudo recibirla de create_all, vacía o con solo los upserts de después del
+despliegue) y la recalcula completa desde evaluaciones. En PostgreSQL toma un
+lock EXCLUSIVE: los upserts de instancias que sigan corriendo esperan a que
+termine la carga, ni se pierden ni se cuentan dos veces.
+
+Revision ID: 0003_resumen_diario
+Revises: 0002_indices_dashboard
+Create Date: 2026-10-18
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0003_resumen_diario"
+down_revision = "0002_indices_dashboard"
+branch_labels = None
+depends_on = None
+
+TABLA = "evaluaciones_resumen_diario"
+
+# Día local de Lima de un timestamptz, como _expr_dia() en app/db/resumen_diario.py
+DIA = {
+    "postgresql": "CAST(timezone('America/Lima', {columna}) AS DATE)",
+    "sqlite": "date({columna})",
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    existe = not context.is_offline_mode() and sa.inspect(bind).has_table(TABLA)
+    if not existe:
+        op.create_table(
+            TABLA,
+            sa.Column("dia", sa.Date(), nullable=False),
+            sa.Column("dia_fin", sa.Date(), nullable=False),
+            sa.Column("perfil_clinico", sa.String(30), nullable=False),
+            sa.Column("rasgos_tea", sa.String(2), nullable=False),
+            sa.Column("sexo", sa.String(1), nullable=False),
+            sa.Column("qchat_resultado", sa.SmallInteger(), nullable=False),
+            sa.Column("cantidad", sa.Integer(), nullable=False),
+            sa.Column("suma_nivel_confianza", sa.Numeric(14, 2), nullable=False),
+            sa.Column("suma_duracion_minutos", sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint("dia", "dia_fin", "perfil_clinico", "rasgos_tea", "sexo", "qchat_resultado"),
+        )
+
+    dialecto = bind.dialect.name
+    if dialecto == "postgresql":
+        op.execute(f"LOCK TABLE {TABLA} IN EXCLUSIVE MODE")
+    dia = DIA.get(dialecto, DIA["sqlite"])
+    op.execute(f"DELETE FROM {TABLA}")
+    op.execute(
+        f"""
+        INSERT INTO {TABLA} (dia, dia_fin, perfil_clinico, rasgos_tea, sexo, qchat_resultado,
+                             cantidad, suma_nivel_confianza, suma_duracion_minutos)
+        SELECT {dia.format(columna="hora_inicio")}, {dia.format(columna="hora_fin")},
+               COALESCE(perfil_clinico, ''), COALESCE(rasgos_tea, ''), COALESCE(sexo, ''),
+               COALESCE(qchat_resultado, -1),
+               COUNT(*), COALESCE(SUM(nivel_confianza), 0), COALESCE(SUM(duracion_minutos), 0)
+        FROM evaluaciones
+        GROUP BY 1, 2, 3, 4, 5, 6
+        """
+    )
+
+
+def downgrade():
+    op.drop_table(TABLA)
@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+import pytest
+
+# Variables mínimas para importar la app sin .env: BD SQLite temporal y correo de prueba
+_TMP_DIR = tempfile.mkdtemp(prefix="teanimo_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_TMP_DIR}/teanimo_test.db")
+os.environ.setdefault("SECRET_KEY", "clave-de-pruebas")
+os.environ.setdefault("MAIL_USERNAME", "pruebas@example.com")
+os.environ.setdefault("MAIL_PASSWORD", "pruebas")
+# La base de pruebas se crea con create_all (fixture crear_tablas), sin alembic_version
+os.environ.setdefault("AUTO_CREATE_TABLES", "true")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def crear_tablas():
+    from app.db.database import Base, engine
+    import app.db.models  # noqa: F401  (registra los modelos en Base)
+
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
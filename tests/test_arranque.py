@@ -0,0 +1,109 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+
+from app.api import salud
+from app.api.salud import EstadoArranque
+from app.core.model_settings import BASE_DIR
+from app.db import arranque
+from app.db.arranque import preparar_base_de_datos
+from app.db.database import Base
+
+
+def test_importar_app_no_toca_la_base(tmp_path):
+    """Importar app.main no crea tablas ni el admin: eso ocurre en el lifespan"""
+    ruta = tmp_path / "importacion.db"
+    entorno = {**os.environ, "DATABASE_URL": f"sqlite:///{ruta}"}
+    entorno.pop("ASYNC_DATABASE_URL", None)
+    subprocess.run([sys.executable, "-c", "import app.main"], cwd=BASE_DIR, env=entorno, check=True)
+
+    assert not ruta.exists() or inspect(create_engine(f"sqlite:///{ruta}")).get_table_names() == []
+
+
+def test_preparar_base_inicializa_una_sola_vez(tmp_path):
+    """Primer arranque: crea tablas y admin; los siguientes solo verifican"""
+    motor = create_engine(f"sqlite:///{tmp_path}/arranque.db")
+
+    primero = preparar_base_de_datos(motor)
+    assert primero["inicializo"] is True
+    assert set(primero["tablas_creadas"]) == set(Base.metadata.tables)
+
+    assert preparar_base_de_datos(motor) == {"inicializo": False, "tablas_creadas": []}
+    motor.dispose()
+
+
+def test_sin_auto_create_exige_migraciones(tmp_path, monkeypatch):
+    """Con AUTO_CREATE_TABLES desactivado y tablas faltantes, el arranque falla indicando alembic"""
+    monkeypatch.setattr(arranque, "AUTO_CREATE_TABLES", False)
+    motor = create_engine(f"sqlite:///{tmp_path}/vacia.db")
+
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        preparar_base_de_datos(motor)
+    motor.dispose()
+
+
+def test_health_ready_sigue_el_arranque(monkeypatch):
+    """/health/live responde siempre; /health/ready solo entre el fin del arranque y el apagado"""
+    estado = EstadoArranque()
+    monkeypatch.setattr(salud, "estado_arranque", estado)
+    app = FastAPI()
+    app.include_router(salud.router)
+    client = TestClient(app)
+
+    estado.comenzar()
+    assert client.get("/health/live").json() == {"status": "ok"}
+    assert client.get("/health/ready").status_code == 503
+
+    with estado.fase("modelos"):
+        pass
+    estado.terminar()
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["estado"] == "listo" and "modelos" in response.json()["fases_ms"]
+
+    estado.detener()
+    assert client.get("/health/ready").status_code == 503
+    assert client.get("/health/live").status_code == 200
+
+
+def test_fase_con_error_queda_registrada():
+    """Una fase que falla deja el estado en error con su nombre"""
+    estado = EstadoArranque()
+    estado.comenzar()
+    with pytest.raises(ValueError):
+        with estado.fase("base_de_datos"):
+            raise ValueError("sin conexión")
+
+    assert not estado.listo
+    assert estado.resumen()["error"] == "base_de_datos: sin conexión"
+
+
+def test_vivo_antes_de_listo_durante_el_precalentamiento(monkeypatch):
+    """Con el lifespan de app.main, /health/live responde 200 mientras /health/ready sigue en 503"""
+    from app import main
+
+    estado = EstadoArranque()
+    monkeypatch.setattr(main, "estado_arranque", estado)
+    monkeypatch.setattr(salud, "estado_arranque", estado)
+    monkeypatch.setattr(main, "preparar_base_de_datos", lambda: {"inicializo": False, "tablas_creadas": []})
+    liberar = threading.Event()
+    monkeypatch.setattr(main, "precalentar", lambda modelos: liberar.wait(10))
+
+    with TestClient(main.app) as client:
+        assert client.get("/health/live").status_code == 200
+        response = client.get("/health/ready")
+        assert response.status_code == 503 and response.json()["estado"] == "iniciando"
+
+        liberar.set()
+        limite = time.monotonic() + 10
+        while client.get("/health/ready").status_code != 200 and time.monotonic() < limite:
+            time.sleep(0.02)
+        assert estado.listo
+        assert {"base_de_datos", "modelos", "precalentar_modelo", "precalentar_pool"} <= estado.fases.keys()
@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, update
+
+from app.api import deps_auth
+from app.db.database import SessionLocal
+from app.db.models import Usuario
+from app.utils.security import create_access_token
+
+
+@pytest.fixture
+def client():
+    ahora = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.execute(delete(Usuario))
+        # created_at/updated_at explícitos: el server_default usa date_trunc (PostgreSQL)
+        db.add(Usuario(username="ana", password_hash="x", is_active=True, created_at=ahora, updated_at=ahora))
+        db.commit()
+    deps_auth.cache_tokens.clear()
+    deps_auth.cache_usuarios.clear()
+
+    app = FastAPI()
+
+    @app.get("/yo")
+    def yo(user: Usuario = Depends(deps_auth.get_current_user)):
+        return {"username": user.username}
+
+    with TestClient(app) as c:
+        c.headers["Authorization"] = f"Bearer {create_access_token('ana')}"
+        yield c
+
+    with SessionLocal() as db:
+        db.execute(delete(Usuario))
+        db.commit()
+
+
+def test_token_y_usuario_cacheados(client):
+    """Después del primer request, el token no se vuelve a verificar ni el usuario a consultar"""
+    aciertos_tokens = deps_auth.cache_tokens.aciertos
+    aciertos_usuarios = deps_auth.cache_usuarios.aciertos
+    for _ in range(3):
+        assert client.get("/yo").json() == {"username": "ana"}
+    assert deps_auth.cache_tokens.aciertos - aciertos_tokens == 2
+    assert deps_auth.cache_usuarios.aciertos - aciertos_usuarios == 2
+    assert deps_auth.estadisticas_cache()["consultas_evitadas"] == deps_auth.cache_usuarios.aciertos
+
+
+def test_desactivar_usuario_invalida_la_cache(client):
+    """Un usuario desactivado con el ORM deja de autenticar en el siguiente request"""
+    assert client.get("/yo").status_code == 200
+    with SessionLocal() as db:
+        db.query(Usuario).filter_by(username="ana").one().is_active = False
+        db.commit()
+    assert client.get("/yo").status_code == 401
+
+
+def test_update_masivo_vacia_la_cache(client):
+    """Un UPDATE masivo sobre usuario vacía la cache de usuarios"""
+    assert client.get("/yo").status_code == 200
+    with SessionLocal() as db:
+        db.execute(update(Usuario).values(is_active=False))
+        db.commit()
+    assert len(deps_auth.cache_usuarios) == 0
+    assert client.get("/yo").status_code == 401
+
+
+def test_token_invalido_o_vencido(client):
+    """Los tokens inválidos o vencidos se rechazan y no entran a la cache"""
+    vencido = create_access_token("ana", minutes=-1)
+    for token in ("no-es-un-jwt", vencido):
+        assert client.get("/yo", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+    assert len(deps_auth.cache_tokens) == 0
@@ -0,0 +1,47 @@
+from benchmarks.comun import comparar
+
+
+def _stats(p50):
+    return {"p50_ms": p50, "media_ms": p50, "p99_ms": p50, "repeticiones": 10}
+
+
+def test_comparar_marca_regresiones_sobre_el_umbral():
+    """Solo es regresión lo que empeora más que el umbral relativo y más que el mínimo absoluto"""
+    base = {"a": _stats(10.0), "b": _stats(10.0), "c": _stats(0.010), "solo_base": _stats(1.0)}
+    actual = {"a": _stats(11.0), "b": _stats(13.0), "c": _stats(0.020), "solo_actual": _stats(1.0)}
+
+    filas = {caso: regresion for caso, _, _, _, regresion in comparar(base, actual, umbral=0.2)}
+    assert filas == {"a": False, "b": True, "c": True}
+
+    # +0.01 ms en un caso de microsegundos no supera un mínimo de 0.05 ms
+    filas = {caso: regresion for caso, _, _, _, regresion in comparar(base, actual, umbral=0.2, minimo_ms=0.05)}
+    assert filas == {"a": False, "b": True, "c": False}
+
+
+def test_corpus_sintetico_y_reporte_por_endpoint():
+    """El corpus respeta la mezcla y el reporte separa percentiles y errores por endpoint"""
+    from benchmarks.carga import Estadisticas, _preparar_request, sintetizar
+
+    corpus = list(sintetizar(400, {"predict": 3, "datos": 1}, tasa=10, semilla=1))
+    assert {e["endpoint"] for e in corpus} == {"predict", "datos"}
+    assert 250 < sum(e["endpoint"] == "predict" for e in corpus) < 350
+    assert all(a["t"] <= b["t"] for a, b in zip(corpus, corpus[1:]))
+
+    predict = next(e for e in corpus if e["endpoint"] == "predict")
+    kwargs = _preparar_request(predict, token=None, usuario="u", password="p")
+    assert len(kwargs["json"]["values"]) == 25 and "headers" not in kwargs
+    datos = next(e for e in corpus if e["endpoint"] == "datos")
+    assert _preparar_request(datos, "tok", "u", "p")["headers"] == {"Authorization": "Bearer tok"}
+
+    stats = Estadisticas()
+    for i in range(1, 101):
+        stats.registrar("predict", float(i), 200)
+    stats.registrar("login", 5.0, 503)
+    stats.registrar("login", 7.0, "ConnectTimeout")
+    reporte = stats.reporte(segundos=2.0)
+
+    assert reporte["endpoints"]["predict"]["p50_ms"] == 51.0
+    assert reporte["endpoints"]["predict"]["p99_ms"] == 100.0 and reporte["endpoints"]["predict"]["max_ms"] == 100.0
+    assert reporte["endpoints"]["predict"]["req_por_s"] == 50.0
+    assert reporte["endpoints"]["login"]["tasa_errores"] == 1.0
+    assert reporte["total"]["errores_por_estado"] == {"503": 1, "ConnectTimeout": 1}
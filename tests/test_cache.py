@@ -0,0 +1,61 @@
+import dataclasses
+import time
+
+import numpy as np
+
+from app.model.data_preprocessor import DataPreprocessor
+from app.model.predictor import predecir, predecir_lote, cache_predicciones
+from app.model.registry import obtener_modelos, registro as registro_modelos
+from app.utils.cache import CacheLRU
+
+
+def test_cache_lru_desalojo_y_ttl():
+    """El cache respeta el tamaño máximo (LRU) y la expiración por TTL"""
+    cache = CacheLRU(max_items=2, ttl_segundos=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" pasa a ser el más reciente
+    cache.set("c", 3)           # desaloja "b"
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.desalojos == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    stats = cache.estadisticas()
+    assert stats["expirados"] == 1
+    assert stats["aciertos"] == 2 and stats["fallos"] == 2
+
+
+def test_cache_de_predicciones_y_invalidacion_por_version(monkeypatch):
+    """Vectores repetidos se sirven del cache y un modelo nuevo (ya publicado) lo invalida"""
+    cache_predicciones.clear()
+    modelos = obtener_modelos()
+    registro = [14,0,0,0,1,1,1,1,1,1,1,1,8,0,0,0,0,0,0,0,0,55,60,"11/5/2025, 3:08:53 p. m.","11/5/2025, 3:09:44 p. m."]
+    X = DataPreprocessor(registro, modelos=modelos).get_feature_matrix()
+
+    aciertos = cache_predicciones.aciertos
+    primero = predecir(X, modelos=modelos)
+    assert predecir(X, modelos=modelos) == primero
+    assert cache_predicciones.aciertos == aciertos + 1
+
+    # Un lote con el vector ya cacheado y uno nuevo: solo el nuevo va al modelo
+    otro = X.copy()
+    otro[0, 1] = 1 - otro[0, 1]
+    resultados = predecir_lote(np.vstack([X, otro]), modelos=modelos)
+    assert resultados[0] == primero
+    assert len(cache_predicciones) == 2
+
+    # Se publica otra versión: no reutiliza resultados anteriores y limpia el cache
+    nueva_version = dataclasses.replace(modelos, version="otra-version")
+    monkeypatch.setattr(registro_modelos, "_actual", nueva_version)
+    predecir(X, modelos=nueva_version)
+    assert len(cache_predicciones) == 1
+
+    # Un request que aún usa el snapshot anterior no vuelve a limpiar el cache
+    aciertos = cache_predicciones.aciertos
+    predecir(X, modelos=modelos)
+    predecir(X, modelos=nueva_version)
+    assert len(cache_predicciones) == 2
+    assert cache_predicciones.aciertos == aciertos + 1
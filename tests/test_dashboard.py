@@ -0,0 +1,262 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api import dashboard
+from app.api.deps_auth import get_current_user
+from app.db.database import SQLALCHEMY_DATABASE_URL, SessionLocal, _url_async
+from app.db.models import Evaluacion, ResumenDiario
+from app.db.resumen_diario import reconstruir_resumen
+from app.db.version_datos import version_evaluaciones
+from app.db.version_datos import version_evaluaciones
+
+
+def _evaluacion(dia, perfil, tea, sexo, qchat):
+    inicio = datetime(2025, 3, dia, 15, 0, tzinfo=timezone.utc)
+    return Evaluacion(
+        edad=5, sexo=sexo, qchat_resultado=qchat, perfil_clinico=perfil, rasgos_tea=tea,
+        porc_deficiencia_social_interactiva=0.5, porc_deficiencia_comunicativa=0.4,
+        nivel_confianza=0.8, hora_inicio=inicio, hora_fin=inicio.replace(minute=7), duracion_minutos=7,
+    )
+
+
+def _reconstruir_resumen():
+    # Las filas de prueba se insertan sin pasar por la API: el job de recuperación llena el resumen
+    async def ejecutar():
+        url, connect_args = _url_async(SQLALCHEMY_DATABASE_URL)
+        engine = create_async_engine(url, connect_args=connect_args)
+        try:
+            async with async_sessionmaker(engine)() as db:
+                await reconstruir_resumen(db)
+        finally:
+            await engine.dispose()
+    asyncio.run(ejecutar())
+
+
+@pytest.fixture(scope="module")
+def client():
+    with SessionLocal() as db:
+        db.query(Evaluacion).delete()
+        db.add_all([
+            _evaluacion(1, "mixto", "Si", "M", 8),
+            _evaluacion(2, "mixto", "No", "F", 3),
+            _evaluacion(3, "comunicativo", "Si", "M", 8),
+            _evaluacion(4, "interactivo-social", "Si", "F", 10),
+            _evaluacion(5, "mixto", "No", "M", 0),
+        ])
+        db.commit()
+    _reconstruir_resumen()
+    dashboard.cache_totales.clear()
+    dashboard.cache_respuestas.clear()
+
+    app = FastAPI()
+    app.include_router(dashboard.router)
+    app.dependency_overrides[get_current_user] = lambda: None
+    with TestClient(app) as c:
+        yield c
+
+    with SessionLocal() as db:
+        db.query(Evaluacion).delete()
+        db.query(ResumenDiario).delete()
+        db.commit()
+
+
+def test_datos_dashboard(client):
+    """Los agregados del dashboard respetan los filtros de fecha y TEA"""
+    response = client.get("/dashboard/dashboard/datos", params={"tiene_tea": True})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert sorted(map(tuple, body["perfil_tea"])) == [("comunicativo", 1), ("interactivo-social", 1), ("mixto", 1)]
+    assert sorted(body["qchat_scores"]) == [8, 8, 10]
+    assert body["tea_pastel"] == [["Si", 3]]
+    assert sorted(map(tuple, body["sexo_pastel"])) == [("F", 1), ("M", 2)]
+
+    response = client.get("/dashboard/dashboard/datos", params={"start_date": "2025-03-02T00:00:00", "end_date": "2025-03-03T00:00:00"})
+    assert sorted(response.json()["qchat_scores"]) == [3, 8]
+
+
+def test_listado_paginado(client):
+    """El listado pagina y reporta el total de evaluaciones filtradas"""
+    response = client.get("/dashboard/evaluaciones", params={"skip": 0, "limit": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["evaluaciones"]) == 2
+    assert body["total"] == 5
+    assert body["total_paginas"] == 3
+
+
+def test_histograma_qchat(client):
+    """El histograma trae 11 bins (puntajes 0 a 10) y la lista legacy es opcional"""
+    response = client.get("/dashboard/dashboard/datos", params={"qchat_scores": False})
+    body = response.json()
+    assert body["qchat_histograma"] == [1, 0, 0, 1, 0, 0, 0, 0, 2, 0, 1]
+    assert "qchat_scores" not in body
+
+    response = client.get("/dashboard/dashboard/datos", params={"qchat_scores": True, "tiene_tea": False})
+    body = response.json()
+    assert body["qchat_histograma"] == [1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0]
+    assert body["qchat_scores"] == [0, 3]
+
+
+def test_agregados_postgresql_en_una_pasada():
+    """En PostgreSQL los conteos salen de un único GROUPING SETS"""
+    from sqlalchemy.dialects import postgresql
+
+    consulta = dashboard._consulta_agregados(dashboard._filtros(None, None, True), "postgresql")
+    sql = str(consulta.compile(dialect=postgresql.dialect()))
+    assert "GROUPING SETS" in sql
+    assert "UNION" not in sql
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"tiene_tea": True},
+    {"start_date": "2025-03-02T00:00:00", "end_date": "2025-03-04T00:00:00"},
+    # Días parciales al inicio y al final del rango: se completan con la tabla cruda
+    {"start_date": "2025-03-02T15:03:00", "end_date": "2025-03-04T00:00:00"},
+    {"start_date": "2025-03-02T16:00:00", "end_date": "2025-03-04T00:00:00", "tiene_tea": False},
+    {"start_date": "2025-03-01T00:00:00", "end_date": "2025-03-04T15:05:00+05:00"},
+])
+def test_resumen_diario_igual_a_tabla_cruda(client, monkeypatch, params):
+    """Los conteos desde el resumen diario coinciden con los de la tabla evaluaciones"""
+    desde_resumen = client.get("/dashboard/dashboard/datos", params=params).json()
+    monkeypatch.setattr(dashboard, "DASHBOARD_USAR_RESUMEN", False)
+    desde_tabla = client.get("/dashboard/dashboard/datos", params=params).json()
+    assert desde_resumen == desde_tabla
+
+
+def test_tendencia(client):
+    """La serie de tendencia agrupa el resumen diario por día, semana o mes"""
+    response = client.get("/dashboard/tendencia", params={"granularidad": "dia", "start_date": "2025-03-02T00:00:00"})
+    assert response.status_code == 200
+    serie = response.json()["serie"]
+    assert [p["periodo"] for p in serie] == ["2025-03-02", "2025-03-03", "2025-03-04", "2025-03-05"]
+    assert [(p["con_tea"], p["sin_tea"]) for p in serie] == [(0, 1), (1, 0), (1, 0), (0, 1)]
+
+    # 2025-03-01 es sábado: cae en la semana del lunes 24 de febrero
+    serie = client.get("/dashboard/tendencia", params={"granularidad": "semana"}).json()["serie"]
+    assert [(p["periodo"], p["total"]) for p in serie] == [("2025-02-24", 2), ("2025-03-03", 3)]
+
+    serie = client.get("/dashboard/tendencia", params={"granularidad": "mes"}).json()["serie"]
+    assert serie == [{
+        "periodo": "2025-03-01", "total": 5, "con_tea": 3, "sin_tea": 2,
+        "nivel_confianza_promedio": 0.8, "duracion_promedio_minutos": 7.0,
+    }]
+
+    assert client.get("/dashboard/tendencia", params={"granularidad": "anio"}).status_code == 422
+
+
+def test_paginacion_por_cursor(client):
+    """Los cursores recorren el listado en orden (hora_fin, id) descendente, hacia adelante y atrás"""
+    primera = client.get("/dashboard/evaluaciones", params={"limit": 2}).json()
+    assert [e["qchat_resultado"] for e in primera["evaluaciones"]] == [0, 10]
+    assert primera["anterior_cursor"] is None
+
+    segunda = client.get("/dashboard/evaluaciones", params={"limit": 2, "cursor": primera["siguiente_cursor"]}).json()
+    tercera = client.get("/dashboard/evaluaciones", params={"limit": 2, "cursor": segunda["siguiente_cursor"]}).json()
+    assert [e["qchat_resultado"] for e in segunda["evaluaciones"]] == [8, 3]
+    assert [e["qchat_resultado"] for e in tercera["evaluaciones"]] == [8]
+    assert tercera["siguiente_cursor"] is None
+    assert tercera["total"] == 5 and tercera["total_paginas"] == 3
+
+    # Volver atrás desde la tercera página devuelve la segunda
+    atras = client.get("/dashboard/evaluaciones", params={"limit": 2, "cursor": tercera["anterior_cursor"]}).json()
+    assert atras["evaluaciones"] == segunda["evaluaciones"]
+    atras = client.get("/dashboard/evaluaciones", params={"limit": 2, "cursor": atras["anterior_cursor"]}).json()
+    assert atras["evaluaciones"] == primera["evaluaciones"]
+    assert atras["anterior_cursor"] is None
+
+    # skip/limit usa el mismo orden
+    por_skip = client.get("/dashboard/evaluaciones", params={"skip": 2, "limit": 2}).json()
+    assert por_skip["evaluaciones"] == segunda["evaluaciones"]
+
+    assert client.get("/dashboard/evaluaciones", params={"cursor": "no-es-un-cursor"}).status_code == 400
+
+
+def test_total_se_refresca_en_segundo_plano(client, monkeypatch):
+    """Un total vencido se devuelve igual y se recalcula sin bloquear el request"""
+    params = {"limit": 2, "tiene_tea": False}
+    assert client.get("/dashboard/evaluaciones", params=params).json()["total"] == 2
+
+    monkeypatch.setattr(dashboard, "DASHBOARD_TOTALES_TTL", 0)
+    llamadas = []
+    contar = dashboard._contar
+
+    async def contar_con_registro(*args):
+        llamadas.append(args[1:])
+        return 99
+
+    monkeypatch.setattr(dashboard, "_contar", contar_con_registro)
+    # Vencido: responde con el valor anterior y agenda el recálculo
+    assert client.get("/dashboard/evaluaciones", params=params).json()["total"] == 2
+    for _ in range(50):
+        if llamadas:
+            break
+        time.sleep(0.01)
+    assert llamadas
+    assert client.get("/dashboard/evaluaciones", params=params).json()["total"] == 99
+    monkeypatch.setattr(dashboard, "_contar", contar)
+    dashboard.cache_totales.clear()
+
+
+def test_total_sigue_la_version_de_datos(client, monkeypatch):
+    """Una inserción (nueva versión de datos) recalcula el total sin esperar al TTL"""
+    params = {"limit": 2, "tiene_tea": True}
+    assert client.get("/dashboard/evaluaciones", params=params).json()["total"] == 3
+
+    async def contar_con_insercion(*args):
+        return 5
+
+    monkeypatch.setattr(dashboard, "_contar", contar_con_insercion)
+    assert client.get("/dashboard/evaluaciones", params=params).json()["total"] == 3
+    version_evaluaciones.incrementar()
+    body = client.get("/dashboard/evaluaciones", params=params).json()
+    assert body["total"] == 5 and body["total_paginas"] == 3
+    dashboard.cache_totales.clear()
+
+
+def test_etag_y_304_sin_consultar(client, monkeypatch):
+    """Un sondeo con el ETag vigente recibe 304 desde la cache; una inserción invalida la cache"""
+    params = {"tiene_tea": True, "start_date": "2025-03-01T00:00:00"}
+    primera = client.get("/dashboard/dashboard/datos", params=params)
+    etag = primera.headers["etag"]
+
+    llamadas = []
+    agregados = dashboard._agregados_resumen
+
+    async def agregados_con_registro(*args):
+        llamadas.append(args[1:])
+        return await agregados(*args)
+
+    monkeypatch.setattr(dashboard, "_agregados_resumen", agregados_con_registro)
+    no_modificado = client.get("/dashboard/dashboard/datos", params=params, headers={"If-None-Match": etag})
+    assert no_modificado.status_code == 304 and no_modificado.content == b""
+    # Filtros equivalentes comparten la entrada de la cache
+    mismo = client.get("/dashboard/dashboard/datos", params={**params, "start_date": "2025-03-01T00:00:00-05:00"})
+    assert mismo.json() == primera.json() and mismo.headers["etag"] == etag
+    assert llamadas == []
+
+    # Nueva versión de datos: se recalcula; el contenido no cambió, así que el ETag sigue valiendo
+    version_evaluaciones.incrementar()
+    recalculado = client.get("/dashboard/dashboard/datos", params=params, headers={"If-None-Match": f"W/{etag}"})
+    assert recalculado.status_code == 304
+    assert len(llamadas) == 1
+
+    assert client.get("/dashboard/dashboard/datos", params=params, headers={"If-None-Match": '"otro"'}).status_code == 200
+
+
+def test_listado_con_etag(client):
+    """El listado también responde 304 si la página y el total no cambiaron"""
+    params = {"limit": 2, "skip": 1}
+    primera = client.get("/dashboard/evaluaciones", params=params)
+    assert primera.status_code == 200
+    segunda = client.get("/dashboard/evaluaciones", params=params, headers={"If-None-Match": primera.headers["etag"]})
+    assert segunda.status_code == 304
+    otra_pagina = client.get("/dashboard/evaluaciones", params={"limit": 2}, headers={"If-None-Match": primera.headers["etag"]})
+    assert otra_pagina.status_code == 200
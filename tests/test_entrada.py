@@ -0,0 +1,80 @@
+import random
+import warnings
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.api import router
+from app.model.campos import CAMPOS
+from app.schemas.input_data import EntradaPrediccion, decodificar_valores
+from app.utils.fechas import parsear_hora
+
+REGISTRO = [14,0,0,0,1,1,1,1,1,1,1,1,8,0,0,0,0,0,0,0,0,55,60,"11/5/2025, 3:08:53 p. m.","11/5/2025, 3:09:44 p. m."]
+
+
+def _resultado(funcion, texto):
+    try:
+        return funcion(texto)
+    except ValueError:
+        return ValueError
+
+
+def test_parsear_hora_igual_que_pandas():
+    """El parser de formato fijo da lo mismo que pd.to_datetime (incluidos 12 a. m./p. m., día > 12 e ISO)"""
+    generador = random.Random(7)
+    textos = ["11/5/2025, 12:00:00 a. m.", "11/5/2025, 12:30:00 p. m.", "2025-11-05T15:08:53",
+              "2025-11-05T15:08:53.250Z", "2025-11-05T15:08:53-05:00", "11/5/2025, 3:08:53 p. m."]
+    for _ in range(500):
+        meridiano = generador.choice([" p. m.", " a. m.", " p.m.", " PM", " am", ""])
+        textos.append(
+            f"{generador.randint(1, 31)}/{generador.randint(1, 31)}/{generador.randint(1990, 2030)}, "
+            f"{generador.randint(0, 23)}:{generador.randint(0, 59):02d}:{generador.randint(0, 59):02d}{meridiano}"
+        )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        for texto in textos:
+            esperado = _resultado(lambda t: pd.to_datetime(t).to_pydatetime(), texto)
+            assert _resultado(parsear_hora, texto) == esperado, texto
+
+
+def test_formas_del_cuerpo():
+    """El arreglo original y el objeto con nombres de campo dan los mismos valores tipados"""
+    posicional = EntradaPrediccion.model_validate({"values": REGISTRO}).valores()
+    nombrado = EntradaPrediccion.model_validate(dict(zip(CAMPOS, REGISTRO))).valores()
+
+    assert posicional == nombrado
+    assert posicional[21] == 55.0 and isinstance(posicional[0], int)
+    assert posicional[23] == datetime(2025, 11, 5, 15, 8, 53)
+
+
+@pytest.mark.parametrize("valores, campo", [
+    (REGISTRO[:3] + [2] + REGISTRO[4:], "A2"),
+    ([19] + REGISTRO[1:], "Age_Years"),
+    (REGISTRO[:21] + [float("inf")] + REGISTRO[22:], "Social_Interaction_Issues_%"),
+    (REGISTRO[:24] + ["ayer"], "Time_End"),
+])
+def test_decodificar_rechaza_por_campo(valores, campo):
+    """Un valor fuera de rango o ilegible se informa con el nombre del campo"""
+    with pytest.raises(ValueError, match=campo):
+        decodificar_valores(valores)
+
+
+def test_predict_valida_en_el_esquema():
+    """/predict acepta ambas formas y responde 422 (con la posición) ante un registro inválido"""
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    assert client.post("/predict", json=dict(zip(CAMPOS, REGISTRO))).status_code == 200
+
+    response = client.post("/predict", json={"values": REGISTRO[:12] + [11] + REGISTRO[13:]})
+    assert response.status_code == 422
+    (error,) = response.json()["detail"]
+    assert error["loc"][-2:] == ["values", 12]
+
+    assert client.post("/predict", json={"values": REGISTRO[:20]}).status_code == 422
+    assert client.post("/predict", json={**dict(zip(CAMPOS, REGISTRO)), "Extra": 1}).status_code == 422
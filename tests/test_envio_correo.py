@@ -0,0 +1,165 @@
+import socket
+import time
+from email import message_from_bytes, policy
+
+import pytest
+from aiosmtpd import controller
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_mail import ConnectionConfig
+
+from app.api import api
+from app.utils.email_sender import ColaCorreo
+
+
+class Buzon:
+    """Servidor SMTP de prueba: guarda los mensajes y puede responder errores por destinatario."""
+
+    def __init__(self):
+        self.mensajes = []
+        self.respuestas = {}  # destinatario -> lista de respuestas a DATA (se consumen en orden)
+
+    async def handle_DATA(self, server, session, envelope):
+        for destinatario in envelope.rcpt_tos:
+            pendientes = self.respuestas.get(destinatario)
+            if pendientes:
+                return pendientes.pop(0)
+        self.mensajes.append(message_from_bytes(envelope.content, policy=policy.default))
+        return "250 OK"
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp():
+    buzon = Buzon()
+    servidor = controller.Controller(buzon, hostname="127.0.0.1", port=_puerto_libre())
+    servidor.start()
+    yield buzon, servidor.port
+    servidor.stop()
+
+
+@pytest.fixture
+def cola(smtp):
+    _, puerto = smtp
+    config = ConnectionConfig(
+        MAIL_USERNAME="pruebas@example.com", MAIL_PASSWORD="x", MAIL_FROM="pruebas@example.com",
+        MAIL_FROM_NAME="TEAnimo", MAIL_SERVER="127.0.0.1", MAIL_PORT=puerto,
+        MAIL_STARTTLS=False, MAIL_SSL_TLS=False, USE_CREDENTIALS=False, VALIDATE_CERTS=False,
+    )
+    return ColaCorreo(config, max_intentos=3, backoff=0.01)
+
+
+@pytest.fixture
+def client(cola, monkeypatch):
+    monkeypatch.setattr(api, "cola_correo", cola)
+    app = FastAPI()
+    app.include_router(api.router)
+    app.add_event_handler("startup", cola.iniciar)
+    app.add_event_handler("shutdown", cola.detener)
+    with TestClient(app) as c:
+        yield c
+
+
+def _subir(client, destinatario, contenido=b"%PDF-1.4 informe", nombre="informe.pdf"):
+    return client.post(
+        "/enviar-pdf", data={"destinatario": destinatario},
+        files={"file": (nombre, contenido, "application/pdf")},
+    )
+
+
+def _esperar(client, trabajo_id, estados=("enviado", "fallido")):
+    for _ in range(200):
+        estado = client.get(f"/enviar-pdf/{trabajo_id}").json()
+        if estado["estado"] in estados:
+            return estado
+        time.sleep(0.01)
+    raise AssertionError(f"El envío {trabajo_id} no terminó: {estado}")
+
+
+def test_envio_en_segundo_plano_con_una_conexion(client, smtp, cola):
+    """Dos subidas con el mismo nombre se aceptan con 202 y salen por la misma conexión SMTP"""
+    buzon, _ = smtp
+    respuestas = [_subir(client, f"persona{i}@example.com", contenido=f"%PDF {i}".encode()) for i in range(2)]
+    assert [r.status_code for r in respuestas] == [202, 202]
+
+    for r in respuestas:
+        assert _esperar(client, r.json()["trabajo_id"])["estado"] == "enviado"
+
+    adjuntos = {m["To"]: next(m.iter_attachments()).get_payload(decode=True) for m in buzon.mensajes}
+    assert adjuntos == {"persona0@example.com": b"%PDF 0", "persona1@example.com": b"%PDF 1"}
+    assert cola.conexiones == 1
+
+
+def test_error_transitorio_se_reintenta(client, smtp, cola):
+    """Una respuesta 4xx se reintenta con espera y el correo termina enviado"""
+    buzon, _ = smtp
+    buzon.respuestas["ana@example.com"] = ["451 Intente más tarde"]
+    estado = _esperar(client, _subir(client, "ana@example.com").json()["trabajo_id"])
+    assert estado["estado"] == "enviado"
+    assert estado["intentos"] == 2
+    assert cola.reintentos == 1
+
+
+def test_error_permanente_no_se_reintenta(client, smtp):
+    """Una respuesta 5xx marca el envío como fallido sin reintentar"""
+    buzon, _ = smtp
+    buzon.respuestas["beto@example.com"] = ["554 Rechazado para beto@example.com"]
+    estado = _esperar(client, _subir(client, "beto@example.com").json()["trabajo_id"])
+    assert estado["estado"] == "fallido"
+    assert estado["intentos"] == 1
+    assert "554" in estado["error"]
+    # El estado es público: no expone la dirección del destinatario
+    assert "beto@example.com" not in str(estado) and "destinatario" not in estado
+    assert buzon.mensajes == []
+
+
+def test_estado_desconocido_y_cola_llena(client, cola):
+    """Un trabajo inexistente da 404; con la cola llena la subida se rechaza con 503"""
+    assert client.get("/enviar-pdf/no-existe").status_code == 404
+    cola.max_cola = 0
+    response = _subir(client, "ana@example.com")
+    assert response.status_code == 503
+    assert cola.rechazados == 1
+
+
+def test_reintento_no_detiene_la_cola(client, smtp, cola):
+    """Un destinatario con 451 espera su reintento fuera de la cola: los demás informes salen antes"""
+    buzon, _ = smtp
+    cola.backoff = 0.5
+    buzon.respuestas["ana@example.com"] = ["451 Intente más tarde"]
+    ana = _subir(client, "ana@example.com").json()["trabajo_id"]
+    beto = _subir(client, "beto@example.com").json()["trabajo_id"]
+
+    assert _esperar(client, beto)["estado"] == "enviado"
+    estado = client.get(f"/enviar-pdf/{ana}").json()
+    assert estado["estado"] == "reintentando" and estado["proximo_intento"] is not None
+
+    estado = _esperar(client, ana)
+    assert estado["estado"] == "enviado" and estado["intentos"] == 2
+    assert [m["To"] for m in buzon.mensajes] == ["beto@example.com", "ana@example.com"]
+
+
+def test_al_detener_se_reintenta_lo_que_esperaba(smtp, cola, monkeypatch):
+    """Un trabajo que espera su reintento recibe un último intento al apagar, sin esperar el backoff"""
+    buzon, _ = smtp
+    monkeypatch.setattr(api, "cola_correo", cola)
+    app = FastAPI()
+    app.include_router(api.router)
+    app.add_event_handler("startup", cola.iniciar)
+    app.add_event_handler("shutdown", cola.detener)
+    cola.backoff = 60
+    buzon.respuestas["ana@example.com"] = ["451 Intente más tarde"]
+
+    with TestClient(app) as client:
+        trabajo_id = _subir(client, "ana@example.com").json()["trabajo_id"]
+        _esperar(client, trabajo_id, estados=("reintentando",))
+        inicio = time.monotonic()
+
+    assert time.monotonic() - inicio < 10
+    assert cola.estado(trabajo_id)["estado"] == "enviado"
+    assert [m["To"] for m in buzon.mensajes] == ["ana@example.com"]
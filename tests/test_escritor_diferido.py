@@ -0,0 +1,196 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.database import SQLALCHEMY_DATABASE_URL, SessionLocal, _url_async
+from app.db.escritor_diferido import EscritorDiferido
+from app.db.models import Evaluacion, ResumenDiario
+from app.db.version_datos import version_evaluaciones
+
+
+def _fila(qchat):
+    inicio = datetime(2025, 3, 1, 15, 0, tzinfo=timezone.utc)
+    return {
+        "edad": 5, "sexo": "M", "qchat_resultado": qchat, "perfil_clinico": "mixto", "rasgos_tea": "Si",
+        "nivel_confianza": 0.8, "hora_inicio": inicio, "hora_fin": inicio.replace(minute=7), "duracion_minutos": 7,
+    }
+
+
+def _qchats():
+    with SessionLocal() as db:
+        return sorted(db.scalars(select(Evaluacion.qchat_resultado)))
+
+
+@pytest.fixture(autouse=True)
+def tabla_vacia():
+    with SessionLocal() as db:
+        db.execute(delete(Evaluacion))
+        db.execute(delete(ResumenDiario))
+        db.commit()
+    yield
+    with SessionLocal() as db:
+        db.execute(delete(Evaluacion))
+        db.execute(delete(ResumenDiario))
+        db.commit()
+
+
+def _ejecutar(corrutina_con_sesiones):
+    # Engine propio por prueba: las conexiones aiosqlite quedan atadas al event loop que las creó
+    async def principal():
+        url, connect_args = _url_async(SQLALCHEMY_DATABASE_URL)
+        engine = create_async_engine(url, connect_args=connect_args)
+        try:
+            return await corrutina_con_sesiones(async_sessionmaker(engine, expire_on_commit=False))
+        finally:
+            await engine.dispose()
+    return asyncio.run(principal())
+
+
+def test_escribe_en_lotes_y_vacia_al_detener(tmp_path):
+    """Las filas encoladas se escriben con INSERT multi-fila y detener() vacía la cola"""
+    async def escenario(sesiones):
+        escritor = EscritorDiferido(tmp_path / "spool.jsonl", tam_lote=3, intervalo_ms=10_000, sesiones=sesiones)
+        await escritor.iniciar()
+        await escritor.encolar([_fila(1), _fila(2), _fila(3), _fila(4)])
+        await asyncio.sleep(0.1)  # el primer lote está completo y se escribe sin esperar el intervalo
+        escritas_antes = escritor.escritas
+        await escritor.detener()
+        return escritas_antes, escritor
+
+    version = version_evaluaciones.actual
+    escritas_antes, escritor = _ejecutar(escenario)
+    assert escritas_antes == 3
+    assert escritor.lotes == 2
+    # Cada lote confirmado invalida las caches del dashboard
+    assert version_evaluaciones.actual == version + 2
+    assert _qchats() == [1, 2, 3, 4]
+    # Todo quedó confirmado: el spool del proceso se borra al detener
+    assert not escritor.ruta_spool.exists()
+    assert not escritor.tiene_pendientes()
+
+
+def test_reproduce_el_spool_al_iniciar(tmp_path):
+    """Lo que quedó en el spool después del offset confirmado se inserta al arrancar"""
+    ruta = tmp_path / "spool.jsonl"
+    lineas = [json.dumps(_fila(q), default=str) + "\n" for q in (5, 6, 7)]
+    ruta.write_text("".join(lineas) + '{"edad": 5, "sex')  # la última línea quedó a medias
+    # La primera fila ya estaba confirmada antes de la caída
+    (tmp_path / "spool.jsonl.offset").write_text(str(len(lineas[0].encode())))
+
+    async def escenario(sesiones):
+        escritor = EscritorDiferido(ruta, intervalo_ms=10, sesiones=sesiones)
+        assert escritor.tiene_pendientes()
+        await escritor.iniciar()
+        await escritor.detener()
+        return escritor
+
+    escritor = _ejecutar(escenario)
+    assert escritor.reproducidas == 2 and escritor.adoptadas == 2
+    assert _qchats() == [6, 7]
+    # El spool único de versiones anteriores se adopta y se borra
+    assert not ruta.exists() and not escritor.ruta_spool.exists()
+
+
+def test_bd_caida_no_pierde_filas(tmp_path):
+    """Si la BD no responde, las filas quedan en el spool y se escriben en el siguiente arranque"""
+    ruta = tmp_path / "spool.jsonl"
+
+    class SesionCaida:
+        async def __aenter__(self):
+            raise ConnectionRefusedError("BD no disponible")
+
+        async def __aexit__(self, *args):
+            return False
+
+    async def caida(_):
+        escritor = EscritorDiferido(ruta, intervalo_ms=10, sesiones=SesionCaida)
+        await escritor.iniciar()
+        await escritor.encolar([_fila(8), _fila(9)])
+        await escritor.detener(timeout=0.3)
+        return escritor
+
+    escritor = _ejecutar(caida)
+    assert escritor.reintentos >= 1
+    assert _qchats() == []
+    assert escritor.tiene_pendientes()
+
+    async def recuperacion(sesiones):
+        nuevo = EscritorDiferido(ruta, intervalo_ms=10, sesiones=sesiones)
+        await nuevo.iniciar()
+        await nuevo.detener()
+        return nuevo
+
+    assert _ejecutar(recuperacion).reproducidas == 2
+    assert _qchats() == [8, 9]
+
+
+def test_adopta_solo_spools_sin_dueno(tmp_path):
+    """Al arrancar se adopta el spool de un proceso muerto; el de un worker vivo (con flock) no se toca"""
+    fcntl = pytest.importorskip("fcntl")
+    vivo, muerto = tmp_path / "spool.999998.jsonl", tmp_path / "spool.999999.jsonl"
+    vivo.write_text(json.dumps(_fila(13), default=str) + "\n")
+    muerto.write_text(json.dumps(_fila(14), default=str) + "\n")
+
+    async def escenario(sesiones):
+        with open(vivo, "rb") as otro_worker:
+            fcntl.flock(otro_worker.fileno(), fcntl.LOCK_EX)
+            escritor = EscritorDiferido(tmp_path / "spool.jsonl", intervalo_ms=10, sesiones=sesiones)
+            await escritor.iniciar()
+            await escritor.detener()
+        return escritor
+
+    escritor = _ejecutar(escenario)
+    assert escritor.adoptadas == 1
+    assert _qchats() == [14]
+    assert not muerto.exists()
+    assert vivo.read_text().count("\n") == 1
+
+
+def test_fila_invalida_no_bloquea_la_cola(tmp_path):
+    """Un error de datos aísla la fila rechazada y el resto del lote se guarda"""
+    async def escenario(sesiones):
+        escritor = EscritorDiferido(tmp_path / "spool.jsonl", intervalo_ms=10, sesiones=sesiones)
+        await escritor.iniciar()
+        invalida = _fila(11)
+        del invalida["hora_fin"]  # columna NOT NULL
+        await escritor.encolar([_fila(10), invalida, _fila(12)])
+        await escritor.detener()
+        return escritor
+
+    escritor = _ejecutar(escenario)
+    assert escritor.rechazadas == 1
+    assert _qchats() == [10, 12]
+    assert (tmp_path / "spool.rechazadas.jsonl").read_text().count("\n") == 1
+
+
+def test_predict_encola_con_escritura_diferida(tmp_path, monkeypatch):
+    """/predict responde sin hacer COMMIT cuando la escritura diferida está activa"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api import api
+    from app.db.database import async_engine
+
+    escritor = EscritorDiferido(tmp_path / "spool.jsonl", intervalo_ms=10)
+    monkeypatch.setattr(api, "WRITE_BEHIND_ENABLED", True)
+    monkeypatch.setattr(api, "escritor_evaluaciones", escritor)
+
+    app = FastAPI()
+    app.include_router(api.router)
+    app.add_event_handler("startup", escritor.iniciar)
+    app.add_event_handler("shutdown", escritor.detener)
+    app.add_event_handler("shutdown", async_engine.dispose)
+
+    valores = [14, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 8, 0, 0, 0, 0, 0, 0, 0, 0, 55, 60,
+               "11/5/2025, 3:08:53 p. m.", "11/5/2025, 3:09:44 p. m."]
+    with TestClient(app) as client:
+        response = client.post("/predict", json={"values": valores})
+        assert response.status_code == 200
+        assert escritor.encoladas == 1
+
+    assert escritor.escritas == 1
+    assert _qchats() == [8]
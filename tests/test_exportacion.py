@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import exportacion
+from app.api.deps_auth import get_current_user
+from app.cli import exportar as cli
+from app.db.database import SessionLocal, async_engine
+from app.db.exportacion import COLUMNAS
+from app.db.models import Evaluacion
+
+
+def _evaluacion(dia, tea, qchat):
+    inicio = datetime(2025, 3, dia, 15, 0, tzinfo=timezone.utc)
+    return Evaluacion(
+        edad=3, sexo="F", qchat_resultado=qchat, perfil_clinico="mixto", rasgos_tea=tea,
+        nivel_confianza=0.75, hora_inicio=inicio, hora_fin=inicio.replace(minute=9), duracion_minutos=9,
+    )
+
+
+@pytest.fixture(scope="module")
+def ids():
+    with SessionLocal() as db:
+        db.query(Evaluacion).delete()
+        filas = [_evaluacion(d, "Si" if d % 2 else "No", d) for d in range(1, 8)]
+        db.add_all(filas)
+        db.commit()
+        ids = [f.id for f in filas]
+    yield ids
+    with SessionLocal() as db:
+        db.query(Evaluacion).delete()
+        db.commit()
+
+
+@pytest.fixture
+def client(ids, monkeypatch):
+    # Lotes chicos: la exportación se arma con varios lotes del cursor
+    monkeypatch.setattr(exportacion, "EXPORTACION_LOTE", 2)
+    app = FastAPI()
+    app.include_router(exportacion.router)
+    app.dependency_overrides[get_current_user] = lambda: None
+    app.add_event_handler("shutdown", async_engine.dispose)
+    with TestClient(app) as c:
+        yield c
+
+
+def test_exportar_csv_con_filtros(client, ids):
+    """El CSV trae encabezado y las filas filtradas en orden de id"""
+    response = client.get("/exportar/evaluaciones", params={"formato": "csv", "tiene_tea": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    filas = list(csv.reader(io.StringIO(response.text)))
+    assert filas[0] == COLUMNAS
+    assert [int(f[0]) for f in filas[1:]] == ids[0::2]
+    registro = dict(zip(filas[0], filas[1]))
+    assert registro["rasgos_tea"] == "Si" and registro["nivel_confianza"] == "0.75"
+
+
+def test_exportar_ndjson_desde_id(client, ids):
+    """NDJSON retoma desde el último id recibido"""
+    response = client.get("/exportar/evaluaciones", params={"formato": "ndjson", "desde_id": ids[3]})
+    registros = [json.loads(linea) for linea in response.text.splitlines()]
+    assert [r["id"] for r in registros] == ids[4:]
+    assert registros[0]["qchat_resultado"] == 5
+
+
+def test_exportar_parquet(client, ids):
+    """Parquet se arma por row groups y se lee completo con pyarrow"""
+    import pyarrow.parquet as pq
+
+    response = client.get("/exportar/evaluaciones", params={"formato": "parquet"})
+    assert response.status_code == 200
+    archivo = pq.ParquetFile(io.BytesIO(response.content))
+    assert archivo.metadata.num_row_groups == 4  # 7 filas en lotes de 2
+    tabla = archivo.read()
+    assert tabla.column("id").to_pylist() == ids
+    assert tabla.schema.field("qchat_resultado").type == "int16"
+
+
+def test_cli_continua_tras_un_corte(ids, tmp_path):
+    """--continuar descarta la línea a medias y agrega desde el último id completo"""
+    salida = tmp_path / "evaluaciones.ndjson"
+    cli.main(["--formato", "ndjson", "--salida", str(salida), "--lote", "3"])
+    lineas = salida.read_bytes().splitlines(keepends=True)
+    assert len(lineas) == 7
+
+    # Corte a mitad de la cuarta fila
+    salida.write_bytes(b"".join(lineas[:3]) + lineas[3][:10])
+    cli.main(["--formato", "ndjson", "--salida", str(salida), "--continuar"])
+    assert [json.loads(l)["id"] for l in salida.read_text().splitlines()] == ids
+
+    csv_salida = tmp_path / "evaluaciones.csv"
+    cli.main(["--formato", "csv", "--salida", str(csv_salida), "--end-date", "2025-03-03T00:00:00"])
+    cli.main(["--formato", "csv", "--salida", str(csv_salida), "--continuar"])
+    filas = list(csv.reader(csv_salida.open()))
+    assert filas[0] == COLUMNAS
+    assert [int(f[0]) for f in filas[1:]] == ids
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
+from sqlalchemy import delete
+
+from app.api import auth
+from app.db.database import SessionLocal, async_engine
+from app.db.models import Usuario
+from app.utils.contrasenas import LimitadorIntentos, PoolContrasenas, PoolSaturado
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = PoolContrasenas(workers=1, max_pendientes=4, max_espera=10)
+    yield pool
+    pool.detener()
+
+
+@pytest.fixture
+def client(pool, monkeypatch):
+    ahora = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.execute(delete(Usuario))
+        # Coste bajo para la prueba; created_at/updated_at explícitos (el server_default es de PostgreSQL)
+        db.add(Usuario(username="ana", password_hash=bcrypt.using(rounds=4).hash("secreta"),
+                       is_active=True, created_at=ahora, updated_at=ahora))
+        db.commit()
+
+    monkeypatch.setattr(auth, "pool_contrasenas", pool)
+    monkeypatch.setattr(auth, "fallos_usuario", LimitadorIntentos(3, 60))
+    monkeypatch.setattr(auth, "fallos_ip", LimitadorIntentos(10, 60))
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.add_event_handler("shutdown", async_engine.dispose)
+    with TestClient(app) as c:
+        yield c
+
+    with SessionLocal() as db:
+        db.execute(delete(Usuario))
+        db.commit()
+
+
+def _login(client, password, username="ana"):
+    return client.post("/auth/login", data={"username": username, "password": password})
+
+
+def test_login_verifica_en_el_pool(client, pool):
+    """La contraseña se verifica en el pool de procesos"""
+    completadas = pool.completadas
+    response = _login(client, "secreta")
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+    assert _login(client, "otra").status_code == 401
+    assert pool.completadas == completadas + 2
+
+
+def test_fallos_repetidos_reciben_429(client, pool):
+    """Tras varios fallos del mismo usuario se responde 429 sin llegar a bcrypt"""
+    for _ in range(3):
+        assert _login(client, "mala").status_code == 401
+    completadas = pool.completadas
+    response = _login(client, "secreta")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert pool.completadas == completadas
+    # Otro usuario desde la misma IP todavía puede intentar
+    assert _login(client, "mala", username="beto").status_code == 401
+
+
+def test_pool_saturado_responde_503(client, monkeypatch):
+    """Sin capacidad en el pool de contraseñas el login se rechaza con 503"""
+    monkeypatch.setattr(auth, "pool_contrasenas", PoolContrasenas(workers=1, max_pendientes=0, max_espera=1))
+    response = _login(client, "secreta")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_control_de_admision(pool):
+    """Con el límite de pendientes alcanzado, las verificaciones extra fallan enseguida"""
+    lento = bcrypt.using(rounds=12).hash("x")
+    acotado = PoolContrasenas(workers=1, max_pendientes=1, max_espera=10)
+
+    async def escenario():
+        return await asyncio.gather(acotado.verificar("x", lento), acotado.verificar("x", lento), return_exceptions=True)
+
+    try:
+        primero, segundo = asyncio.run(escenario())
+    finally:
+        acotado.detener()
+    assert primero is True
+    assert isinstance(segundo, PoolSaturado)
+    assert acotado.rechazadas == 1
+
+
+def test_limitador_ventana_deslizante():
+    """Los fallos salen de la ventana y se puede volver a intentar"""
+    limitador = LimitadorIntentos(max_fallos=2, ventana_segundos=0.05)
+    limitador.registrar_fallo("ana")
+    assert limitador.espera("ana") == 0
+    limitador.registrar_fallo("ana")
+    assert 0 < limitador.espera("ana") <= 0.05
+    time.sleep(0.06)
+    assert limitador.espera("ana") == 0
+    assert limitador.estadisticas()["claves"] == 0
+
+
+def test_limite_por_ip_usa_la_ip_real_del_cliente(client, monkeypatch):
+    """Detrás del proxy se limita por la IP de X-Forwarded-For; la IP privada del proxy no se limita"""
+    from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+    monkeypatch.setattr(auth, "fallos_ip", LimitadorIntentos(2, 60))
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.add_middleware(ProxyHeadersMiddleware, trusted_hosts="10.0.0.0/8")
+    proxy = TestClient(app, client=("10.0.0.7", 5000))
+
+    def login(usuario, ip=None):
+        headers = {"X-Forwarded-For": f"1.2.3.4, {ip}"} if ip else {}
+        return proxy.post("/auth/login", data={"username": usuario, "password": "mala"}, headers=headers)
+
+    assert [login(u, "93.184.216.34").status_code for u in ("u1", "u2", "u3")] == [401, 401, 429]
+    # Otro cliente detrás del mismo proxy no queda bloqueado
+    assert login("u4", "151.101.1.69").status_code == 401
+    # Sin X-Forwarded-For solo se ve la IP del proxy: no se limita por IP
+    assert [login(f"v{i}").status_code for i in range(4)] == [401] * 4
+
+
+def test_verificacion_vencida_no_cuenta_como_fallo(client, pool, monkeypatch):
+    """Si el proceso descarta la verificación por vencida, se responde 503 y no se registra un fallo"""
+    from app.utils import contrasenas
+    # El proceso devuelve None como cuando vence_en ya pasó (se envía por nombre: _nada)
+    monkeypatch.setattr(contrasenas, "_verificar", contrasenas._nada)
+
+    vencidas = pool.vencidas
+    for _ in range(4):
+        assert _login(client, "secreta").status_code == 503
+    assert pool.vencidas == vencidas + 4
+    assert auth.fallos_usuario.espera("ana") == 0
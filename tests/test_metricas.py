@@ -0,0 +1,92 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import api, dashboard
+from app.api import metricas as metricas_api
+from app.api.deps_auth import get_current_user
+from app.utils.metricas import (
+    Histograma, MiddlewareMetricas, SIN_RUTA, duracion_etapas, duracion_requests, errores_requests,
+    metricas, requests_en_curso, requests_totales,
+)
+
+REGISTRO = [14,0,0,0,1,1,1,1,1,1,1,1,8,0,0,0,0,0,0,0,0,55,60,"11/5/2025, 3:08:53 p. m.","11/5/2025, 3:09:44 p. m."]
+TOKEN = "token-de-prometheus"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(metricas_api, "METRICS_TOKEN", TOKEN)
+    metricas.reiniciar()
+
+    app = FastAPI()
+    app.include_router(api.router)
+    app.include_router(dashboard.router)
+    app.include_router(metricas_api.router)
+
+    @app.get("/falla")
+    def falla():
+        raise RuntimeError("error de prueba")
+
+    app.add_middleware(MiddlewareMetricas)
+    with TestClient(app, raise_server_exceptions=False) as c:
+        yield c
+    metricas.reiniciar()
+
+
+def test_predict_por_ruta_y_por_etapa(client):
+    """/predict deja su latencia por ruta y la de cada etapa, visibles en /metrics con el token"""
+    assert client.post("/predict", json={"values": REGISTRO}).status_code == 200
+
+    assert duracion_requests.cantidad("POST", "/predict") == 1
+    assert requests_totales.valor("POST", "/predict", "200") == 1
+    for nombre in ("entrada", "ejecutor", "modelos", "preprocesamiento", "pca", "prediccion", "columnas",
+                   "sanitizar", "db_commit"):
+        assert duracion_etapas.cantidad(nombre) == 1, nombre
+
+    respuesta = client.get("/metrics", headers={"Authorization": f"Bearer {TOKEN}"})
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"].startswith("text/plain; version=0.0.4")
+    texto = respuesta.text
+    assert '# TYPE http_request_duration_seconds histogram' in texto
+    assert 'http_request_duration_seconds_count{method="POST",route="/predict"} 1' in texto
+    assert 'teanimo_stage_duration_seconds_bucket{etapa="prediccion",le="+Inf"} 1' in texto
+    assert 'http_requests_in_flight{route="/predict"} 0' in texto
+
+
+def test_metrics_protegido(client):
+    """Sin el token ni una sesión, /metrics responde 401"""
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer otro"}).status_code == 401
+
+
+def test_rutas_por_plantilla_y_errores(client):
+    """Las rutas se agrupan por plantilla; 404 en una sola serie; las excepciones cuentan como error"""
+    client.app.dependency_overrides[get_current_user] = lambda: None
+    client.get("/dashboard/evaluacion/123")
+    client.get("/dashboard/evaluacion/456")
+    client.get("/no/existe")
+    assert client.get("/falla").status_code == 500
+
+    assert duracion_requests.cantidad("GET", "/dashboard/evaluacion/{evaluacion_id}") == 2
+    assert requests_totales.valor("GET", SIN_RUTA, "404") == 1
+    assert errores_requests.valor("GET", "/falla", "excepcion") == 1
+    assert requests_totales.valor("GET", "/falla", "500") == 1
+    assert requests_en_curso.valor("/falla") == 0
+
+
+def test_histograma_acumulado():
+    """Los buckets se exponen acumulados, con +Inf, _sum y _count"""
+    histograma = Histograma("prueba_segundos", "Prueba", ("ruta",), buckets=(0.1, 1))
+    for valor in (0.05, 0.5, 0.5, 3):
+        histograma.observar(valor, "/x")
+
+    assert histograma.exponer() == [
+        "# HELP prueba_segundos Prueba",
+        "# TYPE prueba_segundos histogram",
+        'prueba_segundos_bucket{ruta="/x",le="0.1"} 1',
+        'prueba_segundos_bucket{ruta="/x",le="1"} 3',
+        'prueba_segundos_bucket{ruta="/x",le="+Inf"} 4',
+        'prueba_segundos_sum{ruta="/x"} 4.05',
+        'prueba_segundos_count{ruta="/x"} 4',
+    ]
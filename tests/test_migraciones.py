@@ -0,0 +1,101 @@
+from datetime import date, datetime
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, insert, inspect, select
+
+from app.core.model_settings import BASE_DIR
+from app.db import arranque
+from app.db.database import Base
+from app.db.models import Evaluacion, ResumenDiario
+
+
+def _config(url):
+    config = Config(str(BASE_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BASE_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+def test_migraciones_igual_a_modelos(tmp_path):
+    """alembic upgrade head deja el mismo esquema que declaran los modelos"""
+    url = f"sqlite:///{tmp_path}/migraciones.db"
+    command.upgrade(_config(url), "head")
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        diferencias = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+    # SQLite refleja una sola de las dos UNIQUE(username) de usuario (unique=True + uq_usuario_username)
+    diferencias = [
+        d for d in diferencias
+        if not (d[0] == "add_constraint" and d[1].table.name == "usuario" and d[1].name == "uq_usuario_username")
+    ]
+    assert diferencias == []
+
+    indices = {i["name"] for i in inspect(engine).get_indexes("evaluaciones")}
+    assert {"ix_evaluaciones_hora_fin_id", "ix_evaluaciones_hora_inicio", "ix_evaluaciones_rasgos_tea_hora_inicio"} <= indices
+    engine.dispose()
+
+
+def test_downgrade_a_base(tmp_path):
+    """Las migraciones se pueden revertir por completo"""
+    url = f"sqlite:///{tmp_path}/migraciones.db"
+    config = _config(url)
+    command.upgrade(config, "head")
+    command.downgrade(config, "base")
+
+    engine = create_engine(url)
+    assert set(inspect(engine).get_table_names()) == {"alembic_version"}
+    engine.dispose()
+
+
+def _evaluacion(dia):
+    inicio = datetime(2025, 4, dia, 9, 30)
+    return {"sexo": "F", "qchat_resultado": 5, "perfil_clinico": "mixto", "rasgos_tea": "No",
+            "nivel_confianza": 0.5, "hora_inicio": inicio, "hora_fin": inicio, "duracion_minutos": 4}
+
+
+def test_migracion_del_resumen_carga_la_historia(tmp_path):
+    """0003 recalcula el resumen desde evaluaciones aunque la tabla ya exista con upserts nuevos"""
+    url = f"sqlite:///{tmp_path}/migraciones.db"
+    config = _config(url)
+    command.upgrade(config, "0002_indices_dashboard")
+
+    engine = create_engine(url)
+    # Base marcada en 0001 que ya recibió la tabla (create_all) y un upsert posterior al despliegue
+    Base.metadata.create_all(engine, tables=[ResumenDiario.__table__])
+    with engine.begin() as conn:
+        conn.execute(insert(Evaluacion), [_evaluacion(1), _evaluacion(1), _evaluacion(2), _evaluacion(20)])
+        conn.execute(insert(ResumenDiario), {
+            "dia": date(2025, 4, 20), "dia_fin": date(2025, 4, 20), "perfil_clinico": "mixto",
+            "rasgos_tea": "No", "sexo": "F", "qchat_resultado": 5, "cantidad": 1,
+            "suma_nivel_confianza": 0.5, "suma_duracion_minutos": 4,
+        })
+
+    command.upgrade(config, "head")
+    with engine.connect() as conn:
+        filas = conn.execute(select(ResumenDiario.dia, ResumenDiario.cantidad).order_by(ResumenDiario.dia)).all()
+    assert filas == [(date(2025, 4, 1), 2), (date(2025, 4, 2), 1), (date(2025, 4, 20), 1)]
+    engine.dispose()
+
+
+def test_arranque_exige_la_ultima_migracion(tmp_path, monkeypatch):
+    """Sin AUTO_CREATE_TABLES, una base que no está en head detiene el arranque"""
+    monkeypatch.setattr(arranque, "AUTO_CREATE_TABLES", False)
+    url = f"sqlite:///{tmp_path}/migraciones.db"
+    config = _config(url)
+    engine = create_engine(url)
+
+    with pytest.raises(RuntimeError, match="ninguna revisión"):
+        arranque.preparar_base_de_datos(engine)
+
+    command.upgrade(config, "0002_indices_dashboard")
+    with pytest.raises(RuntimeError, match="está en 0002_indices_dashboard.*alembic upgrade head"):
+        arranque.preparar_base_de_datos(engine)
+
+    command.upgrade(config, "head")
+    assert arranque.preparar_base_de_datos(engine) == {"inicializo": True, "tablas_creadas": []}
+    engine.dispose()
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from app.model.data_preprocessor import DataPreprocessor, VARIABLES_MODELO
+from app.model.predictor import predecir, predecir_lote, cache_predicciones
+from app.model.registry import RegistroModelos
+from app.model.svm_kernel import KernelSVM
+from app.core.model_settings import MODEL_PATH, PCA_MODEL_PATH
+
+TOLERANCIA = 1e-9
+
+
+def _features_realistas(n, semilla):
+    rng = np.random.default_rng(semilla)
+    registros = np.column_stack([
+        rng.integers(1, 19, n),
+        rng.integers(0, 2, (n, 11)),
+        rng.integers(0, 11, n),
+        rng.integers(0, 2, (n, 8)),
+        rng.integers(0, 101, (n, 2)),
+    ]).astype(np.float64)
+    return DataPreprocessor(registros).get_feature_matrix()
+
+
+def test_paridad_kernel_con_sklearn():
+    """La función de decisión y las probabilidades del motor NumPy coinciden con sklearn"""
+    sklearn = RegistroModelos(MODEL_PATH, PCA_MODEL_PATH).actual().modelo
+    kernel = KernelSVM(sklearn)
+
+    rng = np.random.default_rng(7)
+    X = np.vstack([_features_realistas(5000, 1), rng.uniform(-0.5, 1.5, (5000, 20))])
+    df = pd.DataFrame(X, columns=VARIABLES_MODELO)
+
+    np.testing.assert_allclose(kernel.decision_function(X), sklearn.decision_function(df), rtol=0, atol=TOLERANCIA)
+    np.testing.assert_allclose(kernel.predict_proba(X), sklearn.predict_proba(df), rtol=0, atol=TOLERANCIA)
+
+
+def test_predecir_igual_con_ambos_motores(monkeypatch):
+    """predecir y predecir_lote devuelven lo mismo con el motor sklearn y el motor kernel"""
+    monkeypatch.setattr(cache_predicciones, "max_items", 0)  # Comparar motores, no el cache
+    con_sklearn = RegistroModelos(MODEL_PATH, PCA_MODEL_PATH, motor="sklearn").actual()
+    con_kernel = RegistroModelos(MODEL_PATH, PCA_MODEL_PATH, motor="kernel").actual()
+    assert con_kernel.nombre_motor == "kernel"
+
+    X = _features_realistas(2000, 3)
+    assert predecir_lote(X, modelos=con_kernel) == predecir_lote(X, modelos=con_sklearn)
+    assert predecir(X[:1], modelos=con_kernel) == predecir(X[:1], modelos=con_sklearn)
@@ -0,0 +1,166 @@
+import asyncio
+import time
+import tracemalloc
+from time import perf_counter
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import internal
+from app.api.deps_auth import get_current_user
+from app.model.executor import en_ejecutor_modelo
+from app.utils.memoria import InstantaneasMemoria
+from app.utils.perfilador import MiddlewarePerfiles, Perfilador
+
+_retenidos = []
+
+
+def _ocupado(segundos: float):
+    fin = perf_counter() + segundos
+    while perf_counter() < fin:
+        sum(range(200))
+
+
+def _crear_cliente(perfilador, monkeypatch):
+    monkeypatch.setattr(internal, "perfilador", perfilador)
+    app = FastAPI()
+    app.include_router(internal.router)
+
+    @app.get("/lento")
+    def lento():
+        _ocupado(0.15)
+        return {"ok": True}
+
+    @app.get("/rapido")
+    def rapido():
+        return {"ok": True}
+
+    app.add_middleware(MiddlewarePerfiles, perfilador=perfilador, habilitado=True)
+    app.dependency_overrides[get_current_user] = lambda: None
+    return TestClient(app)
+
+
+def test_guarda_requests_sobre_el_umbral(monkeypatch):
+    """Solo el request lento queda guardado, con las pilas de la función que consumió el tiempo"""
+    perfilador = Perfilador(fraccion=0, umbral_ms=100, max_perfiles=5, intervalo_ms=1)
+    client = _crear_cliente(perfilador, monkeypatch)
+    client.get("/rapido")
+    client.get("/lento")
+
+    listado = client.get("/internal/perfiles").json()
+    assert listado["perfilados"] == 1 and listado["descartados"] == 1
+    (perfil,) = listado["perfiles"]
+    assert perfil["path"] == "/lento" and perfil["motivo"] == "umbral" and perfil["estado"] == 200
+    assert perfil["duracion_ms"] >= 150 and perfil["muestras"] > 10
+    assert any("_ocupado" in f["funcion"] for f in perfil["funciones"][:3])
+
+    descarga = client.get(f"/internal/perfiles/{perfil['id']}")
+    assert descarga.status_code == 200
+    assert "attachment" in descarga.headers["content-disposition"]
+    linea = next(l for l in descarga.text.splitlines() if "_ocupado" in l)
+    assert linea.rsplit(" ", 1)[1].isdigit()
+    assert client.get("/internal/perfiles/no-existe").status_code == 404
+
+    client.delete("/internal/perfiles")
+    assert client.get("/internal/perfiles").json()["perfiles"] == []
+
+
+def test_fraccion_muestreada_y_filtro_de_rutas(monkeypatch):
+    """Con fracción 1 se guardan también los rápidos (los N más recientes); otras rutas no se perfilan"""
+    perfilador = Perfilador(fraccion=1, umbral_ms=0, max_perfiles=2, intervalo_ms=1, rutas=("/rapido",))
+    client = _crear_cliente(perfilador, monkeypatch)
+    for _ in range(3):
+        client.get("/rapido")
+    client.get("/lento")
+
+    perfiles = perfilador.perfiles()
+    assert len(perfiles) == 2
+    assert {p.motivo for p in perfiles} == {"muestra"}
+    assert {p.path for p in perfiles} == {"/rapido"}
+    assert perfilador.perfilados == 3
+
+
+def _modelo_a():
+    _ocupado(0.2)
+
+
+def _modelo_b():
+    _ocupado(0.2)
+
+
+def test_requests_simultaneos_no_se_mezclan():
+    """Dos requests a la vez en el mismo loop: cada perfil lleva solo las pilas de su propio trabajo"""
+    perfilador = Perfilador(fraccion=0, umbral_ms=100, max_perfiles=5, intervalo_ms=1)
+    app = FastAPI()
+
+    @app.get("/a")
+    async def ruta_a():
+        await en_ejecutor_modelo(_modelo_a)
+        return {"ok": True}
+
+    @app.get("/b")
+    async def ruta_b():
+        await en_ejecutor_modelo(_modelo_b)
+        return {"ok": True}
+
+    app.add_middleware(MiddlewarePerfiles, perfilador=perfilador, habilitado=True)
+
+    async def ambos():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await asyncio.gather(client.get("/a"), client.get("/b"))
+
+    asyncio.run(ambos())
+    perfiles = {perfil.path: perfil for perfil in perfilador.perfiles()}
+    assert perfiles.keys() == {"/a", "/b"}
+    for propio, ajeno in (("/a", "_modelo_b"), ("/b", "_modelo_a")):
+        pilas = perfiles[propio].colapsado()
+        assert f"_modelo_{propio[1]}" in pilas and ajeno not in pilas
+        assert perfiles[propio].resumen()["sesiones_simultaneas"] == 2
+
+
+def test_conserva_los_mas_lentos():
+    """Con el buffer lleno, un perfil nuevo solo entra si es más lento que el más rápido guardado"""
+    perfilador = Perfilador(fraccion=0, umbral_ms=1, max_perfiles=2, intervalo_ms=1)
+    for segundos in (0.5, 0.2, 0.9, 0.1):
+        sesion = perfilador.iniciar("GET", "/x")
+        sesion.inicio -= segundos
+        perfilador.terminar(sesion, 200)
+
+    assert [round(p.duracion_ms, -2) for p in perfilador.perfiles()] == [900, 500]
+
+
+def test_diff_de_memoria():
+    """El diff contra el snapshot base muestra dónde creció la memoria; detener apaga tracemalloc"""
+    memoria = InstantaneasMemoria(frames=5)
+    assert memoria.diferencia() is None
+    try:
+        base = memoria.tomar_base()
+        assert base["rastreando"]
+        _retenidos.append([bytearray(1024) for _ in range(2000)])
+
+        diff = memoria.diferencia(limite=5)
+        assert diff["crecimiento_total_bytes"] > 2_000_000
+        principal = diff["top"][0]
+        assert "test_perfilador.py" in principal["ubicacion"][0]
+        assert principal["diferencia_bloques"] >= 2000
+    finally:
+        _retenidos.clear()
+        memoria.detener()
+    assert not tracemalloc.is_tracing()
+
+
+def test_endpoints_de_memoria(monkeypatch):
+    """/internal/memoria: 409 sin base; snapshot, diff y detener"""
+    monkeypatch.setattr(internal, "memoria", InstantaneasMemoria(frames=1))
+    client = _crear_cliente(Perfilador(0, 0, 1, 10), monkeypatch)
+    assert client.get("/internal/memoria/diff").status_code == 409
+    try:
+        assert client.post("/internal/memoria/snapshot?limite=3").status_code == 200
+        diff = client.get("/internal/memoria/diff?agrupar=filename&actualizar=true").json()
+        assert diff["base_tomada_en"] and len(diff["top"]) <= 20
+        assert client.get("/internal/memoria/diff?agrupar=otra").status_code == 422
+    finally:
+        client.delete("/internal/memoria")
+    assert not tracemalloc.is_tracing()
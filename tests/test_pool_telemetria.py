@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.db.pool_telemetria import TelemetriaPool, clase_pool_medida
+
+
+@pytest.fixture
+def motor(tmp_path):
+    telemetria = TelemetriaPool("prueba")
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=clase_pool_medida(telemetria),
+        pool_size=1, max_overflow=0, pool_timeout=0.05, pool_pre_ping=True,
+    )
+    telemetria.instalar(engine)
+    yield engine, telemetria
+    engine.dispose()
+
+
+def test_checkout_y_uso(motor):
+    """Cada checkout queda en el histograma y se reporta la conexión en uso"""
+    engine, telemetria = motor
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert telemetria.estadisticas()["en_uso"] == 1
+
+    stats = telemetria.estadisticas()
+    assert stats["checkouts"] == 3 and stats["checkins"] == 3
+    assert sum(stats["espera_checkout_ms"]["histograma"].values()) == 3
+    assert stats["en_uso"] == 0 and stats["max_en_uso"] == 1
+    assert stats["conexiones_creadas"] == 1 and stats["reconexiones"] == 0
+
+
+def test_timeout_de_checkout(motor):
+    """Sin conexiones libres ni overflow, el checkout falla por timeout y se cuenta"""
+    engine, telemetria = motor
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    assert telemetria.estadisticas()["timeouts"] == 1
+
+
+def test_invalidacion_y_reconexion(motor):
+    """Una conexión invalidada se reemplaza en el siguiente checkout y cuenta como reconexión"""
+    engine, telemetria = motor
+    with engine.connect() as conn:
+        conn.invalidate()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    stats = telemetria.estadisticas()
+    assert stats["invalidaciones"] == 1
+    assert stats["reconexiones"] == 1
+    assert stats["conexiones_creadas"] == 2
@@ -0,0 +1,47 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api.api import router
+from app.db.database import SessionLocal
+from app.db.models import Evaluacion
+from app.model.data_preprocessor import DataPreprocessor
+from app.model.predictor import predecir, predecir_lote
+
+REGISTRO = [14,0,0,0,1,1,1,1,1,1,1,1,8,0,0,0,0,0,0,0,0,55,60,"11/5/2025, 3:08:53 p. m.","11/5/2025, 3:09:44 p. m."]
+REGISTRO_2 = [3,1,1,1,0,0,1,0,1,0,0,1,2,1,0,1,0,0,1,0,1,20,80,"11/5/2025, 4:00:00 p. m.","11/5/2025, 4:05:10 p. m."]
+
+
+def test_matriz_lote_igual_a_registros_individuales():
+    """La matriz del lote produce las mismas predicciones que el flujo registro a registro"""
+    processors = [DataPreprocessor(r) for r in (REGISTRO, REGISTRO_2)]
+    # Un solo DataPreprocessor para todo el lote: una transformación PCA para las N filas
+    matriz = DataPreprocessor(np.vstack([p.valores for p in processors])).get_feature_matrix()
+
+    assert matriz.shape == (2, 20)
+    for fila, processor in enumerate(processors):
+        assert np.array_equal(matriz[[fila]], processor.get_feature_matrix())
+
+    assert predecir_lote(matriz) == [predecir(p.get_feature_vector()) for p in processors]
+
+
+def test_predict_batch_con_errores_por_registro():
+    """El endpoint devuelve resultados y errores por registro e inserta solo los válidos"""
+    client = TestClient(router)
+    with SessionLocal() as db:
+        antes = db.query(Evaluacion).count()
+
+    response = client.post("/predict/batch", json={"registros": [
+        {"values": REGISTRO},
+        {"values": REGISTRO[:10]},
+        {"values": REGISTRO_2},
+        {"values": REGISTRO[:23] + ["no es fecha", "tampoco"]},
+    ]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["indice"] for r in body["resultados"]] == [0, 2]
+    assert [e["indice"] for e in body["errores"]] == [1, 3]
+    assert all(r["clase_predicha"] in (0, 1) for r in body["resultados"])
+
+    with SessionLocal() as db:
+        assert db.query(Evaluacion).count() == antes + 2
@@ -0,0 +1,106 @@
+import random
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from app.model.data_preprocessor import DataPreprocessor, VARIABLES_PCA, VARIABLES_MODELO, SCALING_PARAMS
+
+PCA = joblib.load("pca_model.pkl")
+
+
+class PreprocesadorReferencia:
+    """Implementación original (dict + DataFrame por registro) usada como referencia de paridad"""
+
+    campos = DataPreprocessor.campos
+
+    def __init__(self, raw_values):
+        self.data = dict(zip(self.campos, raw_values))
+
+    def minmax_scale(self, variable, value):
+        min_val, max_val = SCALING_PARAMS[variable]
+        if max_val == min_val:
+            return 0
+        return round((value - min_val) / (max_val - min_val), 4)
+
+    def get_comorbidity_percent(self):
+        comorb_vars = [
+            "Speech_Delay_Language_Disorder", "Learning_Disorder", "Genetic_Disorders",
+            "Depression", "Global_Developmental_Delay_Intellectual_Disability",
+            "Social_Behavioural_Issues", "Anxiety_Disorder"
+        ]
+        total = sum(int(self.data[var]) for var in comorb_vars)
+        return round((total / len(comorb_vars)) * 100, 2)
+
+    def get_clinical_profile(self):
+        comm = float(self.data["Communication_Issues_%"])
+        social = float(self.data["Social_Interaction_Issues_%"])
+        if abs(comm - social) < 10:
+            return "mixto", 1, 0
+        elif comm > social:
+            return "comunicativo", 0, 0
+        else:
+            return "interactivo-social", 0, 1
+
+    def get_normalized_dataframe(self):
+        _, dummy_mixed, dummy_social = self.get_clinical_profile()
+        variables = {
+            **self.data,
+            "Comorbidity_%": self.get_comorbidity_percent(),
+            "Clinical_Profile_Mixed": dummy_mixed,
+            "Clinical_Profile_Social interaction": dummy_social,
+            "Sex_M": 0
+        }
+        valores = [self.minmax_scale(var, float(variables[var])) for var in VARIABLES_PCA]
+        return pd.DataFrame([valores], columns=VARIABLES_PCA)
+
+    def get_feature_vector(self):
+        pca1 = round(PCA.transform(self.get_normalized_dataframe())[0][0], 4)
+        variables = {**self.data, "Sex_M": 0, "Comorbidity_%": self.get_comorbidity_percent()}
+        valores = {
+            "PCA_1": pca1,
+            **{var: self.minmax_scale(var, float(variables[var])) for var in VARIABLES_MODELO[1:]}
+        }
+        return pd.DataFrame([valores], columns=VARIABLES_MODELO)
+
+
+def _registro_aleatorio(rng):
+    return (
+        [rng.randint(1, 18), rng.randint(0, 1)]
+        + [rng.randint(0, 1) for _ in range(10)]
+        + [rng.randint(0, 10)]
+        + [rng.randint(0, 1) for _ in range(8)]
+        # Porcentajes con pasos finos para cubrir casos de redondeo en el borde (.xxxx5)
+        + [rng.choice([rng.randint(0, 100), round(rng.uniform(0, 100), 3)]) for _ in range(2)]
+        + ["11/5/2025, 3:08:53 p. m.", "11/5/2025, 3:09:44 p. m."]
+    )
+
+
+def test_paridad_exacta_con_implementacion_original():
+    """El pipeline compilado produce exactamente las mismas salidas que la implementación original"""
+    rng = random.Random(1234)
+    registros = [_registro_aleatorio(rng) for _ in range(300)]
+    registros.append([14,0,0,0,1,1,1,1,1,1,1,1,8,0,0,0,0,0,0,0,0,12.345,60,"11/5/2025, 3:08:53 p. m.","11/5/2025, 3:09:44 p. m."])
+
+    for registro in registros:
+        nuevo = DataPreprocessor(registro, modelos=None)
+        ref = PreprocesadorReferencia(registro)
+
+        assert nuevo.get_comorbidity_percent() == ref.get_comorbidity_percent()
+        assert nuevo.get_clinical_profile() == ref.get_clinical_profile()
+        assert nuevo.get_normalized_dataframe().equals(ref.get_normalized_dataframe())
+        assert nuevo.get_feature_vector().equals(ref.get_feature_vector())
+
+
+def test_lote_igual_a_registros_individuales():
+    """Un lote 2-D produce las mismas filas que procesar cada registro por separado"""
+    rng = random.Random(99)
+    registros = [_registro_aleatorio(rng) for _ in range(50)]
+
+    lote = DataPreprocessor(registros)
+    matriz = lote.get_feature_matrix()
+
+    assert matriz.shape == (50, 20)
+    individuales = np.vstack([DataPreprocessor(r).get_feature_matrix() for r in registros])
+    np.testing.assert_array_equal(matriz, individuales)
+    assert lote.get_ordered_column_dict() == [DataPreprocessor(r).get_ordered_column_dict() for r in registros]
@@ -0,0 +1,57 @@
+import itertools
+
+import numpy as np
+
+from app.model.data_preprocessor import DataPreprocessor
+from app.model.registry import obtener_modelos
+
+
+def _comparar_con_pca(registros):
+    """Compara PCA_1 de la proyección contra pca.transform, con el mismo redondeo a 4 decimales"""
+    modelos = obtener_modelos()
+    lote = DataPreprocessor(registros, modelos=modelos)
+
+    referencia = modelos.pca.transform(lote.get_normalized_dataframe())[:, 0]
+    proyectado = lote.get_pca_component_1()
+
+    # Sin redondear: mismas operaciones, diferencias solo de orden de suma (ulps)
+    proyeccion = modelos.proyeccion_pca
+    sin_redondear = lote.get_normalized_values() @ proyeccion.pesos - proyeccion.desplazamiento
+    np.testing.assert_allclose(sin_redondear, referencia, rtol=0, atol=1e-12)
+
+    # Redondeado: idéntico salvo valores que caen a menos de 1e-9 de un empate .xxxx5
+    distinto = proyectado != np.round(referencia, 4)
+    casi_empate = np.abs(np.abs(referencia * 1e4 - np.trunc(referencia * 1e4)) - 0.5) < 1e-5
+    assert not np.any(distinto & ~casi_empate)
+
+
+def test_equivalencia_en_rejilla_exhaustiva_de_variables_no_lineales():
+    """
+    Recorre todo el espacio válido de las variables que alimentan features derivados
+    (edad, Q-CHAT, número de comorbilidades y porcentajes en pasos de 5 que definen
+    el perfil clínico). Las A-items y banderas binarias entran de forma lineal y se
+    cubren con la muestra aleatoria del siguiente test.
+    """
+    filas = []
+    for edad, qchat, n_comorb, social, comm in itertools.product(
+        range(1, 19), range(0, 11), range(0, 8), range(0, 101, 5), range(0, 101, 5)
+    ):
+        comorb = [1] * n_comorb + [0] * (7 - n_comorb)
+        filas.append([edad, 0] + [1, 0] * 5 + [qchat] + comorb + [n_comorb % 2, social, comm])
+
+    _comparar_con_pca(np.array(filas, dtype=np.float64))
+
+
+def test_equivalencia_en_muestra_aleatoria_del_espacio_completo():
+    """Muestra aleatoria de todo el espacio válido, con porcentajes continuos"""
+    rng = np.random.default_rng(2025)
+    n = 200_000
+    filas = np.column_stack([
+        rng.integers(1, 19, n),
+        rng.integers(0, 2, (n, 11)),
+        rng.integers(0, 11, n),
+        rng.integers(0, 2, (n, 8)),
+        np.round(rng.uniform(0, 100, (n, 2)), rng.integers(0, 3)),
+    ]).astype(np.float64)
+
+    _comparar_con_pca(filas)
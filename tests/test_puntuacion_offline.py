@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+
+from app.cli.puntuar import main, puntuar
+from app.model.data_preprocessor import CAMPOS, DataPreprocessor
+from app.model.predictor import predecir
+from app.model.registry import RegistroModelos, registro
+
+REGISTRO = [14,0,0,0,1,1,1,1,1,1,1,1,8,0,0,0,0,0,0,0,0,55,60,"11/5/2025, 3:08:53 p. m.","11/5/2025, 3:09:44 p. m."]
+REGISTRO_2 = [3,1,1,1,0,0,1,0,1,0,0,1,2,1,0,1,0,0,1,0,1,20,80,"11/5/2025, 4:00:00 p. m.","11/5/2025, 4:05:10 p. m."]
+
+
+def _esperado(registro):
+    processor = DataPreprocessor(registro)
+    return predecir(processor.get_feature_matrix())
+
+
+def test_csv_con_encabezado_y_filas_invalidas():
+    """El CSV se lee por nombre de columna; las filas inválidas se reportan con su línea y no cortan la corrida"""
+    # Columnas en otro orden: se respetan los nombres del encabezado
+    columnas = list(reversed(CAMPOS))
+    entrada = io.StringIO()
+    escritor = csv.writer(entrada)
+    escritor.writerow(columnas)
+    for registro in (REGISTRO, REGISTRO[:10], REGISTRO_2, REGISTRO[:23] + ["no es fecha", "tampoco"], ["x"] + REGISTRO[1:]):
+        fila = dict(zip(CAMPOS, registro))
+        escritor.writerow([fila.get(c, "") for c in columnas] if len(registro) == 25 else registro)
+    entrada.seek(0)
+
+    salida, errores = io.StringIO(), io.StringIO()
+    resumen = puntuar(entrada, "csv", salida, "csv", errores, workers=1, lote=2)
+
+    assert resumen["filas"] == 5 and resumen["puntuadas"] == 2 and resumen["errores"] == 3
+    filas = list(csv.DictReader(io.StringIO(salida.getvalue())))
+    assert [int(f["linea"]) for f in filas] == [2, 4]
+    for fila, registro in zip(filas, (REGISTRO, REGISTRO_2)):
+        esperado = _esperado(registro)
+        assert int(fila["clase_predicha"]) == esperado["clase_predicha"]
+        assert float(fila["riesgo_autismo"]) == esperado["riesgo_autismo"]
+    assert filas[0]["edad"] == "14" and filas[0]["sexo"] == "F" and filas[0]["duracion_minutos"] == "1"
+    assert filas[1]["sexo"] == "M" and filas[1]["duracion_minutos"] == "6"
+
+    lineas_error = [json.loads(l)["linea"] for l in errores.getvalue().splitlines()]
+    assert lineas_error == [3, 5, 6]
+
+
+def test_jsonl_con_pool_igual_a_un_proceso(tmp_path):
+    """Con varios procesos la salida es la misma, en el mismo orden, que puntuando en un solo proceso"""
+    entrada = tmp_path / "tamizajes.jsonl"
+    with open(entrada, "w", encoding="utf-8") as f:
+        for i in range(30):
+            registro = list(REGISTRO if i % 2 else REGISTRO_2)
+            registro[0] = 1 + i % 18
+            if i % 3 == 0:
+                f.write(json.dumps({"values": registro}) + "\n")
+            else:
+                f.write(json.dumps(dict(zip(CAMPOS, registro))) + "\n")
+        f.write("{esto no es json\n")
+
+    main([str(entrada), "--salida", str(tmp_path / "uno.ndjson"), "--workers", "1", "--lote", "7"])
+    main([str(entrada), "--salida", str(tmp_path / "pool.ndjson"), "--workers", "2", "--lote", "7",
+          "--errores", str(tmp_path / "errores.jsonl")])
+
+    uno = (tmp_path / "uno.ndjson").read_text(encoding="utf-8").splitlines()
+    pool = (tmp_path / "pool.ndjson").read_text(encoding="utf-8").splitlines()
+    assert len(uno) == 30 and uno == pool
+    assert [json.loads(l)["linea"] for l in pool] == list(range(1, 31))
+    assert [json.loads(l)["linea"] for l in (tmp_path / "errores.jsonl").read_text().splitlines()] == [31]
+
+
+def test_cada_worker_carga_los_modelos_una_vez(monkeypatch):
+    """El worker usa su propio registro: el cache de predicciones no carga además el registro global"""
+    cargas = []
+    cargar = RegistroModelos._cargar
+
+    def contar(self):
+        cargas.append(self)
+        return cargar(self)
+
+    monkeypatch.setattr(RegistroModelos, "_cargar", contar)
+    # Proceso nuevo: el registro global todavía no cargó nada
+    monkeypatch.setattr(registro, "_actual", None)
+
+    entrada = io.StringIO("\n".join(json.dumps(r) for r in (REGISTRO, REGISTRO_2)) + "\n")
+    resumen = puntuar(entrada, "jsonl", io.StringIO(), "ndjson", workers=1)
+
+    assert resumen["puntuadas"] == 2
+    assert len(cargas) == 1 and cargas[0] is not registro
+    assert registro.version_publicada is None
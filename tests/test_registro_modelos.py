@@ -0,0 +1,78 @@
+import hashlib
+import os
+import shutil
+import time
+
+from app.model.registry import RegistroModelos
+
+
+def _registro_temporal(tmp_path, intervalo=0):
+    shutil.copy("model.pkl", tmp_path / "model.pkl")
+    shutil.copy("pca_model.pkl", tmp_path / "pca_model.pkl")
+    return RegistroModelos(tmp_path / "model.pkl", tmp_path / "pca_model.pkl", intervalo)
+
+
+def test_carga_unica_y_checksums(tmp_path):
+    """El registro carga una vez y reporta los checksums de los artefactos"""
+    registro = _registro_temporal(tmp_path)
+    modelos = registro.actual()
+
+    assert registro.actual() is modelos  # No se vuelve a cargar desde disco
+    assert modelos.checksums["model.pkl"] == hashlib.sha256((tmp_path / "model.pkl").read_bytes()).hexdigest()
+    assert modelos.checksums["pca_model.pkl"] == hashlib.sha256((tmp_path / "pca_model.pkl").read_bytes()).hexdigest()
+    assert modelos.duracion_carga_ms > 0
+    assert registro.info()["version"] == modelos.version
+
+
+def test_recarga_atomica_si_cambia_el_archivo(tmp_path):
+    """Si el archivo cambia en disco se publica una versión nueva y la anterior sigue usable"""
+    registro = _registro_temporal(tmp_path)
+    anterior = registro.actual()
+
+    assert registro.recargar_si_cambio() is False  # Sin cambios no se recarga
+
+    # Re-serializar el PCA con un cambio de contenido (y de mtime)
+    with open(tmp_path / "pca_model.pkl", "ab") as f:
+        f.write(b"\0")
+    os.utime(tmp_path / "pca_model.pkl", ns=(1, 1))
+
+    assert registro.recargar_si_cambio() is True
+    nuevo = registro.actual()
+    assert nuevo is not anterior
+    assert nuevo.version != anterior.version
+    assert registro.recargas == 1
+    # La referencia anterior sigue siendo válida para requests en curso
+    assert anterior.pca.n_components_ == 2
+
+
+def test_recarga_fallida_mantiene_version(tmp_path):
+    """Un artefacto corrupto no reemplaza la versión vigente"""
+    registro = _registro_temporal(tmp_path)
+    vigente = registro.actual()
+
+    (tmp_path / "model.pkl").write_bytes(b"no es un pickle")
+
+    assert registro.recargar_si_cambio() is False
+    assert registro.actual() is vigente
+
+
+def test_vigilancia_recarga_en_segundo_plano(tmp_path):
+    """actual() no revisa el disco; el hilo de vigilancia publica la versión nueva"""
+    registro = _registro_temporal(tmp_path, intervalo=0.05)
+    anterior = registro.actual()
+    with open(tmp_path / "pca_model.pkl", "ab") as f:
+        f.write(b"\0")
+    os.utime(tmp_path / "pca_model.pkl", ns=(1, 1))
+
+    time.sleep(0.1)
+    assert registro.actual() is anterior  # sin vigilancia, ningún request dispara la recarga
+
+    registro.iniciar_vigilancia()
+    try:
+        limite = time.monotonic() + 10
+        while registro.actual() is anterior and time.monotonic() < limite:
+            time.sleep(0.02)
+    finally:
+        registro.detener_vigilancia()
+    assert registro.actual().version != anterior.version
+    assert registro.recargas == 1
@@ -0,0 +1,149 @@
+import asyncio
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import arranque
+from app.db.database import SQLALCHEMY_DATABASE_URL, Base, SessionLocal, _url_async
+from app.db.models import Evaluacion, ResumenDiario
+from app.db.resumen_diario import (
+    _sentencia_upsert, acumular, dia_local, insertar_evaluaciones, reconstruir_resumen,
+)
+
+LIMA = ZoneInfo("America/Lima")
+
+
+def _fila(inicio, perfil="mixto", tea="Si", sexo="M", qchat=8, confianza=0.81, duracion=7):
+    return {
+        "edad": 3, "sexo": sexo, "qchat_resultado": qchat, "perfil_clinico": perfil, "rasgos_tea": tea,
+        "nivel_confianza": confianza, "hora_inicio": inicio, "hora_fin": inicio, "duracion_minutos": duracion,
+    }
+
+
+def _resumen(sesion=SessionLocal):
+    with sesion() as db:
+        filas = db.execute(select(ResumenDiario)).scalars().all()
+        return sorted(
+            (r.dia, r.dia_fin, r.perfil_clinico, r.rasgos_tea, r.sexo, r.qchat_resultado,
+             r.cantidad, float(r.suma_nivel_confianza), r.suma_duracion_minutos)
+            for r in filas
+        )
+
+
+def _ejecutar(fn, url_base=SQLALCHEMY_DATABASE_URL):
+    async def principal():
+        url, connect_args = _url_async(url_base)
+        engine = create_async_engine(url, connect_args=connect_args)
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                return await fn(db)
+        finally:
+            await engine.dispose()
+    return asyncio.run(principal())
+
+
+@pytest.fixture(autouse=True)
+def tablas_vacias():
+    def vaciar():
+        with SessionLocal() as db:
+            db.execute(delete(Evaluacion))
+            db.execute(delete(ResumenDiario))
+            db.commit()
+    vaciar()
+    yield
+    vaciar()
+
+
+def test_upsert_en_insert_igual_a_reconstruccion():
+    """El resumen mantenido en cada INSERT es idéntico al que recalcula el job de recuperación"""
+    base = datetime(2025, 4, 10, 9, 30, tzinfo=LIMA)
+    lotes = [
+        [_fila(base), _fila(base, qchat=3, tea="No"), _fila(base, sexo=None, qchat=None)],
+        [_fila(base, confianza=0.66), _fila(base.replace(day=11), perfil="comunicativo", duracion=12)],
+    ]
+
+    async def insertar(db):
+        for filas in lotes:
+            await insertar_evaluaciones(db, filas)
+            await db.commit()
+
+    _ejecutar(insertar)
+    incremental = _resumen()
+    assert sum(fila[6] for fila in incremental) == 5
+
+    _ejecutar(lambda db: reconstruir_resumen(db))
+    assert _resumen() == incremental
+
+    # El grupo que recibió dos lotes acumula cantidad y sumas
+    grupo = [f for f in incremental if f[0] == date(2025, 4, 10) and f[2:6] == ("mixto", "Si", "M", 8)]
+    assert grupo == [(date(2025, 4, 10), date(2025, 4, 10), "mixto", "Si", "M", 8, 2, 1.47, 14)]
+    # Los NULL de la clave se guardan como centinelas
+    assert any(f[4] == "" and f[5] == -1 for f in incremental)
+
+
+def test_reconstruir_un_rango():
+    """La reconstrucción parcial solo toca los días pedidos"""
+    base = datetime(2025, 4, 10, 9, 30, tzinfo=LIMA)
+
+    async def insertar(db):
+        await insertar_evaluaciones(db, [_fila(base), _fila(base.replace(day=12))])
+        await db.commit()
+
+    _ejecutar(insertar)
+    with SessionLocal() as db:
+        db.execute(delete(Evaluacion).where(Evaluacion.hora_inicio >= datetime(2025, 4, 12)))
+        db.commit()
+
+    _ejecutar(lambda db: reconstruir_resumen(db, desde=date(2025, 4, 11), hasta=date(2025, 4, 30)))
+    assert [fila[0] for fila in _resumen()] == [date(2025, 4, 10)]
+
+
+def test_tabla_nueva_se_llena_antes_del_primer_upsert(tmp_path, monkeypatch):
+    """Al crear el resumen en una base con historia se carga todo; un upsert posterior no la tapa"""
+    monkeypatch.setattr(arranque, "AUTO_CREATE_TABLES", True)
+    url = f"sqlite:///{tmp_path}/historia.db"
+    motor = create_engine(url)
+    # Base de antes del resumen: solo evaluaciones, con días anteriores al despliegue
+    Base.metadata.create_all(motor, tables=[Evaluacion.__table__])
+    historia = [_fila(datetime(2025, 4, dia, 9, 30)) for dia in (1, 1, 2, 3)]
+    with motor.begin() as conn:
+        conn.execute(insert(Evaluacion), historia)
+
+    assert ResumenDiario.__tablename__ in arranque.preparar_base_de_datos(motor)["tablas_creadas"]
+
+    async def insertar(db):
+        await insertar_evaluaciones(db, [_fila(datetime(2025, 4, 20, 9, 30))])
+        await db.commit()
+
+    _ejecutar(insertar, url)
+    sesion = sessionmaker(motor)
+    cargado = _resumen(sesion)
+    assert sum(fila[6] for fila in cargado) == 5
+    assert [fila[0] for fila in cargado] == [date(2025, 4, d) for d in (1, 2, 3, 20)]
+
+    _ejecutar(lambda db: reconstruir_resumen(db), url)
+    assert _resumen(sesion) == cargado
+    motor.dispose()
+
+
+def test_dia_local_de_lima():
+    """En PostgreSQL el día del resumen es el día de Lima, no el de UTC"""
+    utc = datetime(2025, 4, 11, 3, 0, tzinfo=timezone.utc)  # 10/04 22:00 en Lima
+    assert dia_local(utc, "postgresql") == date(2025, 4, 10)
+    assert dia_local(datetime(2025, 4, 11, 3, 0), "postgresql") == date(2025, 4, 11)
+    assert list(acumular([_fila(utc)], "postgresql"))[0][0] == date(2025, 4, 10)
+
+
+def test_upsert_postgresql():
+    """En PostgreSQL el resumen se actualiza con INSERT ... ON CONFLICT sumando los contadores"""
+    valores = [{"dia": date(2025, 4, 10), "dia_fin": date(2025, 4, 10), "perfil_clinico": "mixto",
+                "rasgos_tea": "Si", "sexo": "M", "qchat_resultado": 8, "cantidad": 1,
+                "suma_nivel_confianza": 0.8, "suma_duracion_minutos": 7}]
+    sql = str(_sentencia_upsert("postgresql", valores).compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (dia, dia_fin, perfil_clinico, rasgos_tea, sexo, qchat_resultado) DO UPDATE" in sql
+    assert "cantidad = (evaluaciones_resumen_diario.cantidad + excluded.cantidad)" in sql